@@ -2,34 +2,36 @@ import asyncio
 import copy
 import logging
 import os
+from collections import OrderedDict
 from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Final
+from typing import Any, Callable, Final
 
 import aiohttp
 from aiohttp import ClientConnectionError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_SCAN_INTERVAL, EVENT_HOMEASSISTANT_STARTED, CONF_PASSWORD
-from homeassistant.core import HomeAssistant, Event, SupportsResponse, CoreState
+from homeassistant.const import CONF_HOST, CONF_SCAN_INTERVAL, EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP, CONF_PASSWORD, Platform
+from homeassistant.core import HomeAssistant, Event, SupportsResponse, CoreState, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import entity_registry, config_validation as config_val, device_registry as device_reg
 from homeassistant.helpers.aiohttp_client import async_create_clientsession
 from homeassistant.helpers.device_registry import DeviceEntry
 from homeassistant.helpers.entity import Entity, EntityDescription
-from homeassistant.helpers.event import async_track_time_interval, async_call_later
+from homeassistant.helpers.event import async_track_time_interval, async_call_later, async_track_point_in_utc_time
 from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.typing import UNDEFINED, UndefinedType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.loader import async_get_integration
-from homeassistant.util import slugify
+from homeassistant.util import slugify, dt as dt_util
 from packaging.version import Version
 
-from custom_components.evcc_intg.pyevcc_ha import EvccApiBridge
+from custom_components.evcc_intg.pyevcc_ha import EvccApiBridge, TimeseriesSlotIndex, EvoptSeries, calculate_forecast_analytics, downsample_bucket_mean, data_domain_of, DATA_DOMAIN_SITE, DATA_DOMAIN_ANY_VEHICLE
 from custom_components.evcc_intg.pyevcc_ha.const import (
     TRANSLATIONS,
     JSONKEY_LOADPOINTS,
     JSONKEY_VEHICLES,
+    JSONKEY_EVOPT,
     JSONKEY_PLAN,
     JSONKEY_PLANS_DEPRECATED,
     JSONKEY_PLAN_SOC,
@@ -46,11 +48,15 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     ADDITIONAL_ENDPOINTS_DATA_SESSIONS,
     SESSIONS_KEY_LOADPOINTS,
     SESSIONS_KEY_VEHICLES,
+    SESSIONS_KEY_LIVE,
+    ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS,
     ADDITIONAL_ENDPOINTS_DATA_EVCCCONF,
     EVCCCONF_DEVICE_TYPES,
     EVCCCONF_KEY_CONFIG,
     EVCCCONF_KEY_DATA,
     JSONKEY_CIRCUITS,
+    FORECAST_CONTENT,
+    JSONKEY_EVOPT_SUMMARY,
     EP_TYPE
 )
 from custom_components.evcc_intg.pyevcc_ha.keys import Tag, camel_to_snake
@@ -71,6 +77,12 @@ from .const import (
     CONF_EXTENDED_VEHICLE_DATA_INTERVAL,
     CONF_EXTENDED_METER_DATA,
     CONF_EXTENDED_METER_DATA_INTERVAL,
+    CONF_IMPORT_SESSION_STATISTICS,
+    CONF_CHEAPEST_WINDOW_HOURS,
+    CONF_FORECAST_ATTRIBUTE_MODE,
+    CONF_EVOPT_ATTRIBUTE_MAX_POINTS,
+    CONF_PROFILE_SETUP,
+    FORECAST_ATTRIBUTE_MODE_COMPRESSED,
     CONF_PURGE_ALL,
     CONFIG_VERSION,
     CONFIG_MINOR_VERSION,
@@ -79,10 +91,19 @@ from .const import (
 )
 from .entity import CustomFriendlyNameEntity
 from .service import EvccService
+from .setup_profiler import SetupProfiler
+from .warm_start import EvccWarmStartStore, WARM_START_SAVE_INTERVAL, WARM_START_MAX_SERVE_TIME
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# marker for the compiled tag readers, to distinguish a missing key from a 'None' value
+_NOT_PRESENT: Final = object()
+
 WEBSOCKET_WATCHDOG_INTERVAL: Final = timedelta(minutes=5, seconds=1)
+# attribute lists/dicts up to this size are compared by their value - larger ones by identity
+ATTRIBUTE_VALUE_COMPARE_MAX_LEN: Final = 32
+# the max number of (per payload) slot indexes & compressed attributes - least recently used first out
+PAYLOAD_CACHE_MAX_SIZE: Final = 32
 CONFIG_SCHEMA = config_val.removed(DOMAIN, raise_if_present=False)
 DEVICE_REG_CLEANUP_RUNNING = False
 
@@ -117,6 +138,7 @@ async def async_setup(hass: HomeAssistant, config: dict):  # pylint: disable=unu
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     _LOGGER.debug(f"async_setup_entry(): called")
+    setup_profiler = SetupProfiler(enabled=config_entry.data.get(CONF_PROFILE_SETUP, False))
 
     if DOMAIN not in hass.data:
         the_integration = await async_get_integration(hass, DOMAIN)
@@ -138,49 +160,80 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     # to login to the evcc backend with every startup
     cookie_path = str(Path(hass.config.config_dir).joinpath(STORAGE_DIR, f"cookies_evcc_intg_{config_entry.entry_id}.txt"))
 
-    # ensure that our storage directory exists...
-    def prepare_dir():
-        os.makedirs(os.path.dirname(cookie_path), exist_ok=True)
-    await hass.async_add_executor_job(prepare_dir)
+    with setup_profiler.phase("load_cookies"):
+        # ensure that our storage directory exists...
+        def prepare_dir():
+            os.makedirs(os.path.dirname(cookie_path), exist_ok=True)
+        await hass.async_add_executor_job(prepare_dir)
 
-    the_persistent_cookie_jar = aiohttp.CookieJar(unsafe=True)
-    if os.path.exists(cookie_path):
-        if config_entry.data.get(CONF_PASSWORD):
-            try:
-                await hass.async_add_executor_job(the_persistent_cookie_jar.load, cookie_path)
-                _LOGGER.debug(f"async_setup_entry(): Loaded cookies from file: '{cookie_path}'")
-            except Exception as err:
-                _LOGGER.info(f"async_setup_entry(): Could not load cookies from {cookie_path}: {type(err).__name__} - {err}")
-        else:
-            # when there is no password BUT the cookie file still exist... we should delete it!
-            def delete_cookie_file():
-                os.remove(cookie_path)
-            await hass.async_add_executor_job(delete_cookie_file)
+        the_persistent_cookie_jar = aiohttp.CookieJar(unsafe=True)
+        if os.path.exists(cookie_path):
+            if config_entry.data.get(CONF_PASSWORD):
+                try:
+                    await hass.async_add_executor_job(the_persistent_cookie_jar.load, cookie_path)
+                    _LOGGER.debug(f"async_setup_entry(): Loaded cookies from file: '{cookie_path}'")
+                except Exception as err:
+                    _LOGGER.info(f"async_setup_entry(): Could not load cookies from {cookie_path}: {type(err).__name__} - {err}")
+            else:
+                # when there is no password BUT the cookie file still exist... we should delete it!
+                def delete_cookie_file():
+                    os.remove(cookie_path)
+                await hass.async_add_executor_job(delete_cookie_file)
 
 
     # using the same http client for test and final integration...
-    http_session = async_create_clientsession(hass, verify_ssl=False, cookie_jar=the_persistent_cookie_jar)
+    http_session = async_create_clientsession(hass, verify_ssl=False, cookie_jar=the_persistent_cookie_jar,
+                                              trace_configs=setup_profiler.trace_configs())
+
+    # the last known data from the previous run - only used, when the evcc server is not available
+    warm_start = EvccWarmStartStore(hass, config_entry.entry_id)
+    with setup_profiler.phase("load_warm_start"):
+        warm_start_snapshot = await warm_start.async_load()
 
     # simple check, IF the evcc server is up and running ... raise an 'ConfigEntryNotReady' if
     # the configured backend could not be reached - then let HA deal with an optional retry
-    await check_evcc_is_available(http_session, config_entry)
+    with setup_profiler.phase("check_evcc_is_available"):
+        try:
+            state_snapshot = await check_evcc_is_available(http_session, config_entry)
+        except ConfigEntryNotReady as not_ready:
+            if warm_start_snapshot is None:
+                raise not_ready
+            # we can start with the last known data (the entities will show these values, till
+            # the evcc server is available again)
+            _LOGGER.info(f"async_setup_entry(): {not_ready} - starting with the last known data from {warm_start_snapshot[1]}")
+            state_snapshot = None
 
     # ok - when the evcc-server is available we can continue with the init process...
     coordinator = EvccDataUpdateCoordinator(hass, http_session, config_entry, cookie_path)
+    coordinator.setup_profiler = setup_profiler
+    coordinator.warm_start = warm_start
     coordinator.is_initphase = True
-    await coordinator.async_refresh()
+    if state_snapshot is None:
+        coordinator.bridge.use_warm_start_data(warm_start_snapshot[0])
+        coordinator.warm_start_saved_at = warm_start_snapshot[1]
+        coordinator.warm_start_served_since = dt_util.utcnow()
+        coordinator.async_set_updated_data(coordinator.bridge._data)
+        # with the websocket there is no polling, that could end the serving of the last known data
+        config_entry.async_on_unload(async_call_later(hass, WARM_START_MAX_SERVE_TIME, coordinator.warm_start_expired))
+    else:
+        # the state, that has been just read by the availability check, is used for the initial refresh
+        coordinator.bridge.use_state_snapshot(state_snapshot)
+        with setup_profiler.phase("first_refresh"):
+            await coordinator.async_refresh()
     coordinator.is_initphase = False
     if not coordinator.last_update_success or coordinator.data is None or len(coordinator.data) == 0:
         raise ConfigEntryNotReady(f"No data from host: {config_entry.data.get(CONF_HOST, "NOT-CONFIGURED")}")
 
     else:
         # now we can attempt to initialize our coordinator with the data already read...
-        if not await coordinator.read_evcc_config_on_startup(hass):
-            _LOGGER.warning(f"async_setup_entry(): coordinator.read_evcc_config_on_startup() was not completed successfully - please enable debug-log option in order to find a posiible root cause.")
+        with setup_profiler.phase("read_evcc_config_on_startup"):
+            if not await coordinator.read_evcc_config_on_startup(hass):
+                _LOGGER.warning(f"async_setup_entry(): coordinator.read_evcc_config_on_startup() was not completed successfully - please enable debug-log option in order to find a posiible root cause.")
 
         # then we can start the entity registrations...
         hass.data[DOMAIN][config_entry.entry_id] = coordinator
-        await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+        with setup_profiler.phase("platform_setup"):
+            await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
         # initialize our service...
         evcc_services = EvccService(hass, config_entry, coordinator)
@@ -205,6 +258,19 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
 
         config_entry.async_on_unload(config_entry.add_update_listener(entry_update_listener))
 
+        # the last known data is persisted periodically & when hass is stopping
+        async def _save_warm_start(now=None):
+            if not coordinator.bridge.data_is_warm_start:
+                await warm_start.async_save(coordinator.bridge._data)
+
+        @callback
+        def _save_warm_start_on_stop(event: Event):
+            if not coordinator.bridge.data_is_warm_start:
+                warm_start.async_save_on_final_write(coordinator.bridge._data)
+
+        config_entry.async_on_unload(async_track_time_interval(hass, _save_warm_start, WARM_START_SAVE_INTERVAL))
+        config_entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _save_warm_start_on_stop))
+
         # async def delayed_startup_logic(hass):
         #     _LOGGER.debug(f"delayed_startup_logic(): STARTING delayed_startup_logic... [will wait another 30sec...]")
         #     await asyncio.sleep(30)
@@ -214,6 +280,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
         # async_at_start(hass, delayed_startup_logic)
 
         # ok we are done...
+        setup_profiler.complete()
         _LOGGER.debug(f"async_setup_entry(): completed successfully for entry: {config_entry.entry_id}")
         return True
 
@@ -225,6 +292,8 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         if DOMAIN in hass.data and config_entry.entry_id in hass.data[DOMAIN]:
             coordinator = hass.data[DOMAIN][config_entry.entry_id]
             coordinator.stop_watchdog()
+            if coordinator.warm_start is not None and not coordinator.bridge.data_is_warm_start:
+                await coordinator.warm_start.async_save(coordinator.bridge._data)
             coordinator.clear_data()
             try:
                 coordinator._http_session.detach()
@@ -240,6 +309,11 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    # the last known data of a removed config entry is not needed anymore
+    await EvccWarmStartStore(hass, config_entry.entry_id).async_remove()
+
+
 async def entry_update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Update the configuration of the host entity."""
     _LOGGER.debug(f"entry_update_listener() called for entry: {config_entry.entry_id}")
@@ -265,12 +339,11 @@ async def async_remove_config_entry_device(hass: HomeAssistant, config_entry: Co
 
 
 @staticmethod
-async def check_evcc_is_available(http_session: aiohttp.ClientSession, config_entry: ConfigEntry) -> None:
+async def check_evcc_is_available(http_session: aiohttp.ClientSession, config_entry: ConfigEntry) -> dict | None:
     a_host = config_entry.data.get(CONF_HOST, "NOT-CONFIGURED")
     try:
         bridge = EvccApiBridge(host=a_host, web_session=http_session)
-        await bridge.is_evcc_available()
-        return True
+        return await bridge.is_evcc_available()
 
     except BaseException as err:
         raise ConfigEntryNotReady(f"evcc instance '{a_host}' not available (yet) - HA will keep trying") from err
@@ -345,6 +418,27 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
         self._request_ext_vehicle_data_interval = config_entry.data.get(CONF_EXTENDED_VEHICLE_DATA_INTERVAL, 3600)
         self._request_ext_meter_data = config_entry.data.get(CONF_EXTENDED_METER_DATA, False)
         self._request_ext_meter_data_interval = config_entry.data.get(CONF_EXTENDED_METER_DATA_INTERVAL, 3600)
+        self._import_session_statistics = config_entry.data.get(CONF_IMPORT_SESSION_STATISTICS, False)
+        self._session_statistics_task = None
+        self._cheapest_window_hours = config_entry.data.get(CONF_CHEAPEST_WINDOW_HOURS, 3)
+        self._forecast_analytics_cache = None
+        self._evopt_series = None
+        self._evopt_attribute_max_points = config_entry.data.get(CONF_EVOPT_ATTRIBUTE_MAX_POINTS, 96)
+        # how many coordinator updates resulted in a state write (or have been skipped) - see diagnostics
+        self.state_write_stats = {"written": 0, "suppressed_unchanged_state": 0, "skipped_unchanged_data": 0}
+        # the sensors that have been created and the (registered but disabled) ones that have not
+        # been created during the last setup of the sensor platform (part of the diagnostics)
+        self.sensor_setup_stats = {"created": 0, "skipped_disabled": 0, "setup_ms": None}
+        # will be replaced in async_setup_entry() (when the setup profiling is enabled)
+        self.setup_profiler = SetupProfiler()
+        # the store of the last known data & when the data (we started with) has been saved
+        self.warm_start = None
+        self.warm_start_saved_at = None
+        self.warm_start_served_since = None
+        # the 'last_update_success' when the listeners have been notified the last time (when
+        # it toggles, all listeners must be notified - since the availability has changed)
+        self._notified_update_success = None
+        self._forecast_attribute_mode = config_entry.data.get(CONF_FORECAST_ATTRIBUTE_MODE, FORECAST_ATTRIBUTE_MODE_COMPRESSED)
 
         self.bridge = EvccApiBridge(host=config_entry.data.get(CONF_HOST, "NOT-CONFIGURED"),
                                     web_session=http_session,
@@ -369,6 +463,9 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
         self._currency = "€"
         self._device_info_dict = {}
         self._device_info_show_ws_state = False
+        # increased, when the loadpoint/vehicle configuration (and so the device info of the
+        # entities) has been changed
+        self._device_info_generation = 0
         self._circuit = {}
         self._loadpoint = {}
         self._vehicle = {}
@@ -389,6 +486,16 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
         # a global store for entities that we must manipulate later on...
         self.select_entities_dict = {}
 
+        # the parsed tariff/forecast payloads (shared by all sensors that read the same payload)
+        self._timeseries_index_cache = OrderedDict()
+        self._compressed_payload_cache = OrderedDict()
+
+        # the entities (tariff & forecast sensors) that must be updated at their next slot boundary
+        # (entity -> boundary timestamp)
+        self._slot_boundary_entities = {}
+        self._slot_boundary_ts = None
+        self._slot_boundary_unsub = None
+
         # just for internal usage...
         self._http_session = http_session
         self._cookie_path_on_fs = cookie_path
@@ -400,6 +507,154 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
             super().__init__(hass, _LOGGER, name=DOMAIN,
                              update_interval=timedelta(seconds=self._update_interval_in_seconds_from_config_entry))
 
+    def get_timeseries_index(self, data_list: list) -> TimeseriesSlotIndex:
+        # a new payload from evcc is always a new list object - so the identity of the list is
+        # our cache key (the index keeps a reference to the list, so the id can't be reused)
+        a_key = id(data_list)
+        an_index = self._timeseries_index_cache.get(a_key, None)
+        if an_index is None or an_index.data_list is not data_list:
+            an_index = TimeseriesSlotIndex(data_list)
+            self._timeseries_index_cache[a_key] = an_index
+        self._timeseries_index_cache.move_to_end(a_key)
+        # drop the indexes of outdated payloads
+        while len(self._timeseries_index_cache) > PAYLOAD_CACHE_MAX_SIZE:
+            self._timeseries_index_cache.popitem(last=False)
+        return an_index
+
+    def get_compressed_payload(self, data_list: list, compress_func):
+        # the compressed attribute representation only changes, when 'read_tariff_data' or the
+        # websocket has replaced the forecast/rates list - so we don't rebuild it with every
+        # coordinator update (same identity handling as in 'get_timeseries_index')
+        a_key = (id(data_list), compress_func)
+        cached = self._compressed_payload_cache.get(a_key, None)
+        if cached is None or cached[0] is not data_list:
+            cached = (data_list, compress_func(data_list))
+            self._compressed_payload_cache[a_key] = cached
+        self._compressed_payload_cache.move_to_end(a_key)
+        while len(self._compressed_payload_cache) > PAYLOAD_CACHE_MAX_SIZE:
+            self._compressed_payload_cache.popitem(last=False)
+        return cached[1]
+
+    def schedule_slot_boundary_update(self, an_entity, boundary_ts: float):
+        # the tariff/forecast sensors register themselves with the timestamp of their next slot
+        # boundary (the series can have different slot lengths, e.g. 15min & 1h) - we only run a
+        # single timer for the earliest of all boundaries
+        self._slot_boundary_entities[an_entity] = boundary_ts
+        self._arm_slot_boundary_timer()
+
+    def _arm_slot_boundary_timer(self):
+        if len(self._slot_boundary_entities) == 0:
+            return
+        next_boundary_ts = min(self._slot_boundary_entities.values())
+        if self._slot_boundary_ts is None or next_boundary_ts < self._slot_boundary_ts:
+            if self._slot_boundary_unsub is not None:
+                self._slot_boundary_unsub()
+            self._slot_boundary_ts = next_boundary_ts
+            self._slot_boundary_unsub = async_track_point_in_utc_time(self.hass, self._slot_boundary_reached,
+                                                                      datetime.fromtimestamp(next_boundary_ts, tz=timezone.utc))
+
+    @callback
+    def _slot_boundary_reached(self, now: datetime):
+        self._slot_boundary_unsub = None
+        self._slot_boundary_ts = None
+        # only the entities, that have reached their boundary, must be updated - the others keep
+        # their (later) boundary
+        now_ts = now.timestamp()
+        due_entities = [an_entity for an_entity, a_ts in self._slot_boundary_entities.items() if a_ts <= now_ts]
+        for an_entity in due_entities:
+            del self._slot_boundary_entities[an_entity]
+
+        _LOGGER.debug(f"_slot_boundary_reached(): updating {len(due_entities)} tariff/forecast entities ({len(self._slot_boundary_entities)} still pending)")
+        for an_entity in due_entities:
+            # writing the state will read the new slot value (and register the entity again)
+            if an_entity.hass is not None and an_entity.enabled:
+                an_entity.async_write_ha_state()
+
+        self._arm_slot_boundary_timer()
+
+    def cancel_slot_boundary_timer(self):
+        if self._slot_boundary_unsub is not None:
+            self._slot_boundary_unsub()
+            self._slot_boundary_unsub = None
+        self._slot_boundary_ts = None
+        self._slot_boundary_entities = {}
+
+    def _grid_forecast_list(self):
+        # the grid forecast (evcc state/websocket) - or as fallback the rates of the grid tariff-api
+        a_forecast = self.data.get(Tag.FORECAST_GRID.json_key, None)
+        if isinstance(a_forecast, dict) and isinstance(a_forecast.get(FORECAST_CONTENT.GRID.value, None), list):
+            return a_forecast[FORECAST_CONTENT.GRID.value]
+        a_tariff = self.read_tag_tariff(Tag.TARIFF_API_GRID)
+        if isinstance(a_tariff, dict) and isinstance(a_tariff.get("rates", None), list):
+            return a_tariff["rates"]
+        return None
+
+    def get_forecast_analytics(self) -> dict | None:
+        # calculated once per payload and slot (the remaining day changes with every passed slot)
+        data_list = self._grid_forecast_list() if self.data is not None else None
+        if data_list is None:
+            return None
+
+        now_ts = datetime.now(timezone.utc).timestamp()
+        an_index = self.get_timeseries_index(data_list)
+        cached = self._forecast_analytics_cache
+        if cached is not None and cached[0] is an_index and now_ts < cached[1]:
+            return cached[2]
+
+        day_end_ts = (dt_util.start_of_local_day() + timedelta(days=1)).timestamp()
+        analytics = calculate_forecast_analytics(an_index, now_ts, day_end_ts, self._cheapest_window_hours * 3600)
+
+        # valid till the end of the current slot (or the start of the next one)
+        a_value, start_ts, end_ts = an_index.slot_at(now_ts)
+        valid_until = end_ts if end_ts is not None else an_index.next_slot_at(now_ts)[1]
+        if valid_until is None or valid_until > day_end_ts:
+            valid_until = day_end_ts
+        analytics["valid_until"] = valid_until
+        self._forecast_analytics_cache = (an_index, valid_until, analytics)
+        return analytics
+
+    def get_evopt_series(self) -> EvoptSeries | None:
+        # the evopt block is parsed only, when the websocket (or a full read) has replaced one of
+        # its 'req', 'res' or 'details' objects
+        evopt = self.data.get(EP_TYPE.EVOPT.value, None) if self.data is not None else None
+        if not isinstance(evopt, dict):
+            self._evopt_series = None
+            return None
+        if self._evopt_series is None or not self._evopt_series.is_based_on(evopt):
+            self._evopt_series = EvoptSeries(evopt)
+        return self._evopt_series
+
+    def _evopt_downsample(self, values: list) -> dict:
+        a_values, a_bucket_size = downsample_bucket_mean(values, self._evopt_attribute_max_points)
+        return {"values": a_values, "bucket_size": a_bucket_size}
+
+    def get_evopt_attribute_values(self, values: list) -> dict:
+        # the (downsampled) evopt series for the entity attributes - calculated once per series
+        # object (same identity based caching as the compressed forecast attributes)
+        return self.get_compressed_payload(values, self._evopt_downsample)
+
+    def read_tag_evopt_summary(self, a_tag: Tag):
+        a_series = self.get_evopt_series()
+        if a_series is not None:
+            return a_series.summary.get(a_tag.json_key, None)
+        return None
+
+    def read_tag_forecast_analytics(self, a_tag: Tag):
+        analytics = self.get_forecast_analytics()
+        if analytics is not None:
+            return analytics.get(a_tag.json_key, None)
+        return None
+
+    def sessions_data_updated(self, sessions: list):
+        # called by the bridge, when new session data has been fetched from evcc
+        if self._import_session_statistics and self.hass is not None:
+            if self._session_statistics_task is None or self._session_statistics_task.done():
+                # deferred import - the recorder is only a (optional) 'after_dependency'
+                from .session_statistics import async_import_session_statistics
+                # the config entry owns the task - so it will be cancelled, when the entry is unloaded
+                self._session_statistics_task = self._config_entry.async_create_background_task(
+                    self.hass, async_import_session_statistics(self.hass, self, sessions), f"{DOMAIN}_import_session_statistics")
+
     # Callable[[Event], Any]
     def __call__(self, evt: Event) -> bool:
         _LOGGER.debug(f"Event arrived: {evt}")
@@ -486,6 +741,7 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
 
     def clear_data(self):
         _LOGGER.debug(f"clear_data called...")
+        self.cancel_slot_boundary_timer()
         self.bridge.clear_data()
         self.data.clear()
 
@@ -522,6 +778,9 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
             "sw_version": f"{self._version}",
             "model": None
         }
+        # only the main/site device information shows the connection status of a possible
+        # existing websocket connection
+        self._device_info_show_ws_state = self.use_ws
 
         # IF we have a evcc-admin password in our configuration, we can also take the config from the
         # bridge to the coordinator... [not so sure what we will do, when this configuration will not
@@ -624,6 +883,9 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
         else:
             _LOGGER.warning(f"read_evcc_config_on_startup(): NO 'loadpoints' found [{JSONKEY_LOADPOINTS}] in the evcc data: {initdata}")
 
+        # the loadpoint & vehicle configuration has been (re)loaded
+        self.invalidate_device_info()
+
         if "smartCostType" in initdata:
             self._cost_type = initdata["smartCostType"]
         else:
@@ -740,8 +1002,13 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
                     result = await self.bridge.read_all_data()
                     if result is not None:
                         _LOGGER.debug(f"number of fields after query: {len(result)}")
+                    if (result is None or len(result) == 0) and self.bridge.data_is_warm_start:
+                        # evcc is still not available - so we keep the last known data
+                        return self._warm_start_data()
                     return result
                 else:
+                    if self.bridge.data_is_warm_start:
+                        return self._warm_start_data()
                     return self.bridge._data
 
         except UpdateFailed as exception:
@@ -754,6 +1021,137 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.warning(f"UpdateFailed unexpected: {type(other)} - {other}")
             raise UpdateFailed() from other
 
+    @callback
+    def warm_start_expired(self, now=None):
+        if self.bridge.data_is_warm_start:
+            try:
+                self._warm_start_data()
+            except UpdateFailed as exception:
+                self.async_set_update_error(exception)
+
+    def _warm_start_data(self) -> dict:
+        # we don't want to show the last known data forever - so when evcc is still not available
+        # after WARM_START_MAX_SERVE_TIME, the entities become unavailable (till we get live data)
+        if self.warm_start_served_since is not None and dt_util.utcnow() - self.warm_start_served_since >= WARM_START_MAX_SERVE_TIME:
+            raise UpdateFailed(f"evcc is not available since {self.warm_start_served_since} - the last known data from {self.warm_start_saved_at} will not be used any longer")
+        return self.bridge._data
+
+    def compile_tag_reader(self, a_tag: Tag, idx: int = None, evcc_internal_id: str = None) -> Callable[[], Any]:
+        # for the plain (most common) LOADPOINTS, SITE & CIRCUITS tags, we create a specialized reader
+        # once per entity, so that reading the value is a direct dict/list access - all the other
+        # tags (vehicles, evopt, statistics, tariffs, ...) and the loadpoint tags with a value
+        # conversion, still use the generic read_tag()
+        json_key = a_tag.json_key
+        json_key_alias = a_tag.json_key_alias
+        subtype = a_tag.subtype
+
+        if a_tag.type == EP_TYPE.LOADPOINTS and idx is not None and a_tag not in [Tag.PLANTIME, Tag.EFFECTIVEPLANTIME, Tag.PLANPROJECTEDSTART, Tag.PLANPROJECTEDEND, Tag.PVREMAINING]:
+            lp_pos = idx - 1
+            def _read_loadpoint():
+                if self.data is None:
+                    return None
+                a_lp_list = self.data.get(JSONKEY_LOADPOINTS, None)
+                if a_lp_list is None or len(a_lp_list) <= lp_pos:
+                    return None
+                a_lp = a_lp_list[lp_pos]
+                value = a_lp.get(json_key, _NOT_PRESENT)
+                if value is _NOT_PRESENT:
+                    value = a_lp.get(json_key_alias, None) if json_key_alias is not None else None
+                # quick hack for subtype support
+                if subtype is not None and isinstance(value, dict):
+                    value = value.get(subtype, value)
+                return value
+            return _read_loadpoint
+
+        elif a_tag.type == EP_TYPE.SITE:
+            def _read_site():
+                if self.data is None:
+                    return None
+                value = self.data.get(json_key, _NOT_PRESENT)
+                if value is not _NOT_PRESENT:
+                    return value
+                if json_key_alias is not None and json_key_alias in self.data:
+                    return self.data[json_key_alias]
+                if subtype is not None:
+                    a_obj = self.data.get(subtype, None)
+                    if isinstance(a_obj, dict) and len(a_obj) > 0:
+                        value = a_obj.get(json_key, _NOT_PRESENT)
+                        if value is not _NOT_PRESENT:
+                            return value
+                        if json_key_alias is not None:
+                            return a_obj.get(json_key_alias, None)
+                return None
+            return _read_site
+
+        elif a_tag.type == EP_TYPE.CIRCUITS and idx is not None:
+            def _read_circuit():
+                if self.data is None:
+                    return None
+                return self.data.get(JSONKEY_CIRCUITS, {}).get(idx, {}).get(json_key, None)
+            return _read_circuit
+
+        return lambda: self.read_tag(a_tag, idx, evcc_internal_id)
+
+    def data_subtrees_for(self, a_tag: Tag, idx: int = None, evcc_internal_id: str = None) -> tuple | None:
+        # the parts of the data (see EvccApiBridge.data_generation_of()) a value of the tag depends
+        # on - None means, that it (might) depend on all the data
+        if evcc_internal_id is None:
+            if a_tag.type == EP_TYPE.LOADPOINTS and idx is not None:
+                return ((JSONKEY_LOADPOINTS, idx - 1),)
+            elif a_tag.type == EP_TYPE.SITE:
+                return tuple(a_key for a_key in [a_tag.json_key, a_tag.json_key_alias, a_tag.subtype] if a_key is not None)
+        return None
+
+    def listener_domains_for(self, a_tag: Tag, idx: int = None, evcc_internal_id: str = None) -> frozenset | None:
+        # the data domains (see EvccApiBridge.pop_changed_data_domains()) an entity of the tag
+        # depends on - the entity will only be notified, when one of these domains has been
+        # changed - None means, that the entity will be notified with every update
+        if a_tag is None:
+            return None
+        if a_tag.type == EP_TYPE.LOADPOINTS and idx is not None:
+            if a_tag == Tag.PVREMAINING:
+                return None
+            return frozenset([(JSONKEY_LOADPOINTS, idx - 1)])
+        elif a_tag.type == EP_TYPE.VEHICLES:
+            # 'vehicles' is the complete vehicles dict (that has been replaced)
+            if evcc_internal_id is not None:
+                return frozenset([JSONKEY_VEHICLES, (JSONKEY_VEHICLES, evcc_internal_id)])
+            elif idx is not None:
+                # the vehicle is selected via the loadpoint 'vehicleName'
+                return frozenset([JSONKEY_VEHICLES, DATA_DOMAIN_ANY_VEHICLE, (JSONKEY_LOADPOINTS, idx - 1)])
+            return frozenset([JSONKEY_VEHICLES, DATA_DOMAIN_ANY_VEHICLE])
+        elif a_tag.type in [EP_TYPE.SITE, EP_TYPE.STATISTICS, EP_TYPE.CIRCUITS]:
+            return frozenset([DATA_DOMAIN_SITE])
+        elif a_tag.type == EP_TYPE.TARIFF:
+            return frozenset([data_domain_of(ADDITIONAL_ENDPOINTS_DATA_TARIFF)])
+        elif a_tag.type == EP_TYPE.ANALYTICS:
+            return frozenset([data_domain_of(ADDITIONAL_ENDPOINTS_DATA_TARIFF), DATA_DOMAIN_SITE])
+        elif a_tag.type == EP_TYPE.SESSIONS:
+            if a_tag.subtype == SESSIONS_KEY_LIVE:
+                return frozenset([data_domain_of(ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS)])
+            return frozenset([data_domain_of(ADDITIONAL_ENDPOINTS_DATA_SESSIONS)])
+        elif a_tag.type == EP_TYPE.EVCCCONF:
+            return frozenset([data_domain_of(ADDITIONAL_ENDPOINTS_DATA_EVCCCONF)])
+        elif a_tag.type == EP_TYPE.EVOPT:
+            return frozenset([JSONKEY_EVOPT])
+        return None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        # instead of waking up every entity with every (websocket) update, we only notify the
+        # entities that are using data of one of the changed domains - the entities without a
+        # context (None) are always notified (they depend on all the data or on the time). When
+        # we don't know what has been changed (None or an empty set), all entities are notified
+        changed_domains = self.bridge.pop_changed_data_domains()
+        if not changed_domains or self._notified_update_success != self.last_update_success or not self.last_update_success:
+            self._notified_update_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or not context.isdisjoint(changed_domains):
+                update_callback()
+
     def read_tag(self, a_tag: Tag, idx: int = None, evcc_internal_id:str = None):
         ret = None
         if self.data is not None:
@@ -792,7 +1190,10 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
                             ret = a_obj[a_tag.json_key_alias]
 
             elif a_tag.type == EP_TYPE.EVOPT:
-                ret = self.data.get(EP_TYPE.EVOPT.value, {}).get(a_tag.json_key, None)
+                if a_tag.subtype == JSONKEY_EVOPT_SUMMARY:
+                    ret = self.read_tag_evopt_summary(a_tag=a_tag)
+                else:
+                    ret = self.data.get(EP_TYPE.EVOPT.value, {}).get(a_tag.json_key, None)
 
             elif a_tag.type == EP_TYPE.STATISTICS:
                 ret = self.read_tag_statistics(a_tag=a_tag)
@@ -800,6 +1201,9 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
             elif a_tag.type == EP_TYPE.TARIFF:
                 ret = self.read_tag_tariff(a_tag=a_tag)
 
+            elif a_tag.type == EP_TYPE.ANALYTICS:
+                ret = self.read_tag_forecast_analytics(a_tag=a_tag)
+
             elif a_tag.type == EP_TYPE.EVCCCONF:
                 ret = self.read_tag_configuration(a_tag=a_tag, config_device_identifier=None)
 
@@ -817,6 +1221,14 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
         return device_data.get(a_tag.subtype, {}).get(config_device_identifier.lower(), {}).get(a_tag.json_key, {}).get("value")
 
     def read_tag_tariff(self, a_tag: Tag):
+        # the entities read through the forecast cache - independent of its age (the polled kinds
+        # are refreshed by the bridge) but never a payload, where all slots are in the past
+        an_entry = self.bridge.forecast_cache.get(a_tag.json_key)
+        if an_entry is not None:
+            if an_entry.valid_until is not None and datetime.now(timezone.utc).timestamp() >= an_entry.valid_until:
+                return None
+            return an_entry.data
+
         if ADDITIONAL_ENDPOINTS_DATA_TARIFF in self.data:
             if a_tag.json_key in self.data[ADDITIONAL_ENDPOINTS_DATA_TARIFF]:
                 return self.data[ADDITIONAL_ENDPOINTS_DATA_TARIFF][a_tag.json_key]
@@ -824,6 +1236,19 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
                 return self.data[ADDITIONAL_ENDPOINTS_DATA_TARIFF][a_tag.json_key_alias]
 
     def read_tag_sessions(self, a_tag: Tag, additional_key: str = None):
+        if a_tag.subtype == SESSIONS_KEY_LIVE:
+            # the live estimation of the currently running session (keyed by the loadpoint title)
+            if ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS in self.data:
+                a_dict = self.data[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]
+                if additional_key is None and len(a_dict) == 1:
+                    # single loadpoint setup - no name addon is used
+                    additional_key = next(iter(a_dict))
+                if additional_key is not None and additional_key in a_dict:
+                    return a_dict[additional_key].get(a_tag.json_key, None)
+                # no session running at this loadpoint
+                return 0
+            return None
+
         if ADDITIONAL_ENDPOINTS_DATA_SESSIONS in self.data:
             if a_tag == Tag.CHARGING_SESSIONS:
                 return self.data[ADDITIONAL_ENDPOINTS_DATA_SESSIONS]
@@ -1073,6 +1498,7 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
             if a_tag.type == EP_TYPE.SITE:
                 if a_tag.json_key in self.data:
                     self.data[a_tag.json_key] = value
+                    self.bridge._mark_data_changed(a_tag.json_key)
 
             elif a_tag.type == EP_TYPE.LOADPOINTS:
                 if idx_str is not None:
@@ -1084,6 +1510,7 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
                                 lp_data_at_index[a_tag.json_key][a_tag.subtype] = value
                             else:
                                 lp_data_at_index[a_tag.json_key] = value
+                            self.bridge._mark_data_changed((JSONKEY_LOADPOINTS, idx - 1))
 
             elif a_tag.type == EP_TYPE.VEHICLES:
                 # TODO ?!
@@ -1092,6 +1519,8 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
 
         if the_entity is not None and not self.bridge.ws_connected:
             _LOGGER.debug(f"schedule update...")
+            # the other entities, that are using the patched data, must be updated as well
+            self.async_update_listeners()
             the_entity.async_schedule_update_ha_state(force_refresh=True)
 
         return result
@@ -1139,6 +1568,33 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
     def device_info_dict(self) -> dict:
         return self._device_info_dict
 
+    def invalidate_device_info(self):
+        self._device_info_generation += 1
+
+    def disabled_unique_ids(self, entity_type: str) -> set:
+        # the unique_ids of the (already registered) entities of the platform, that are disabled
+        # (by the user or by the integration) - such entities will not be added to hass anyhow, so
+        # we don't create them at all - when an entity will be enabled again, hass will reload the
+        # config entry (and then the entity will be created)
+        registry = entity_registry.async_get(self.hass)
+        return {an_entry.unique_id for an_entry in entity_registry.async_entries_for_config_entry(registry, self._config_entry.entry_id)
+                if an_entry.domain == entity_type and an_entry.disabled_by is not None}
+
+    def unique_id_for(self, description_key: str) -> str:
+        # must match EvccBaseEntity.unique_id (which is based on the entity_id, that is created
+        # in the EvccBaseEntity constructor)
+        return f"{DOMAIN}.{self.system_id}_{camel_to_snake(description_key)}".lower()
+
+    def device_info_key(self) -> tuple:
+        # the entities cache their resolved device info with this key - the meter device names
+        # depend on the (re)loaded meter configuration (the few meter name -> type entries)
+        meter_types = None
+        if self.data is not None:
+            meter_config_data = self.data.get(ADDITIONAL_ENDPOINTS_DATA_EVCCCONF, {}).get(EVCCCONF_KEY_CONFIG, {}).get(EVCCCONF_DEVICE_TYPES.METER.value, None)
+            if isinstance(meter_config_data, dict):
+                meter_types = tuple(sorted((str(a_name), str(a_type)) for a_name, a_type in meter_config_data.items()))
+        return self._device_info_generation, meter_types
+
     def device_info_dict_for_loadpoint(self, addon: str, is_lp_disabled: bool | None= False) -> dict:
         # check also 'read_evcc_config_on_startup' where we create the default device_info_dict
         unique_device_id = slugify(f"did_{self._config_entry.data.get(CONF_HOST)}_{addon}")
@@ -1205,16 +1661,43 @@ class EvccDataUpdateCoordinator(DataUpdateCoordinator):
     def battery_data_as_object(self) -> bool:
         return self._battery_data_as_object
 
+class _SameObject:
+    # a (large) attribute container in the state fingerprint - it's compared by identity and the
+    # reference keeps the object alive (so its id can't be reused by a new container)
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __eq__(self, other):
+        return isinstance(other, _SameObject) and other.obj is self.obj
+
+    __hash__ = None
+
+
 class EvccBaseEntity(CustomFriendlyNameEntity):
     _attr_has_entity_name = True
     _attr_name_addon = None
 
     def __init__(self, entity_type:str, coordinator: EvccDataUpdateCoordinator, description: EntityDescription) -> None:
-        super().__init__(coordinator)
+        # the sensors only depend on the data domain of their tag - all the other platforms might
+        # use additional data (e.g. options or limits) so they are notified with every update
+        if entity_type in [Platform.SENSOR, Platform.BINARY_SENSOR] and hasattr(description, "tag"):
+            context = coordinator.listener_domains_for(description.tag,
+                                                       description.lp_idx if hasattr(description, "lp_idx") else None,
+                                                       description.evcc_internal_id if hasattr(description, "evcc_internal_id") else None)
+        else:
+            context = None
+        super().__init__(coordinator, context)
+        coordinator.setup_profiler.entity_created(entity_type)
+        self._last_written_fingerprint = None
+        self._device_info_cache = None
         self.tag = description.tag if hasattr(description, "tag") else None
         self.lp_idx = description.lp_idx if hasattr(description, "lp_idx") else None
         self.evcc_internal_id = description.evcc_internal_id if hasattr(description, "evcc_internal_id") else None
         self._attr_name_addon = description.name_addon if hasattr(description, "name_addon") else None
+        # the part of the data, the (large) attribute containers of the entity are based on
+        self._fingerprint_subtrees = coordinator.data_subtrees_for(self.tag, self.lp_idx, self.evcc_internal_id) if self.tag is not None else None
 
         if hasattr(description, "translation_key") and description.translation_key is not None:
             self._attr_translation_key = description.translation_key.lower()
@@ -1233,6 +1716,58 @@ class EvccBaseEntity(CustomFriendlyNameEntity):
         self.coordinator = coordinator
         self.entity_id = f"{entity_type}.{self.coordinator.system_id}_{camel_to_snake(description.key)}".lower()
 
+    def _attributes_key(self, attributes: dict | None):
+        # a cheap key of an attribute dict: the plain values and the small lists/dicts (e.g. the
+        # repeating plans) by their value - the large ones (forecasts, evopt series, sessions)
+        # by their identity plus the generation of the data the entity depends on (so a
+        # container that has been modified in place is detected too)
+        if attributes is None:
+            return None
+        a_key = []
+        has_large_container = False
+        for a_name, a_value in attributes.items():
+            if isinstance(a_value, (list, dict)):
+                if len(a_value) > ATTRIBUTE_VALUE_COMPARE_MAX_LEN:
+                    has_large_container = True
+                    a_value = _SameObject(a_value)
+                else:
+                    a_value = repr(a_value)
+            a_key.append((a_name, a_value))
+        if has_large_container:
+            a_key.append(self.coordinator.bridge.data_generation_of(self._fingerprint_subtrees))
+        return tuple(a_key)
+
+    def _state_fingerprint(self):
+        # everything that ends up in the state object (apart from the static name & unit) - without
+        # serializing the (possibly large) attribute payloads
+        try:
+            return (self.available, self.state, self.icon,
+                    self._attributes_key(self.extra_state_attributes),
+                    self._attributes_key(self.state_attributes),
+                    self._attributes_key(self.capability_attributes))
+        except BaseException as exc:
+            _LOGGER.debug(f"_state_fingerprint(): {self.entity_id} caused {type(exc).__name__} - {exc}")
+            return None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # the coordinator informs ALL entities with every update - but we only write the state,
+        # when the state (or the attributes) of this entity have been changed
+        a_fingerprint = self._state_fingerprint()
+        if a_fingerprint is not None and a_fingerprint == self._last_written_fingerprint:
+            self.coordinator.state_write_stats["suppressed_unchanged_state"] += 1
+            return
+        super()._handle_coordinator_update()
+        self.coordinator.state_write_stats["written"] += 1
+        self._last_written_fingerprint = a_fingerprint
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        # a state write that is not triggered by the coordinator (e.g. after a slot boundary or a
+        # value has been set) - so our fingerprint is not valid any longer
+        self._last_written_fingerprint = None
+        super().async_write_ha_state()
+
     def _name_internal(self, device_class_name: str | None, platform_translations: dict[str, Any]) -> str | UndefinedType | None:
         tmp = super()._name_internal(device_class_name, platform_translations)
         if tmp is not None and "@@@" in tmp:
@@ -1244,6 +1779,13 @@ class EvccBaseEntity(CustomFriendlyNameEntity):
 
     @property
     def device_info(self) -> dict:
+        # resolved once per entity (and again after the loadpoint/vehicle configuration was changed)
+        a_key = self.coordinator.device_info_key()
+        if self._device_info_cache is None or self._device_info_cache[0] != a_key:
+            self._device_info_cache = (a_key, self._resolve_device_info())
+        return self._device_info_cache[1]
+
+    def _resolve_device_info(self) -> dict:
         is_lp_disabled = None
         if self.lp_idx is not None and str(self.lp_idx) in self.coordinator._loadpoint:
             is_lp_disabled = self.coordinator._loadpoint[str(self.lp_idx)]["is_disabled"]
@@ -1277,9 +1819,6 @@ class EvccBaseEntity(CustomFriendlyNameEntity):
             if self.tag.type is not EP_TYPE.CIRCUITS:
                 return self.coordinator.device_info_dict_for_loadpoint(self._attr_name_addon, is_lp_disabled=is_lp_disabled)
 
-        # only the main/site device information should show the connection status of a
-        # possible existing websocket connection
-        self.coordinator._device_info_show_ws_state = self.coordinator.use_ws
         return self.coordinator.device_info_dict
 
     @property
@@ -106,6 +106,9 @@ class EvccBinarySensor(EvccBaseEntity, BinarySensorEntity):
 
     @property
     def is_on(self) -> bool | None:
+        if self.tag == Tag.DATASTALE:
+            return self.coordinator.bridge.data_is_warm_start
+
         try:
             if self.tag == Tag.PLANACTIVEALT:
                 # here we have a special implementation, since the attribute will not be provided via the API (yet)
@@ -138,6 +141,13 @@ class EvccBinarySensor(EvccBaseEntity, BinarySensorEntity):
 
         return value
 
+    @property
+    def extra_state_attributes(self):
+        """Return binary_sensor attributes"""
+        if self.tag == Tag.DATASTALE and self.coordinator.bridge.data_is_warm_start and self.coordinator.warm_start_saved_at is not None:
+            return {"data_saved_at": self.coordinator.warm_start_saved_at.isoformat()}
+        return None
+
     @property
     def icon(self):
         """Return the icon of the sensor."""
@@ -19,6 +19,13 @@ from .const import (
     CONF_EXTENDED_VEHICLE_DATA_INTERVAL,
     CONF_EXTENDED_METER_DATA,
     CONF_EXTENDED_METER_DATA_INTERVAL,
+    CONF_IMPORT_SESSION_STATISTICS,
+    CONF_CHEAPEST_WINDOW_HOURS,
+    CONF_FORECAST_ATTRIBUTE_MODE,
+    CONF_EVOPT_ATTRIBUTE_MAX_POINTS,
+    CONF_PROFILE_SETUP,
+    FORECAST_ATTRIBUTE_MODE_COMPRESSED,
+    FORECAST_ATTRIBUTE_MODES,
     CONFIG_VERSION,
     CONFIG_MINOR_VERSION
 )
@@ -34,6 +41,11 @@ DEFAULT_EXTENDED_VEHICLE_DATA: Final = False
 DEFAULT_EXTENDED_VEHICLE_DATA_INTERVAL: Final = 3600
 DEFAULT_EXTENDED_METER_DATA: Final = False
 DEFAULT_EXTENDED_METER_DATA_INTERVAL: Final = 3600
+DEFAULT_IMPORT_SESSION_STATISTICS: Final = False
+DEFAULT_CHEAPEST_WINDOW_HOURS: Final = 3
+DEFAULT_FORECAST_ATTRIBUTE_MODE: Final = FORECAST_ATTRIBUTE_MODE_COMPRESSED
+DEFAULT_EVOPT_ATTRIBUTE_MAX_POINTS: Final = 96
+DEFAULT_PROFILE_SETUP: Final = False
 
 class EvccFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for evcc_intg."""
@@ -55,6 +67,11 @@ class EvccFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self._default_extended_vehicle_data_interval = DEFAULT_EXTENDED_VEHICLE_DATA_INTERVAL
         self._default_extended_meter_data = DEFAULT_EXTENDED_METER_DATA
         self._default_extended_meter_data_interval = DEFAULT_EXTENDED_METER_DATA_INTERVAL
+        self._default_import_session_statistics = DEFAULT_IMPORT_SESSION_STATISTICS
+        self._default_cheapest_window_hours = DEFAULT_CHEAPEST_WINDOW_HOURS
+        self._default_forecast_attribute_mode = DEFAULT_FORECAST_ATTRIBUTE_MODE
+        self._default_evopt_attribute_max_points = DEFAULT_EVOPT_ATTRIBUTE_MAX_POINTS
+        self._default_profile_setup = DEFAULT_PROFILE_SETUP
         self._need_purge_all_list = None
 
     async def async_step_reconfigure(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
@@ -69,6 +86,11 @@ class EvccFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self._default_extended_vehicle_data_interval = entry_data.get(CONF_EXTENDED_VEHICLE_DATA_INTERVAL, DEFAULT_EXTENDED_VEHICLE_DATA_INTERVAL)
         self._default_extended_meter_data = entry_data.get(CONF_EXTENDED_METER_DATA, DEFAULT_EXTENDED_METER_DATA)
         self._default_extended_meter_data_interval = entry_data.get(CONF_EXTENDED_METER_DATA_INTERVAL, DEFAULT_EXTENDED_METER_DATA_INTERVAL)
+        self._default_import_session_statistics = entry_data.get(CONF_IMPORT_SESSION_STATISTICS, DEFAULT_IMPORT_SESSION_STATISTICS)
+        self._default_cheapest_window_hours = entry_data.get(CONF_CHEAPEST_WINDOW_HOURS, DEFAULT_CHEAPEST_WINDOW_HOURS)
+        self._default_forecast_attribute_mode = entry_data.get(CONF_FORECAST_ATTRIBUTE_MODE, DEFAULT_FORECAST_ATTRIBUTE_MODE)
+        self._default_evopt_attribute_max_points = entry_data.get(CONF_EVOPT_ATTRIBUTE_MAX_POINTS, DEFAULT_EVOPT_ATTRIBUTE_MAX_POINTS)
+        self._default_profile_setup = entry_data.get(CONF_PROFILE_SETUP, DEFAULT_PROFILE_SETUP)
         self._need_purge_all_list = [self._default_extended_vehicle_data, self._default_extended_meter_data]
         return await self.async_step_user()
 
@@ -95,6 +117,10 @@ class EvccFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
                 user_input[ATTR_SW_VERSION] = self._version
                 user_input[CONF_SCAN_INTERVAL] = max(5, user_input[CONF_SCAN_INTERVAL])
+                user_input[CONF_CHEAPEST_WINDOW_HOURS] = min(max(1, user_input.get(CONF_CHEAPEST_WINDOW_HOURS, DEFAULT_CHEAPEST_WINDOW_HOURS)), 24)
+                # 0 = no downsampling (full resolution) - otherwise at least 8 points
+                a_max_points = max(0, user_input.get(CONF_EVOPT_ATTRIBUTE_MAX_POINTS, DEFAULT_EVOPT_ATTRIBUTE_MAX_POINTS))
+                user_input[CONF_EVOPT_ATTRIBUTE_MAX_POINTS] = max(8, a_max_points) if a_max_points > 0 else 0
 
                 # make sure that we have either a stipped pwd (with len > 0) in our config or NONE
                 if user_input.get(CONF_PASSWORD, None) is not None:
@@ -134,6 +160,11 @@ class EvccFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             user_input[CONF_EXTENDED_VEHICLE_DATA_INTERVAL] = self._default_extended_vehicle_data_interval
             user_input[CONF_EXTENDED_METER_DATA] = self._default_extended_meter_data
             user_input[CONF_EXTENDED_METER_DATA_INTERVAL] = self._default_extended_meter_data_interval
+            user_input[CONF_IMPORT_SESSION_STATISTICS] = self._default_import_session_statistics
+            user_input[CONF_CHEAPEST_WINDOW_HOURS] = self._default_cheapest_window_hours
+            user_input[CONF_FORECAST_ATTRIBUTE_MODE] = self._default_forecast_attribute_mode
+            user_input[CONF_EVOPT_ATTRIBUTE_MAX_POINTS] = self._default_evopt_attribute_max_points
+            user_input[CONF_PROFILE_SETUP] = self._default_profile_setup
             user_input[CONF_PURGE_ALL] = False
 
         return self.async_show_form(
@@ -148,6 +179,11 @@ class EvccFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional(CONF_EXTENDED_VEHICLE_DATA_INTERVAL, default=user_input.get(CONF_EXTENDED_VEHICLE_DATA_INTERVAL)): int,
                 vol.Optional(CONF_EXTENDED_METER_DATA, default=user_input.get(CONF_EXTENDED_METER_DATA)): bool,
                 vol.Optional(CONF_EXTENDED_METER_DATA_INTERVAL, default=user_input.get(CONF_EXTENDED_METER_DATA_INTERVAL)): int,
+                vol.Optional(CONF_IMPORT_SESSION_STATISTICS, default=user_input.get(CONF_IMPORT_SESSION_STATISTICS, DEFAULT_IMPORT_SESSION_STATISTICS)): bool,
+                vol.Optional(CONF_CHEAPEST_WINDOW_HOURS, default=user_input.get(CONF_CHEAPEST_WINDOW_HOURS, DEFAULT_CHEAPEST_WINDOW_HOURS)): int,
+                vol.Optional(CONF_FORECAST_ATTRIBUTE_MODE, default=user_input.get(CONF_FORECAST_ATTRIBUTE_MODE, DEFAULT_FORECAST_ATTRIBUTE_MODE)): vol.In(FORECAST_ATTRIBUTE_MODES),
+                vol.Optional(CONF_EVOPT_ATTRIBUTE_MAX_POINTS, default=user_input.get(CONF_EVOPT_ATTRIBUTE_MAX_POINTS, DEFAULT_EVOPT_ATTRIBUTE_MAX_POINTS)): int,
+                vol.Optional(CONF_PROFILE_SETUP, default=user_input.get(CONF_PROFILE_SETUP, DEFAULT_PROFILE_SETUP)): bool,
                 vol.Required(CONF_INCLUDE_EVCC, default=user_input.get(CONF_INCLUDE_EVCC)): bool,
                 vol.Optional(CONF_PURGE_ALL, default=user_input.get(CONF_PURGE_ALL)): bool,
             }),
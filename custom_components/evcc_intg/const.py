@@ -60,6 +60,17 @@ CONF_EXTENDED_VEHICLE_DATA: Final = "extended_vehicle_data"
 CONF_EXTENDED_VEHICLE_DATA_INTERVAL: Final = "extended_vehicle_data_interval"
 CONF_EXTENDED_METER_DATA: Final = "extended_meter_data"
 CONF_EXTENDED_METER_DATA_INTERVAL: Final = "extended_meter_data_interval"
+CONF_IMPORT_SESSION_STATISTICS: Final = "import_session_statistics"
+CONF_CHEAPEST_WINDOW_HOURS: Final = "cheapest_window_hours"
+CONF_FORECAST_ATTRIBUTE_MODE: Final = "forecast_attribute_mode"
+CONF_EVOPT_ATTRIBUTE_MAX_POINTS: Final = "evopt_attribute_max_points"
+CONF_PROFILE_SETUP: Final = "profile_setup"
+
+# how the (large) tariff/forecast series are provided as sensor attributes
+FORECAST_ATTRIBUTE_MODE_COMPRESSED: Final = "compressed"
+FORECAST_ATTRIBUTE_MODE_PACKED: Final = "packed"
+FORECAST_ATTRIBUTE_MODE_NONE: Final = "none"
+FORECAST_ATTRIBUTE_MODES: Final = [FORECAST_ATTRIBUTE_MODE_COMPRESSED, FORECAST_ATTRIBUTE_MODE_PACKED, FORECAST_ATTRIBUTE_MODE_NONE]
 
 EVCC_JSON_KEY_NAME: Final = "evccName"
 EVCC_JSON_ORIGIN_OBJECT = "originObject"
@@ -196,6 +207,14 @@ BINARY_ENTITIES = [
         entity_category=EntityCategory.DIAGNOSTIC,
         device_class=None
     ),
+    ExtBinarySensorEntityDescription(
+        tag=Tag.DATASTALE,
+        key=Tag.DATASTALE.entity_key,
+        icon="mdi:database-clock",
+        icon_off="mdi:database-check",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=None
+    ),
 ]
 BINARY_ENTITIES_PER_CIRCUIT = [
     ExtBinarySensorEntityDescriptionStub(
@@ -1392,6 +1411,56 @@ SENSOR_ENTITIES = [
         suggested_display_precision=3,
         entity_registry_enabled_default=False
     ),
+    # calculated from the grid forecast (or the grid tariff)
+    ExtSensorEntityDescription(
+        tag=Tag.FORECAST_GRID_REMAINING_DAY_AVG,
+        key=Tag.FORECAST_GRID_REMAINING_DAY_AVG.entity_key,
+        icon="mdi:cash-clock",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="@@@/kWh",
+        device_class=None,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescription(
+        tag=Tag.FORECAST_GRID_REMAINING_DAY_MIN,
+        key=Tag.FORECAST_GRID_REMAINING_DAY_MIN.entity_key,
+        icon="mdi:cash-minus",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="@@@/kWh",
+        device_class=None,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescription(
+        tag=Tag.FORECAST_GRID_REMAINING_DAY_MAX,
+        key=Tag.FORECAST_GRID_REMAINING_DAY_MAX.entity_key,
+        icon="mdi:cash-plus",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="@@@/kWh",
+        device_class=None,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescription(
+        tag=Tag.FORECAST_GRID_CHEAPEST_WINDOW_START,
+        key=Tag.FORECAST_GRID_CHEAPEST_WINDOW_START.entity_key,
+        icon="mdi:clock-star-four-points-outline",
+        state_class=None,
+        native_unit_of_measurement=None,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescription(
+        tag=Tag.FORECAST_GRID_CHEAPEST_WINDOW_AVG,
+        key=Tag.FORECAST_GRID_CHEAPEST_WINDOW_AVG.entity_key,
+        icon="mdi:cash-check",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="@@@/kWh",
+        device_class=None,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False
+    ),
     ExtSensorEntityDescription(
         tag=Tag.CHARGING_SESSIONS,
         key=Tag.CHARGING_SESSIONS.json_key,
@@ -1531,6 +1600,37 @@ SENSOR_ENTITIES = [
         suggested_display_precision=2,
         entity_registry_enabled_default=False
     ),
+    # calculated from the evopt result series
+    ExtSensorEntityDescription(
+        tag=Tag.EVOPT_NEXT_HOUR_GRID_IMPORT,
+        key=Tag.EVOPT_NEXT_HOUR_GRID_IMPORT.entity_key,
+        icon="mdi:transmission-tower-import",
+        state_class=None,
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescription(
+        tag=Tag.EVOPT_PEAK_BATTERY_POWER,
+        key=Tag.EVOPT_PEAK_BATTERY_POWER.entity_key,
+        icon="mdi:home-battery-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescription(
+        tag=Tag.EVOPT_TOTAL_GRID_EXPORT,
+        key=Tag.EVOPT_TOTAL_GRID_EXPORT.entity_key,
+        icon="mdi:transmission-tower-export",
+        state_class=None,
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False
+    ),
 ]
 SENSOR_ENTITIES_PER_LOADPOINT = [
 
@@ -1915,6 +2015,35 @@ SENSOR_ENTITIES_PER_LOADPOINT = [
         suggested_display_precision=1,
         entity_registry_enabled_default=True
     ),
+
+    # live estimation of the currently running session per LOADPOINT
+    ExtSensorEntityDescriptionStub(
+        tag=Tag.CHARGING_SESSIONS_LIVE_ENERGY,
+        icon="mdi:lightning-bolt-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        suggested_display_precision=2,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescriptionStub(
+        tag=Tag.CHARGING_SESSIONS_LIVE_COST,
+        icon="mdi:cash-multiple",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="@@@",
+        device_class=None,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False
+    ),
+    ExtSensorEntityDescriptionStub(
+        tag=Tag.CHARGING_SESSIONS_LIVE_SOLAR_PERCENTAGE,
+        icon="mdi:solar-power",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        device_class=None,
+        suggested_display_precision=1,
+        entity_registry_enabled_default=False
+    ),
 ]
 SENSOR_ENTITIES_PER_VEHICLE = [
     # charging session sensors's per VEHICLE
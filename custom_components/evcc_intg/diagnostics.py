@@ -35,6 +35,14 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry:
         coord_obj = {
             "last_update_success": coordinator.last_update_success,
             "update_interval": str(coordinator.update_interval),
+            "state_write_stats": dict(coordinator.state_write_stats),
+            "sensor_setup_stats": dict(coordinator.sensor_setup_stats),
+            "setup_profile": coordinator.setup_profiler.as_dict(),
+            "warm_start": {
+                "data_is_warm_start": coordinator.bridge.data_is_warm_start,
+                "saved_at": str(coordinator.warm_start_saved_at) if coordinator.warm_start_saved_at is not None else None,
+                "served_since": str(coordinator.warm_start_served_since) if coordinator.warm_start_served_since is not None else None,
+            },
             "data": async_redact_data(coordinator.data, TO_REDACT) if coordinator.data else None,
         }
     else:
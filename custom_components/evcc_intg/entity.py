@@ -2,6 +2,8 @@ import logging
 
 from awesomeversion import AwesomeVersion
 from homeassistant.const import ATTR_FRIENDLY_NAME, __version__ as HA_VERSION
+from homeassistant.core import Event, callback
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 USE_NEW_FRIENDLY_NAME = AwesomeVersion(HA_VERSION) >= AwesomeVersion("2026.2.0")
@@ -12,6 +14,35 @@ _LOGGER = logging.getLogger(__name__)
 
 class CustomFriendlyNameEntity(CoordinatorEntity):
 
+    # (include_evcc_prefix, friendly_name) - the friendly name only changes, when the device or the
+    # entity registry entry is updated (or the integration is reconfigured)
+    _friendly_name_cache = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_updated_for_friendly_name))
+
+    @callback
+    def _async_device_updated_for_friendly_name(self, event: Event) -> None:
+        if self.registry_entry is not None and event.data.get("device_id") == self.registry_entry.device_id:
+            self._friendly_name_cache = None
+
+    @callback
+    def async_registry_entry_updated(self) -> None:
+        self._friendly_name_cache = None
+        super().async_registry_entry_updated()
+
+    def _cached_friendly_name_internal(self):
+        include_evcc_prefix = getattr(self.coordinator, "include_evcc_prefix", None)
+        if self._friendly_name_cache is not None and self._friendly_name_cache[0] == include_evcc_prefix:
+            return self._friendly_name_cache[1]
+
+        custom_friendly_name = self._friendly_name_internal()
+        # as long as the entity is not registered, the device (name) might be still unknown
+        if self.hass is not None and self.registry_entry is not None:
+            self._friendly_name_cache = (include_evcc_prefix, custom_friendly_name)
+        return custom_friendly_name
+
     # This is a SYNCHRONOUS method that returns a tuple, not async!
     def _Entity__async_calculate_state(self):
         """Calculate state and override ATTR_FRIENDLY_NAME."""
@@ -27,7 +58,7 @@ class CustomFriendlyNameEntity(CoordinatorEntity):
             return result
 
         # Check if we have a cached friendly name that matches what we would generate
-        custom_friendly_name = self._friendly_name_internal()
+        custom_friendly_name = self._cached_friendly_name_internal()
 
         # Only modify if we have a custom name and it differs from cache
         if custom_friendly_name is not None:
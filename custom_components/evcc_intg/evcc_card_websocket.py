@@ -1,11 +1,16 @@
+import asyncio
 import logging
 from typing import Final
 
 import voluptuous as vol
 from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as config_val
+from homeassistant.util import dt as dt_util
 
+from custom_components.evcc_intg.pyevcc_ha import paginate_sessions, project_session_fields, pack_forecast, diff_forecast, PlanPreviewCache
 from . import EvccDataUpdateCoordinator
+from custom_components.evcc_intg.pyevcc_ha.const import PLAN_PREVIEW_DEBOUNCE_DELAY, EP_TYPE
 from .const import DOMAIN
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
@@ -19,9 +24,42 @@ _LOGGER: logging.Logger = logging.getLogger(__package__)
 # provided 'entry_id'.
 
 # advertised via the 'evcc_intg/capabilities' command - so a card can check what is supported
-SUPPORTED_COMMANDS: Final = ["forecast", "sessions", "plan_preview"]
+SUPPORTED_COMMANDS: Final = ["forecast", "subscribe_forecast", "sessions", "subscribe_sessions", "session_stats", "plan_preview", "evopt"]
 TARIFF_KINDS: Final = ["grid", "feedin", "solar", "planner"]
 PLAN_PREVIEW_KINDS: Final = ["soc", "energy"]
+FORECAST_ENCODINGS: Final = ["raw", "packed"]
+SESSION_STATS_PERIODS: Final = ["day", "week", "month"]
+SESSION_STATS_GROUPS: Final = ["vehicle", "loadpoint"]
+DEFAULT_SESSIONS_CHUNK_SIZE: Final = 50
+
+# the key of the pending (debounced) 'plan_preview' messages in 'hass.data' - per connection:
+# (entry_id, loadpoint) -> the id of the latest 'plan_preview' message
+PLAN_PREVIEW_PENDING_KEY: Final = "evcc_intg_plan_preview_pending"
+
+
+def _plan_preview_pending_for(hass: HomeAssistant, connection, msg_id: int) -> dict:
+    all_pending = hass.data.setdefault(PLAN_PREVIEW_PENDING_KEY, {})
+    a_pending = all_pending.get(connection, None)
+    if a_pending is None:
+        a_pending = {}
+        all_pending[connection] = a_pending
+
+        @callback
+        def _cleanup():
+            # called by hass when the connection is closed
+            all_pending.pop(connection, None)
+
+        connection.subscriptions[msg_id] = _cleanup
+    return a_pending
+
+# the (optional) filter, paging & projection arguments shared by the 'sessions' commands
+SESSION_QUERY_SCHEMA: Final = {
+    vol.Optional("year"): int,
+    vol.Optional("month"): int,
+    vol.Optional("start"): config_val.datetime,
+    vol.Optional("end"): config_val.datetime,
+    vol.Optional("fields"): [str],
+}
 
 
 def coordinator_for(hass: HomeAssistant, connection, msg) -> EvccDataUpdateCoordinator | None:
@@ -34,38 +72,230 @@ def coordinator_for(hass: HomeAssistant, connection, msg) -> EvccDataUpdateCoord
     return coordinator
 
 
+# with 'encoding: packed' the 'rates' list is replaced by a compact object (the same format is used
+# for the sensor attributes, when the 'packed' attribute mode is configured):
+#   {"encoding": "evcc-dod-v1", "t0": <first timestamp, epoch seconds>, "count": n, "scale": s, "data": "<base64>"}
+# 'data' is a sequence of zigzag encoded LEB128 varints: first the n-1 delta-of-delta timestamps (in
+# seconds, the delta before the first entry is 0), then the n deltas of the quantized values (the value
+# before the first entry is 0). Each value is 'quantized / scale'. Decoder (JavaScript):
+#
+#   function decodeForecast(p) {
+#     const bytes = Uint8Array.from(atob(p.data), c => c.charCodeAt(0));
+#     const ints = []; let cur = 0, mul = 1;
+#     for (const b of bytes) {
+#       cur += (b & 0x7f) * mul;
+#       if (b & 0x80) { mul *= 128; } else { ints.push(cur % 2 ? -(cur + 1) / 2 : cur / 2); cur = 0; mul = 1; }
+#     }
+#     const ts = [p.t0]; let delta = 0;
+#     for (let i = 0; i < p.count - 1; i++) { delta += ints[i]; ts.push(ts[i] + delta); }
+#     const out = []; let q = 0;
+#     for (let i = 0; i < p.count; i++) { q += ints[p.count - 1 + i]; out.push([ts[i], q / p.scale]); }
+#     return out;  // [[ts, value], ...]
+#   }
+#
+# (the python reference implementation is 'unpack_forecast()' in pyevcc_ha)
 @websocket_api.websocket_command({
     vol.Required("type"): "evcc_intg/forecast",
     vol.Required("entry_id"): str,
     vol.Required("kind"): vol.In(TARIFF_KINDS),
+    vol.Optional("encoding", default="raw"): vol.In(FORECAST_ENCODINGS),
+    vol.Optional("fetched_after"): config_val.datetime,
 })
 @websocket_api.async_response
 async def extension_forecast_data(hass: HomeAssistant, connection, msg):
+    # the response includes 'fetched_at', 'valid_until' & 'source' of the cached payload - a card can
+    # pass the last 'fetched_at' as 'fetched_after' and will then just get 'unchanged: true' (without
+    # the rates), when there is no newer payload
     coordinator = coordinator_for(hass, connection, msg)
     if coordinator is not None:
-        rates = await coordinator.bridge.evcc_card_read_tariff(msg["kind"])
+        an_entry = await coordinator.bridge.evcc_card_read_tariff_entry(msg["kind"])
+        rates = an_entry.data if an_entry is not None and isinstance(an_entry.data, dict) else {}
+        meta = an_entry.as_meta_dict() if an_entry is not None else {"fetched_at": None, "valid_until": None, "source": None}
+
+        if an_entry is not None and "fetched_after" in msg and an_entry.fetched_at <= dt_util.as_utc(msg["fetched_after"]).timestamp():
+            connection.send_result(msg["id"], {"kind": msg["kind"], "unchanged": True, **meta})
+            return
+
+        if msg["encoding"] == "packed" and isinstance(rates.get("rates", None), list):
+            rates = {**rates, "rates": coordinator.get_compressed_payload(rates["rates"], pack_forecast)}
         # the rates carry no unit field - tell the card whether the 'value' fields are a price
         # (currency/kWh) or CO2 (g/kWh, when smartCostType is 'co2'), same enrichment as ws_plan_preview
         connection.send_result(msg["id"], {
             "kind": msg["kind"],
             **rates,
+            **meta,
             "smartCostType": coordinator._cost_type,
             "currency": coordinator._currency,
         })
 
 
+def forecast_event_for(coordinator: EvccDataUpdateCoordinator, kind: str, an_entry, previous_entry, encoding: str) -> dict:
+    rates = an_entry.data.get("rates", None) if isinstance(an_entry.data, dict) else None
+    an_event = {"kind": kind, **an_entry.as_meta_dict()}
+    a_diff = None
+    if previous_entry is not None and isinstance(previous_entry.data, dict):
+        a_diff = diff_forecast(previous_entry.data.get("rates", None), rates)
+
+    if a_diff is not None:
+        an_event["update"] = "diff"
+        an_event.update(a_diff)
+    else:
+        an_event["update"] = "full"
+        if encoding == "packed" and isinstance(rates, list):
+            rates = coordinator.get_compressed_payload(rates, pack_forecast)
+        an_event["rates"] = rates if rates is not None else []
+    return an_event
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "evcc_intg/subscribe_forecast",
+    vol.Required("entry_id"): str,
+    vol.Required("kind"): vol.In(TARIFF_KINDS),
+    vol.Optional("encoding", default="raw"): vol.In(FORECAST_ENCODINGS),
+})
+@websocket_api.async_response
+async def extension_subscribe_forecast_data(hass: HomeAssistant, connection, msg):
+    # push mode (same pattern as the HA core history stream): after the result, the current series
+    # is sent as the first event ('update: full') - after that an event is only sent, when the
+    # bridge has fetched a changed payload for the 'kind'. Such an event is either 'full' (with the
+    # 'rates') or a 'diff' with 'upsert' (new/modified slots) & 'remove' (the 'start' of the
+    # dropped slots) - a diff is always against the series of the previous event. The diffs are
+    # never packed. The subscription ends with the usual 'unsubscribe_events'.
+    coordinator = coordinator_for(hass, connection, msg)
+    if coordinator is None:
+        return
+
+    msg_id = msg["id"]
+    kind = msg["kind"]
+    encoding = msg["encoding"]
+
+    # the initial series (from the cache or fetched on demand) - there is no 'await' between this
+    # and the listener registration, so the first pushed diff is always against this series
+    an_entry = await coordinator.bridge.evcc_card_read_tariff_entry(kind)
+
+    @callback
+    def _forecast_changed(a_kind: str, a_new_entry, previous_entry):
+        if a_kind == kind:
+            connection.send_message(websocket_api.event_message(msg_id,
+                forecast_event_for(coordinator, kind, a_new_entry, previous_entry, encoding)))
+
+    remove_listener = coordinator.bridge.forecast_cache.add_listener(_forecast_changed)
+    coordinator.bridge.add_forecast_subscription(kind)
+
+    @callback
+    def _unsubscribe():
+        remove_listener()
+        coordinator.bridge.remove_forecast_subscription(kind)
+
+    connection.subscriptions[msg_id] = _unsubscribe
+    connection.send_result(msg_id)
+    if an_entry is not None:
+        connection.send_message(websocket_api.event_message(msg_id,
+            forecast_event_for(coordinator, kind, an_entry, None, encoding)))
+
+
+async def read_sessions_for(coordinator: EvccDataUpdateCoordinator, msg) -> list:
+    # naive datetimes (without offset) provided by the card are treated as HA local time
+    start = dt_util.as_utc(msg["start"]) if "start" in msg else None
+    end = dt_util.as_utc(msg["end"]) if "end" in msg else None
+    return await coordinator.bridge.evcc_card_read_sessions_raw(msg.get("year", None), msg.get("month", None), start, end)
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): "evcc_intg/sessions",
     vol.Required("entry_id"): str,
+    **SESSION_QUERY_SCHEMA,
+    vol.Optional("limit"): vol.All(int, vol.Range(min=1)),
+    vol.Optional("after_id"): int,
+})
+@websocket_api.async_response
+async def extension_session_data(hass: HomeAssistant, connection, msg):
+    # without 'limit' the complete (filtered) list is returned (like before) - with 'limit' the card
+    # can page through the history by passing the returned 'next_after_id' as 'after_id'
+    coordinator = coordinator_for(hass, connection, msg)
+    if coordinator is not None:
+        sessions = await read_sessions_for(coordinator, msg)
+        page, next_after_id = paginate_sessions(sessions, msg.get("after_id", None), msg.get("limit", None))
+        connection.send_result(msg["id"], {
+            "sessions": project_session_fields(page, msg.get("fields", None)),
+            "total": len(sessions),
+            "next_after_id": next_after_id,
+        })
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "evcc_intg/subscribe_sessions",
+    vol.Required("entry_id"): str,
+    **SESSION_QUERY_SCHEMA,
+    vol.Optional("chunk_size", default=DEFAULT_SESSIONS_CHUNK_SIZE): vol.All(int, vol.Range(min=1)),
+})
+@websocket_api.async_response
+async def extension_subscribe_session_data(hass: HomeAssistant, connection, msg):
+    # chunked mode: instead of one (possibly huge) result frame, the (filtered) session list is
+    # streamed as a sequence of events with 'chunk_size' sessions each - the last event is flagged
+    # with 'done'. The card can unsubscribe at any time to stop the stream.
+    coordinator = coordinator_for(hass, connection, msg)
+    if coordinator is None:
+        return
+
+    sessions = await read_sessions_for(coordinator, msg)
+    msg_id = msg["id"]
+    chunk_size = msg["chunk_size"]
+    fields = msg.get("fields", None)
+
+    async def _stream():
+        total = len(sessions)
+        offset = 0
+        while True:
+            page = sessions[offset:offset + chunk_size]
+            offset += chunk_size
+            done = offset >= total
+            connection.send_message(websocket_api.event_message(msg_id, {
+                "sessions": project_session_fields(page, fields),
+                "total": total,
+                "done": done,
+            }))
+            if done:
+                connection.subscriptions.pop(msg_id, None)
+                break
+            # give the event loop (and the other websocket clients) a chance between the chunks
+            await asyncio.sleep(0)
+
+    task = None
+
+    @callback
+    def _unsubscribe():
+        if task is not None:
+            task.cancel()
+
+    # the result (and the subscription) must be in place, before the (eagerly started) stream
+    # sends its first event
+    connection.subscriptions[msg_id] = _unsubscribe
+    connection.send_result(msg_id)
+    task = hass.async_create_background_task(_stream(), f"evcc_intg_subscribe_sessions_{msg_id}")
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "evcc_intg/session_stats",
+    vol.Required("entry_id"): str,
+    vol.Optional("period", default="month"): vol.In(SESSION_STATS_PERIODS),
+    vol.Optional("group_by", default="vehicle"): vol.In(SESSION_STATS_GROUPS),
     vol.Optional("year"): int,
     vol.Optional("month"): int,
 })
 @websocket_api.async_response
-async def extension_session_data(hass: HomeAssistant, connection, msg):
+async def extension_session_stats(hass: HomeAssistant, connection, msg):
+    # server-side aggregation of the session history (per day/week/month and per vehicle or
+    # loadpoint) - so a card does not have to download the complete raw list via 'evcc_intg/sessions'
     coordinator = coordinator_for(hass, connection, msg)
     if coordinator is not None:
-        sessions = await coordinator.bridge.evcc_card_read_sessions_raw(msg.get("year", None), msg.get("month", None))
-        connection.send_result(msg["id"], {"sessions": sessions})
+        stats = await coordinator.bridge.evcc_card_read_session_stats(msg["period"], msg["group_by"], msg.get("year", None), msg.get("month", None))
+        connection.send_result(msg["id"], {
+            "period": msg["period"],
+            "group_by": msg["group_by"],
+            "stats": stats,
+            "currency": coordinator._currency,
+        })
 
 
 @websocket_api.websocket_command({
@@ -83,6 +313,21 @@ async def extension_plan_preview(hass: HomeAssistant, connection, msg):
         return
 
     lp_idx = str(msg["loadpoint"])
+
+    # debounce per card connection (& loadpoint): when the slider is dragged, only the last request
+    # within PLAN_PREVIEW_DEBOUNCE_DELAY is sent to evcc - the previous ones are answered with
+    # 'superseded: true'. Previews that are already cached are answered immediately.
+    a_key = PlanPreviewCache.key_for(lp_idx, msg["kind"], msg["value"], msg["timestamp"])
+    if a_key is None or not coordinator.bridge.plan_preview_cache.contains(a_key):
+        pending = _plan_preview_pending_for(hass, connection, msg["id"])
+        pending_key = (msg["entry_id"], lp_idx)
+        pending[pending_key] = msg["id"]
+        await asyncio.sleep(PLAN_PREVIEW_DEBOUNCE_DELAY)
+        if pending.get(pending_key, None) != msg["id"]:
+            connection.send_result(msg["id"], {"superseded": True})
+            return
+        pending.pop(pending_key, None)
+
     result = await coordinator.bridge.evcc_card_read_loadpoint_plan_static_preview(lp_idx, msg["kind"], msg["value"], msg["timestamp"])
 
     # enrich the raw evcc response with the cost type and currency so the card knows whether
@@ -92,6 +337,20 @@ async def extension_plan_preview(hass: HomeAssistant, connection, msg):
     connection.send_result(msg["id"], result)
 
 
+@websocket_api.websocket_command({
+    vol.Required("type"): "evcc_intg/evopt",
+    vol.Required("entry_id"): str,
+})
+@callback
+def extension_evopt_data(hass: HomeAssistant, connection, msg):
+    # the full resolution evopt block ('req', 'res' & 'details') - the sensor attributes only
+    # provide the downsampled series (when the optimizer horizon exceeds the configured max points)
+    coordinator = coordinator_for(hass, connection, msg)
+    if coordinator is not None:
+        evopt = coordinator.data.get(EP_TYPE.EVOPT.value, None) if coordinator.data is not None else None
+        connection.send_result(msg["id"], evopt if isinstance(evopt, dict) else {})
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): "evcc_intg/capabilities",
     vol.Optional("entry_id"): str,
@@ -126,6 +385,10 @@ def extension_capabilities(hass: HomeAssistant, connection, msg):
 @callback
 def async_register_evcc_card_websocket_commands(hass: HomeAssistant):
     websocket_api.async_register_command(hass, extension_forecast_data)
+    websocket_api.async_register_command(hass, extension_subscribe_forecast_data)
     websocket_api.async_register_command(hass, extension_session_data)
+    websocket_api.async_register_command(hass, extension_subscribe_session_data)
+    websocket_api.async_register_command(hass, extension_session_stats)
     websocket_api.async_register_command(hass, extension_plan_preview)
+    websocket_api.async_register_command(hass, extension_evopt_data)
     websocket_api.async_register_command(hass, extension_capabilities)
@@ -1,6 +1,9 @@
 import asyncio
+import base64
 import logging
 import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from json import JSONDecodeError
@@ -15,6 +18,10 @@ from homeassistant.util import dt as dt_util
 
 from custom_components.evcc_intg.pyevcc_ha.const import (
     MAX_WS_NEW_DATA_NOTIFICATION_DELAY,
+    SESSION_END_REFRESH_DELAY,
+    FORECAST_CACHE_MAX_AGE,
+    STATE_SNAPSHOT_MAX_AGE,
+    PLAN_PREVIEW_CACHE_SIZE,
     TRANSLATIONS,
     JSONKEY_LOADPOINTS,
     JSONKEY_VEHICLES,
@@ -24,7 +31,9 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     SESSIONS_KEY_TOTAL,
     SESSIONS_KEY_VEHICLES,
     SESSIONS_KEY_LOADPOINTS,
+    ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS,
     ADDITIONAL_ENDPOINTS_DATA_EVCCCONF,
+    JSONKEY_EVOPT,
     EVCCCONF_KEY_CONFIG,
     EVCCCONF_KEY_DATA,
     EVCCCONF_OBJECT_HIERARCHY,
@@ -32,6 +41,19 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     EVCCCONF_DEVICE_TYPES,
     EVCCCONF_SITE,
     EVCCCONF_LOADPOINTS,
+    JSONKEY_EVOPT_REQ,
+    JSONKEY_EVOPT_REQ_TIME_SERIES,
+    JSONKEY_EVOPT_REQ_TIME_SERIES_DT,
+    JSONKEY_EVOPT_RES,
+    JSONKEY_EVOPT_RES_BATTERIES,
+    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGING_POWER,
+    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_DISCHARGING_POWER,
+    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGED_TOTAL,
+    JSONKEY_EVOPT_RES_GRID_EXPORT,
+    JSONKEY_EVOPT_RES_GRID_IMPORT,
+    JSONKEY_EVOPT_DETAILS,
+    JSONKEY_EVOPT_DETAILS_BATTERYDETAILS,
+    JSONKEY_EVOPT_DETAILS_TIMESTAMP,
     EP_TYPE,
 )
 from custom_components.evcc_intg.pyevcc_ha.keys import Tag, IS_TRIGGER
@@ -43,6 +65,33 @@ static_30sec_timeout: Final = ClientTimeout(total=30)
 RAW_CLIENT_RESPONSE_KEY = "aiohttp.ClientResponse"
 ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW = f"{ADDITIONAL_ENDPOINTS_DATA_SESSIONS}@@@{SESSIONS_KEY_RAW}"
 
+# the (top-level) data keys, that have their own data domain - all other keys of the evcc
+# 'state' belong to the 'site' domain
+DATA_DOMAIN_SITE: Final = "site"
+DATA_DOMAIN_BY_KEY: Final = {
+    JSONKEY_VEHICLES: JSONKEY_VEHICLES,
+    JSONKEY_EVOPT: JSONKEY_EVOPT,
+    ADDITIONAL_ENDPOINTS_DATA_TARIFF: "tariff",
+    ADDITIONAL_ENDPOINTS_DATA_SESSIONS: "sessions",
+    ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW: "sessions",
+    ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS: "live_sessions",
+    ADDITIONAL_ENDPOINTS_DATA_EVCCCONF: "config",
+}
+
+# the domain of 'any single vehicle' - for the entities, that don't know their vehicle id (the
+# vehicle is selected via the loadpoint)
+DATA_DOMAIN_ANY_VEHICLE: Final = (JSONKEY_VEHICLES, None)
+
+def data_domain_of(subtree) -> str | tuple | None:
+    # a single loadpoint (the '(loadpoints, idx)' tuple) and a single vehicle (the '(vehicles, id)'
+    # tuple) are domains of their own - when the complete loadpoints list has been replaced,
+    # all domains might be affected
+    if isinstance(subtree, tuple):
+        return subtree if subtree[0] in [JSONKEY_LOADPOINTS, JSONKEY_VEHICLES] else data_domain_of(subtree[0])
+    if subtree is None or subtree == JSONKEY_LOADPOINTS:
+        return None
+    return DATA_DOMAIN_BY_KEY.get(subtree, DATA_DOMAIN_SITE)
+
 async def _do_request(method: Callable, return_raw_client_response:bool=False) -> dict:
     try:
         async with method as res:
@@ -197,6 +246,770 @@ def _add_to_sums(a_sums_dict: dict, key: str, val_charge_duration, val_charged_e
         a_sums_dict[key]["chargedEnergy"] += val_charged_energy
         a_sums_dict[key]["cost"] += val_cost
 
+def _as_number(value) -> float:
+    # None, strings or other garbage in a session record just count as 0
+    return value if isinstance(value, Number) and not isinstance(value, bool) else 0
+
+def _session_period_key(created: datetime, period: str) -> str:
+    if period == "day":
+        return created.strftime("%Y-%m-%d")
+    elif period == "week":
+        iso = created.isocalendar()
+        return f"{iso[0]}-W{iso[1]:02d}"
+    else:
+        return created.strftime("%Y-%m")
+
+def filter_sessions_by_created(sessions: list, year: int = None, month: int = None) -> list:
+    if year is None and month is None:
+        return sessions
+
+    filtered = []
+    for a_session in sessions:
+        created = a_session.get("created", None)
+        if created is not None:
+            try:
+                created_date = parser.isoparse(created)
+                if (year is None or created_date.year == year) and (month is None or created_date.month == month):
+                    filtered.append(a_session)
+            except Exception as err:
+                _LOGGER.info(f"filter_sessions_by_created(): could not parse 'created' {created} -> {type(err).__name__}: {err}")
+    return filtered
+
+def filter_sessions_by_time_range(sessions: list, start: datetime = None, end: datetime = None) -> list:
+    # 'start' is inclusive, 'end' is exclusive - both must be tz-aware
+    if start is None and end is None:
+        return sessions
+
+    filtered = []
+    for a_session in sessions:
+        created = a_session.get("created", None)
+        if created is not None:
+            try:
+                created_date = parser.isoparse(created)
+                if (start is None or created_date >= start) and (end is None or created_date < end):
+                    filtered.append(a_session)
+            except Exception as err:
+                _LOGGER.info(f"filter_sessions_by_time_range(): could not parse 'created' {created} -> {type(err).__name__}: {err}")
+    return filtered
+
+def project_session_fields(sessions: list, fields: list = None) -> list:
+    if fields is None or len(fields) == 0:
+        return sessions
+    return [{a_field: a_session[a_field] for a_field in fields if a_field in a_session} for a_session in sessions]
+
+def paginate_sessions(sessions: list, after_id: int = None, limit: int = None) -> tuple[list, int | None]:
+    # cursor based paging: 'after_id' is the evcc session 'id' of the last entry of the previous
+    # page - returns the page and the cursor for the next page (None, when this is the last page)
+    offset = 0
+    if after_id is not None:
+        offset = None
+        for idx, a_session in enumerate(sessions):
+            if a_session.get("id", None) == after_id:
+                offset = idx + 1
+                break
+        if offset is None:
+            # the cursor session does not exist (anylonger) - we can't continue the paging
+            _LOGGER.debug(f"paginate_sessions(): unknown cursor 'after_id' {after_id}")
+            return [], None
+
+    if limit is None:
+        return sessions[offset:], None
+
+    page = sessions[offset:offset + limit]
+    if offset + limit < len(sessions) and len(page) > 0:
+        return page, page[-1].get("id", None)
+    return page, None
+
+def calculate_session_stats(sessions: list, period: str = "month", group_by: str = "vehicle") -> list:
+    # we build the columns (period-key, group-key, energy, cost, solar-energy, duration) ONCE and
+    # then reduce them in a single pass - so there is no per-group re-scan of the full session list
+    col_period = []
+    col_group = []
+    col_energy = []
+    col_cost = []
+    col_solar = []
+    col_duration = []
+    for a_session_entry in sessions:
+        created = a_session_entry.get("created", None)
+        if created is None:
+            continue
+        try:
+            created_local = dt_util.as_local(parser.isoparse(created))
+        except BaseException as exception:
+            _LOGGER.debug(f"calculate_session_stats(): invalid 'created' in session entry: {a_session_entry} caused: {type(exception).__name__}")
+            continue
+
+        energy = _as_number(a_session_entry.get("chargedEnergy", 0))
+        charge_duration_in_nano_seconds = a_session_entry.get("chargeDuration", 0)
+        if isinstance(charge_duration_in_nano_seconds, Number) and charge_duration_in_nano_seconds >= 0:
+            duration = charge_duration_in_nano_seconds / 1000000000
+        else:
+            duration = _get_charge_duration_from_create_finish(a_session_entry) or 0
+
+        col_period.append(_session_period_key(created_local, period))
+        col_group.append(a_session_entry.get(group_by, None) or "")
+        col_energy.append(energy)
+        col_cost.append(_as_number(a_session_entry.get("price", 0)))
+        col_solar.append(energy * _as_number(a_session_entry.get("solarPercentage", 0)) / 100.0)
+        col_duration.append(duration)
+
+    buckets = {}
+    for a_key, energy, cost, solar, duration in zip(zip(col_period, col_group), col_energy, col_cost, col_solar, col_duration):
+        a_bucket = buckets.get(a_key)
+        if a_bucket is None:
+            a_bucket = buckets[a_key] = [0, 0, 0, 0, 0]
+        a_bucket[0] += 1
+        a_bucket[1] += energy
+        a_bucket[2] += cost
+        a_bucket[3] += solar
+        a_bucket[4] += duration
+
+    result = []
+    for (a_period, a_group), (count, energy, cost, solar, duration) in sorted(buckets.items()):
+        result.append({
+            "period": a_period,
+            group_by: a_group,
+            "sessions": count,
+            "chargedEnergy": round(energy, 4),
+            "cost": round(cost, 4),
+            "solarPercentage": round(solar * 100.0 / energy, 2) if energy > 0 else None,
+            "avgPrice": round(cost / energy, 4) if energy > 0 else None,
+            "chargeDuration": round(duration),
+        })
+    return result
+
+class SessionEndDetector:
+    # a charging session of a 'normal' (vehicle) loadpoint ends with the 'charging' TRUE->FALSE
+    # transition - but integrated devices and heaters are always 'connected' and 'charging' just
+    # toggles with the (pv) control loop. For those loadpoint types evcc finishes the session when
+    # 'connected' switches from TRUE to FALSE - so we have to watch a different key per loadpoint.
+    def __init__(self, lp_config_provider: Callable[[int], dict | None] = None):
+        self._lp_config_provider = lp_config_provider
+        self._watched_key_by_idx = {}
+
+    def reset(self):
+        self._watched_key_by_idx = {}
+
+    def _watched_key(self, idx: int, lp_data: dict) -> str:
+        a_key = self._watched_key_by_idx.get(idx, None)
+        if a_key is None:
+            lp_config = self._lp_config_provider(idx) if self._lp_config_provider is not None else None
+            if lp_config is not None:
+                is_heating = lp_config.get("is_heating", False)
+                is_integrated = lp_config.get("is_integrated", False)
+            else:
+                # no loadpoint configuration available (yet) - use the raw charger features
+                is_heating = lp_data.get("chargerFeatureHeating", False)
+                is_integrated = lp_data.get("chargerFeatureIntegratedDevice", False)
+
+            a_key = Tag.CONNECTED.json_key if is_heating or is_integrated else Tag.CHARGING.json_key
+            self._watched_key_by_idx[idx] = a_key
+        return a_key
+
+    def is_session_end(self, idx: int, lp_data: dict, sub_key: str, new_value) -> bool:
+        # must be called BEFORE the new value is written to 'lp_data'
+        if sub_key != Tag.CHARGING.json_key and sub_key != Tag.CONNECTED.json_key:
+            return False
+        return sub_key == self._watched_key(idx, lp_data) and lp_data.get(sub_key) is True and new_value is False
+
+    def is_session_inactive(self, idx: int, lp_data: dict) -> bool:
+        # the state based counterpart of is_session_end() - used when we might have missed the
+        # TRUE->FALSE transition (polling mode or a reconnect of the websocket)
+        return lp_data.get(self._watched_key(idx, lp_data), None) is False
+
+
+class LiveSessionEstimator:
+    # evcc only creates the session record, when a session has been finished - till then we
+    # integrate the 'chargePower' of each loadpoint over time. Since evcc only sends a value
+    # via the websocket when it has been changed, the last received power (and the price & solar
+    # share at that time) is valid till the next update (sample & hold)
+    def __init__(self):
+        self._sessions = {}
+
+    def reset(self):
+        self._sessions = {}
+
+    def _integrate(self, a_session: dict, now_ts: float):
+        delta_in_hours = (now_ts - a_session["last_ts"]) / 3600.0
+        if delta_in_hours > 0 and a_session["power"] > 0:
+            energy_kwh = a_session["power"] * delta_in_hours / 1000.0
+            solar_kwh = energy_kwh * a_session["solar_share"]
+            a_session["energy"] += energy_kwh
+            a_session["solar_energy"] += solar_kwh
+            if a_session["grid_price"] is not None:
+                a_session["cost"] += (energy_kwh - solar_kwh) * a_session["grid_price"]
+            if a_session["feedin_price"] is not None:
+                # the solar energy is not free - we could have sold it...
+                a_session["cost"] += solar_kwh * a_session["feedin_price"]
+        a_session["last_ts"] = now_ts
+
+    def update(self, idx: int, power, now_ts: float, grid_price=None, feedin_price=None, solar_share: float = 0.0):
+        if not isinstance(power, Number):
+            power = 0
+
+        a_session = self._sessions.get(idx, None)
+        if a_session is None or a_session["finished"]:
+            if power <= 0:
+                return
+            # a new session has been started (this will also replace a finished session, where
+            # we have not received the evcc session record yet)
+            a_session = {"started": now_ts, "last_ts": now_ts, "energy": 0.0, "solar_energy": 0.0, "cost": 0.0, "finished": False}
+            self._sessions[idx] = a_session
+        else:
+            self._integrate(a_session, now_ts)
+
+        a_session["power"] = power
+        a_session["grid_price"] = grid_price
+        a_session["feedin_price"] = feedin_price
+        a_session["solar_share"] = min(max(solar_share, 0.0), 1.0)
+
+    def finish(self, idx: int, now_ts: float):
+        a_session = self._sessions.get(idx, None)
+        if a_session is not None and not a_session["finished"]:
+            self._integrate(a_session, now_ts)
+            a_session["power"] = 0
+            a_session["finished"] = True
+
+    def reconcile(self):
+        # the real session records have arrived - so all finished estimations are obsolete
+        self._sessions = {idx: a_session for idx, a_session in self._sessions.items() if not a_session["finished"]}
+
+    def as_dict(self, lp_titles: dict, now_ts: float) -> dict:
+        # the session sums are keyed by the loadpoint title - so we do the same here
+        result = {}
+        for idx, a_session in self._sessions.items():
+            a_title = lp_titles.get(idx, None)
+            if a_title is None:
+                continue
+            energy = a_session["energy"]
+            solar_energy = a_session["solar_energy"]
+            cost = a_session["cost"]
+            if not a_session["finished"]:
+                # include the energy since the last update
+                delta_in_hours = max(now_ts - a_session["last_ts"], 0) / 3600.0
+                energy_kwh = a_session["power"] * delta_in_hours / 1000.0
+                solar_kwh = energy_kwh * a_session["solar_share"]
+                energy += energy_kwh
+                solar_energy += solar_kwh
+                if a_session["grid_price"] is not None:
+                    cost += (energy_kwh - solar_kwh) * a_session["grid_price"]
+                if a_session["feedin_price"] is not None:
+                    cost += solar_kwh * a_session["feedin_price"]
+
+            result[a_title] = {
+                "chargedEnergy": round(energy, 4),
+                "cost": round(cost, 4),
+                "solarPercentage": round(solar_energy * 100.0 / energy, 1) if energy > 0 else 0,
+                "created": datetime.fromtimestamp(a_session["started"], tz=timezone.utc).isoformat(),
+                "finished": a_session["finished"]
+            }
+        return result
+
+
+class TimeseriesSlotIndex:
+    # a tariff/forecast payload is parsed ONCE into sorted arrays of epoch start/end values, so
+    # that the current (and next) slot can be resolved via bisect - evcc provides three formats:
+    # {"start":..., "end":..., "value|val|price":...} - {"ts":..., "val|value|price":...} and
+    # (since evcc 0.314.1) [ts, value] or [ts, ?, value] lists
+    SLOT_LENGTH_IN_SECONDS: Final = 900
+
+    def __init__(self, data_list: list):
+        self.data_list = data_list
+        self.starts = []
+        self.ends = []
+        self.values = []
+
+        slots = []
+        if data_list is not None:
+            for a_entry in data_list:
+                try:
+                    a_slot = self._parse_entry(a_entry)
+                    if a_slot is not None:
+                        slots.append(a_slot)
+                except (ValueError, TypeError, IndexError) as exc:
+                    _LOGGER.debug(f"TimeseriesSlotIndex: invalid entry {a_entry} - {type(exc).__name__}: {exc}")
+
+        slots.sort(key=lambda a_slot: a_slot[0])
+        for a_start, a_end, a_value in slots:
+            self.starts.append(a_start)
+            self.ends.append(a_end)
+            self.values.append(a_value)
+
+    @staticmethod
+    def _to_epoch(a_value) -> float:
+        if isinstance(a_value, str):
+            return datetime.fromisoformat(a_value).timestamp()
+        return float(a_value)
+
+    @staticmethod
+    def _value_of(a_dict: dict):
+        for a_key in ["val", "value", "price"]:
+            if a_key in a_dict:
+                return a_dict[a_key]
+        return None
+
+    def _parse_entry(self, a_entry):
+        if isinstance(a_entry, dict):
+            if "start" in a_entry and "end" in a_entry:
+                return self._to_epoch(a_entry["start"]), self._to_epoch(a_entry["end"]), self._value_of(a_entry)
+            elif "ts" in a_entry:
+                # a 'ts' entry is valid for the quarter-hour it's in
+                a_start = (self._to_epoch(a_entry["ts"]) // self.SLOT_LENGTH_IN_SECONDS) * self.SLOT_LENGTH_IN_SECONDS
+                return a_start, a_start + self.SLOT_LENGTH_IN_SECONDS, self._value_of(a_entry)
+        elif isinstance(a_entry, list) and len(a_entry) > 1:
+            value_index = 2 if len(a_entry) > 2 else 1
+            a_start = (float(a_entry[0]) // self.SLOT_LENGTH_IN_SECONDS) * self.SLOT_LENGTH_IN_SECONDS
+            return a_start, a_start + self.SLOT_LENGTH_IN_SECONDS, a_entry[value_index]
+        return None
+
+    def slot_index_at(self, now_ts: float) -> int:
+        idx = bisect_right(self.starts, now_ts) - 1
+        if idx >= 0 and now_ts < self.ends[idx]:
+            return idx
+        return -1
+
+    def slot_at(self, now_ts: float):
+        # returns (value, start_ts, end_ts) of the slot that includes 'now_ts'
+        idx = self.slot_index_at(now_ts)
+        if idx >= 0:
+            return self.values[idx], self.starts[idx], self.ends[idx]
+        return None, None, None
+
+    def next_slot_at(self, now_ts: float):
+        # returns (value, start_ts, end_ts) of the first slot that starts after 'now_ts'
+        idx = bisect_right(self.starts, now_ts)
+        if idx < len(self.starts):
+            return self.values[idx], self.starts[idx], self.ends[idx]
+        return None, None, None
+
+
+class ForecastCacheEntry:
+    def __init__(self, data: dict, fetched_at: float, source: str):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.source = source
+        # the payload is useless after its last slot - so that's the latest point in time where we
+        # must fetch it again
+        self.valid_until = None
+        if isinstance(data, dict) and isinstance(data.get("rates", None), list):
+            an_index = TimeseriesSlotIndex(data["rates"])
+            if len(an_index.ends) > 0:
+                self.valid_until = max(an_index.ends)
+
+    def is_stale(self, now_ts: float, max_age: float) -> bool:
+        if self.valid_until is not None and now_ts >= self.valid_until:
+            return True
+        return now_ts - self.fetched_at > max_age
+
+    def as_meta_dict(self) -> dict:
+        return {"fetched_at": datetime.fromtimestamp(self.fetched_at, tz=timezone.utc).isoformat(),
+                "valid_until": datetime.fromtimestamp(self.valid_until, tz=timezone.utc).isoformat() if self.valid_until is not None else None,
+                "source": self.source}
+
+
+class ForecastCache:
+    # the single place where the tariff-api payloads (grid, feedin, solar, planner) are kept - used by
+    # the entities (via the coordinator) and by the evcc Card websocket commands
+    SOURCE_POLL: Final = "poll"
+    SOURCE_ON_DEMAND: Final = "on-demand"
+
+    def __init__(self):
+        self._entries = {}
+        self._listeners = []
+
+    def clear(self):
+        self._entries = {}
+
+    def add_listener(self, a_listener) -> Callable[[], None]:
+        # a listener will be called with (kind, new_entry, previous_entry) - but only when the
+        # payload of a kind has changed (a re-fetch of an identical payload is not reported)
+        self._listeners.append(a_listener)
+
+        def _remove():
+            if a_listener in self._listeners:
+                self._listeners.remove(a_listener)
+        return _remove
+
+    def put(self, kind: str, data: dict, source: str, now_ts: float = None) -> ForecastCacheEntry:
+        an_entry = ForecastCacheEntry(data, now_ts if now_ts is not None else time.time(), source)
+        previous_entry = self._entries.get(kind, None)
+        self._entries[kind] = an_entry
+        if len(self._listeners) > 0 and (previous_entry is None or previous_entry.data != data):
+            for a_listener in list(self._listeners):
+                try:
+                    a_listener(kind, an_entry, previous_entry)
+                except BaseException as exc:
+                    _LOGGER.info(f"ForecastCache.put(): listener for '{kind}' caused: {type(exc).__name__} - {exc}")
+        return an_entry
+
+    def get(self, kind: str) -> ForecastCacheEntry | None:
+        return self._entries.get(kind, None)
+
+    def get_fresh(self, kind: str, max_age: float, now_ts: float = None) -> ForecastCacheEntry | None:
+        an_entry = self._entries.get(kind, None)
+        if an_entry is not None and not an_entry.is_stale(now_ts if now_ts is not None else time.time(), max_age):
+            return an_entry
+        return None
+
+
+class PlanPreviewCache:
+    # LRU for the '/plan/static/preview' responses - the key is (loadpoint, kind, value, target time
+    # floored to the slot), so all slider positions within the same slot share one evcc request.
+    # Since evcc plans from 'now', the cached previews are dropped when a new slot begins - and
+    # when the planner tariff payload changes (see EvccApiBridge._forecast_cache_changed())
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._slot_start = None
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key_for(lp_idx: str, kind: str, value: str, rfc_date: str) -> tuple | None:
+        try:
+            a_ts = parser.isoparse(rfc_date).timestamp()
+        except (ValueError, TypeError, OverflowError):
+            # we do not cache, what we can't parse - evcc will tell the card what's wrong
+            return None
+        a_slot = TimeseriesSlotIndex.SLOT_LENGTH_IN_SECONDS
+        return str(lp_idx), kind, str(value), int(a_ts // a_slot) * a_slot
+
+    def _check_slot(self, now_ts: float):
+        a_slot_start = int(now_ts // TimeseriesSlotIndex.SLOT_LENGTH_IN_SECONDS)
+        if self._slot_start != a_slot_start:
+            self._slot_start = a_slot_start
+            self.clear()
+
+    def contains(self, key: tuple, now_ts: float = None) -> bool:
+        self._check_slot(now_ts if now_ts is not None else time.time())
+        return key in self._entries
+
+    def get(self, key: tuple, now_ts: float = None) -> dict | None:
+        self._check_slot(now_ts if now_ts is not None else time.time())
+        a_value = self._entries.get(key, None)
+        if a_value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return a_value
+
+    def put(self, key: tuple, data: dict, now_ts: float = None):
+        self._check_slot(now_ts if now_ts is not None else time.time())
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+def diff_forecast(previous_rates: list, new_rates: list) -> dict | None:
+    # the slots are identified by their 'start' - 'upsert' contains the new & the modified slots,
+    # 'remove' the 'start' values of the slots that are not present anymore. Returns None, when
+    # a diff is not possible (or would not be smaller than the new list)
+    if not isinstance(previous_rates, list) or not isinstance(new_rates, list):
+        return None
+
+    previous_by_start = {}
+    for a_entry in previous_rates:
+        if not isinstance(a_entry, dict) or "start" not in a_entry:
+            return None
+        previous_by_start[a_entry["start"]] = a_entry
+
+    upsert = []
+    new_starts = set()
+    for a_entry in new_rates:
+        if not isinstance(a_entry, dict) or "start" not in a_entry:
+            return None
+        new_starts.add(a_entry["start"])
+        if previous_by_start.get(a_entry["start"], None) != a_entry:
+            upsert.append(a_entry)
+
+    remove = [a_start for a_start in previous_by_start.keys() if a_start not in new_starts]
+    if len(upsert) + len(remove) >= len(new_rates):
+        return None
+    return {"upsert": upsert, "remove": remove}
+
+
+# compact forecast encoding ('evcc-dod-v1'):
+#  - 't0' is the first timestamp (epoch seconds)
+#  - 'data' is a base64 string of zigzag-encoded (LEB128) varints: first 'count - 1' delta-of-delta
+#    timestamps (seconds, the delta before the first entry is 0) - followed by 'count' deltas of the
+#    quantized values (the value before the first entry is 0)
+#  - a value is restored as: quantized_value / 'scale'  (non-numeric values are packed as 0)
+PACKED_FORECAST_ENCODING: Final = "evcc-dod-v1"
+PACKED_FORECAST_MAX_SCALE: Final = 10000
+
+def _zigzag_varint(value: int, out: bytearray):
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _forecast_entry_time_and_value(a_entry):
+    if isinstance(a_entry, dict):
+        a_time = a_entry.get("start", a_entry.get("ts", None))
+        return (TimeseriesSlotIndex._to_epoch(a_time) if a_time is not None else None), TimeseriesSlotIndex._value_of(a_entry)
+    elif isinstance(a_entry, list) and len(a_entry) > 1:
+        return float(a_entry[0]), a_entry[2 if len(a_entry) > 2 else 1]
+    return None, None
+
+def pack_forecast(data_list: list) -> dict:
+    times = []
+    values = []
+    for a_entry in data_list or []:
+        try:
+            a_time, a_value = _forecast_entry_time_and_value(a_entry)
+        except (ValueError, TypeError):
+            continue
+        if a_time is not None:
+            times.append(int(round(a_time)))
+            values.append(a_value if isinstance(a_value, Number) and not isinstance(a_value, bool) else 0)
+
+    # the smallest scale that keeps 4 decimals (so integer series like the solar forecast stay small)
+    scale = 1
+    while scale < PACKED_FORECAST_MAX_SCALE and any(round(v * scale, 4) != round(v * scale) for v in values):
+        scale *= 10
+
+    out = bytearray()
+    prev_delta = 0
+    for i in range(1, len(times)):
+        a_delta = times[i] - times[i - 1]
+        _zigzag_varint(a_delta - prev_delta, out)
+        prev_delta = a_delta
+    prev_value = 0
+    for a_value in values:
+        quantized = int(round(a_value * scale))
+        _zigzag_varint(quantized - prev_value, out)
+        prev_value = quantized
+
+    return {"encoding": PACKED_FORECAST_ENCODING,
+            "t0": times[0] if len(times) > 0 else None,
+            "count": len(times),
+            "scale": scale,
+            "data": base64.b64encode(bytes(out)).decode("ascii")}
+
+def unpack_forecast(packed: dict) -> list:
+    # the reference decoder - returns a list of [ts, value] entries
+    raw = base64.b64decode(packed["data"])
+    ints = []
+    shift = 0
+    current = 0
+    for a_byte in raw:
+        current |= (a_byte & 0x7F) << shift
+        if a_byte & 0x80:
+            shift += 7
+        else:
+            ints.append((current >> 1) ^ -(current & 1))
+            current = 0
+            shift = 0
+
+    count = packed["count"]
+    if count == 0:
+        return []
+    times = [packed["t0"]]
+    a_delta = 0
+    for a_dod in ints[:count - 1]:
+        a_delta += a_dod
+        times.append(times[-1] + a_delta)
+    result = []
+    a_value = 0
+    for i, a_value_delta in enumerate(ints[count - 1:count - 1 + count]):
+        a_value += a_value_delta
+        result.append([times[i], a_value / packed["scale"]])
+    return result
+
+
+def calculate_forecast_analytics(an_index: TimeseriesSlotIndex, now_ts: float, day_end_ts: float, window_in_seconds: float) -> dict:
+    # the remaining-day aggregates (time weighted) and the cheapest contiguous window of the
+    # given length - based on the parsed (and sorted) slots of a tariff/forecast payload
+    starts = []
+    ends = []
+    values = []
+    for a_start, a_end, a_value in zip(an_index.starts, an_index.ends, an_index.values):
+        if a_end > now_ts and isinstance(a_value, Number) and not isinstance(a_value, bool):
+            # the current slot only counts from 'now'
+            starts.append(max(a_start, now_ts))
+            ends.append(a_end)
+            values.append(a_value)
+
+    result = {"remaining_day_avg": None, "remaining_day_min": None, "remaining_day_max": None,
+              "cheapest_window_start": None, "cheapest_window_end": None, "cheapest_window_avg": None}
+    if len(starts) == 0:
+        return result
+
+    # remaining day...
+    day_sum = 0.0
+    day_seconds = 0.0
+    day_values = []
+    for a_start, a_end, a_value in zip(starts, ends, values):
+        if a_start >= day_end_ts:
+            break
+        a_duration = min(a_end, day_end_ts) - a_start
+        day_sum += a_value * a_duration
+        day_seconds += a_duration
+        day_values.append(a_value)
+
+    if day_seconds > 0:
+        result["remaining_day_avg"] = round(day_sum / day_seconds, 5)
+        result["remaining_day_min"] = min(day_values)
+        result["remaining_day_max"] = max(day_values)
+
+    # cheapest window - the window can start at every slot start (prefix sums of the slot
+    # costs and of the gaps between the slots, so that each candidate is O(log n))
+    if window_in_seconds > 0:
+        cost_prefix = [0.0]
+        gap_prefix = [0]
+        for i in range(len(starts)):
+            cost_prefix.append(cost_prefix[-1] + values[i] * (ends[i] - starts[i]))
+            gap_prefix.append(gap_prefix[-1] + (1 if i > 0 and starts[i] != ends[i - 1] else 0))
+
+        best_avg = None
+        for i in range(len(starts)):
+            window_end = starts[i] + window_in_seconds
+            j = bisect_left(ends, window_end)
+            if j >= len(ends):
+                # not enough data left for a complete window
+                break
+            if gap_prefix[j + 1] - gap_prefix[i + 1] > 0:
+                # the window would include a gap in the data
+                continue
+            a_cost = cost_prefix[j] - cost_prefix[i] + values[j] * (window_end - starts[j])
+            an_avg = a_cost / window_in_seconds
+            if best_avg is None or an_avg < best_avg:
+                best_avg = an_avg
+                result["cheapest_window_start"] = starts[i]
+                result["cheapest_window_end"] = window_end
+
+        if best_avg is not None:
+            result["cheapest_window_avg"] = round(best_avg, 5)
+
+    return result
+
+
+def downsample_bucket_mean(values: list, max_points: int) -> tuple[list, int]:
+    # reduces 'values' to at most 'max_points' entries - each entry is the mean of 'bucket_size'
+    # consecutive values (the last bucket might be smaller). The evopt series have no timestamps
+    # (just the slot lengths in 'dt'), so equal sized buckets keep the mapping to the slots simple.
+    # 'max_points' <= 0 means no downsampling
+    if max_points is None or max_points <= 0 or len(values) <= max_points:
+        return values, 1
+
+    bucket_size = -(-len(values) // max_points)
+    result = []
+    for start in range(0, len(values), bucket_size):
+        a_bucket = [a_value for a_value in values[start:start + bucket_size] if isinstance(a_value, Number)]
+        result.append(round(sum(a_bucket) / len(a_bucket), 4) if len(a_bucket) > 0 else None)
+    return result, bucket_size
+
+
+class EvoptSeries:
+    # the evopt block (req/res/details) parsed once per change into plain per-slot lists - all
+    # evopt entities read these shared lists (and the derived summary values) instead of walking
+    # the raw json with every state update
+    SUMMARY_NEXT_HOUR_GRID_IMPORT: Final = "next_hour_grid_import"
+    SUMMARY_PEAK_BATTERY_POWER: Final = "peak_battery_power"
+    SUMMARY_TOTAL_GRID_EXPORT: Final = "total_grid_export"
+
+    def __init__(self, evopt: dict):
+        # the source objects - the websocket might replace each of them separately ('evopt.res')
+        self.sources = self._sources_of(evopt)
+        req = self.sources[0] if isinstance(self.sources[0], dict) else {}
+        res = self.sources[1] if isinstance(self.sources[1], dict) else {}
+        details = self.sources[2] if isinstance(self.sources[2], dict) else {}
+
+        self.dt = self._as_float_list(req.get(JSONKEY_EVOPT_REQ_TIME_SERIES, {}).get(JSONKEY_EVOPT_REQ_TIME_SERIES_DT, None))
+        self.grid_import = self._as_float_list(res.get(JSONKEY_EVOPT_RES_GRID_IMPORT, None))
+        self.grid_export = self._as_float_list(res.get(JSONKEY_EVOPT_RES_GRID_EXPORT, None))
+
+        self.batteries = []
+        a_battery_list = res.get(JSONKEY_EVOPT_RES_BATTERIES, None)
+        if isinstance(a_battery_list, list):
+            for a_battery in a_battery_list:
+                a_battery = a_battery if isinstance(a_battery, dict) else {}
+                self.batteries.append({
+                    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGING_POWER: self._as_float_list(a_battery.get(JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGING_POWER, None)),
+                    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_DISCHARGING_POWER: self._as_float_list(a_battery.get(JSONKEY_EVOPT_RES_BATTERIES_AINDEX_DISCHARGING_POWER, None)),
+                    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGED_TOTAL: self._as_float_list(a_battery.get(JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGED_TOTAL, None)),
+                })
+
+        a_details_list = details.get(JSONKEY_EVOPT_DETAILS_BATTERYDETAILS, None)
+        self.battery_details = a_details_list if isinstance(a_details_list, list) else []
+        a_ts_list = details.get(JSONKEY_EVOPT_DETAILS_TIMESTAMP, None)
+        self.timestamps = a_ts_list if isinstance(a_ts_list, list) else []
+
+        self.summary = {
+            self.SUMMARY_NEXT_HOUR_GRID_IMPORT: self._sum_within(self.grid_import, 3600),
+            self.SUMMARY_PEAK_BATTERY_POWER: self._peak_battery_power(),
+            self.SUMMARY_TOTAL_GRID_EXPORT: round(sum(self.grid_export), 2) if len(self.grid_export) > 0 else None,
+        }
+
+    @staticmethod
+    def _as_float_list(values) -> list:
+        if not isinstance(values, list):
+            return []
+        return [float(a_value) if isinstance(a_value, Number) else 0.0 for a_value in values]
+
+    @staticmethod
+    def _sources_of(evopt: dict) -> tuple:
+        return evopt.get(JSONKEY_EVOPT_REQ, None), evopt.get(JSONKEY_EVOPT_RES, None), evopt.get(JSONKEY_EVOPT_DETAILS, None)
+
+    def is_based_on(self, evopt: dict) -> bool:
+        return all(a is b for a, b in zip(self.sources, self._sources_of(evopt)))
+
+    def _sum_within(self, values: list, seconds: float) -> float | None:
+        # the per-slot energies (Wh) of the first 'seconds' of the optimization horizon - a slot
+        # that only partially falls into the window is added proportionally
+        if len(values) == 0 or len(self.dt) == 0:
+            return None
+        a_sum = 0.0
+        elapsed = 0.0
+        for a_value, a_dt in zip(values, self.dt):
+            if a_dt <= 0:
+                continue
+            if elapsed + a_dt >= seconds:
+                a_sum += a_value * (seconds - elapsed) / a_dt
+                break
+            a_sum += a_value
+            elapsed += a_dt
+        return round(a_sum, 2)
+
+    def _peak_battery_power(self) -> float | None:
+        # the max (absolute) power of all batteries together - the per-slot values are energies
+        # (Wh), so we have to scale them with the slot length
+        if len(self.batteries) == 0 or len(self.dt) == 0:
+            return None
+        peak = 0.0
+        for slot_idx, a_dt in enumerate(self.dt):
+            if a_dt <= 0:
+                continue
+            net_energy = 0.0
+            for a_battery in self.batteries:
+                a_charge = a_battery[JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGING_POWER]
+                a_discharge = a_battery[JSONKEY_EVOPT_RES_BATTERIES_AINDEX_DISCHARGING_POWER]
+                net_energy += (a_charge[slot_idx] if slot_idx < len(a_charge) else 0.0) - (a_discharge[slot_idx] if slot_idx < len(a_discharge) else 0.0)
+            peak = max(peak, abs(net_energy) * 3600 / a_dt)
+        return round(peak, 2)
+
+    def battery_attributes(self, battery_idx: int, key: str) -> dict | None:
+        # the (shared) per-slot list of a battery plus its details & the optimization timestamp
+        if battery_idx >= len(self.batteries):
+            return None
+        return_obj = {"values": self.batteries[battery_idx][key]}
+        if battery_idx < len(self.battery_details) and isinstance(self.battery_details[battery_idx], dict):
+            return_obj.update(self.battery_details[battery_idx])
+        # *big sigh* - all is an array - but for WHATEVER reason the timestamp info is (sometimes)
+        # only AVAILABLE as a single entry in the list
+        if battery_idx < len(self.timestamps):
+            return_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP] = self.timestamps[battery_idx]
+        elif len(self.timestamps) == 1:
+            return_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP] = self.timestamps[0]
+        return return_obj
+
+
 class EvccApiBridge:
     def __init__(self, host: str, web_session, coordinator: DataUpdateCoordinator = None, lang: str = "en",
                  opt_password: str = None, ext_vehicle_data: bool = False, ext_meter_data: bool = False) -> None:
@@ -217,6 +1030,13 @@ class EvccApiBridge:
         self._debounced_update_task = None
         self._ws_ADDITIONAL_DATA_UPDATE_TASK_CHECK_MINUTE = -1
         self._debounced_additional_data_update_task = None
+        self._session_end_refresh_tasks = {}
+        self._session_end_detector = SessionEndDetector(self._loadpoint_config_for_idx)
+        self._live_session_estimator = LiveSessionEstimator()
+        self.forecast_cache = ForecastCache()
+        self.plan_preview_cache = PlanPreviewCache(PLAN_PREVIEW_CACHE_SIZE)
+        self.forecast_cache.add_listener(self._forecast_cache_changed)
+        self._live_session_rate_cache = {}
 
         self.host = host
         self._admin_password = opt_password
@@ -246,14 +1066,29 @@ class EvccApiBridge:
             self._CONFIG_METER_UPDATE_INTERVAL_IN_SECONDS = 60 * 60
 
         self._data = {}
+        # (monotonic time, data) of an already fetched '/api/state' response - see use_state_snapshot()
+        self._state_snapshot = None
+        # True, as long as the data is the last known (persisted) data from a previous run - and
+        # not the live data from evcc
+        self.data_is_warm_start = False
+        self.data_generation = 0
+        self._full_data_generation = 0
+        self._subtree_data_generations = {}
+        # the data domains (see data_domain_of()) that have been changed since the coordinator
+        # listeners have been notified the last time - None means, that all domains have changed
+        self._changed_data_domains = set()
 
         # by default, we do not request the tariff endpoints
         self.request_tariff_endpoints = False
         self.request_tariff_keys = []
+        # kind -> number of the 'evcc_intg/subscribe_forecast' subscriptions (such kinds are polled
+        # too - even if there is no entity using them)
+        self._forecast_subscriptions = {}
 
-    async def is_evcc_available(self):
+    async def is_evcc_available(self) -> dict | None:
         _LOGGER.debug(f"is_evcc_available(): '{self.host}' CHECKING...")
         req = f"{self.host}/api/state"
+        data = None
         try:
             async with self.web_session.get(url=req, ssl=False) as res:
                 res.raise_for_status()
@@ -267,6 +1102,30 @@ class EvccApiBridge:
             raise exc
 
         _LOGGER.debug(f"is_evcc_available(): '{self.host}' is AVAILABLE")
+        # the state can be reused by the caller (see use_state_snapshot()) - so we remove the
+        # (deprecated) 'result' container here too (like _do_request() does)
+        if isinstance(data, dict) and "result" in data and len(data) == 1:
+            data = data["result"]
+        return data if isinstance(data, dict) else None
+
+    def use_warm_start_data(self, data: dict):
+        # the last known data (from a previous run) is used, till we get the live data from evcc
+        self._data = data
+        self.data_is_warm_start = True
+        self._mark_data_changed()
+
+    def use_state_snapshot(self, data: dict | None):
+        # an already fetched '/api/state' response (e.g. from the availability check during the
+        # setup) will be used by the next read_state_data() call - so the initial refresh, the
+        # config discovery and the websocket bootstrap don't have to request the state again
+        if data is not None and len(data) > 0:
+            self._state_snapshot = (time.monotonic(), data)
+
+    def _loadpoint_config_for_idx(self, idx: int) -> dict | None:
+        # the coordinator loadpoint configuration uses the 1-based evcc api index as key
+        if self.coordinator is not None and hasattr(self.coordinator, "_loadpoint"):
+            return self.coordinator._loadpoint.get(f"{idx + 1}", None)
+        return None
 
     def enable_tariff_endpoints(self, keys: list):
         self._TARIFF_LAST_UPDATE_QUARTER_HOUR = -1
@@ -274,10 +1133,71 @@ class EvccApiBridge:
         self.request_tariff_keys = keys
         _LOGGER.debug(f"enabled tariff endpoints with keys: {keys}")
 
+    def add_forecast_subscription(self, kind: str):
+        self._forecast_subscriptions[kind] = self._forecast_subscriptions.get(kind, 0) + 1
+
+    def remove_forecast_subscription(self, kind: str):
+        count = self._forecast_subscriptions.get(kind, 0) - 1
+        if count > 0:
+            self._forecast_subscriptions[kind] = count
+        else:
+            self._forecast_subscriptions.pop(kind, None)
+
+    def _polled_tariff_keys(self) -> list:
+        return self.request_tariff_keys + [a_kind for a_kind in self._forecast_subscriptions.keys() if a_kind not in self.request_tariff_keys]
+
+    def _mark_data_changed(self, subtree=None):
+        # 'data_generation' is increased with every change of the data - 'subtree' is the part of
+        # the data that has been changed by the websocket (a top-level key, a domain or a
+        # (domain, idx) tuple) - when it's None, all the data might have been changed
+        self.data_generation += 1
+        if subtree is None:
+            self._full_data_generation = self.data_generation
+            self._changed_data_domains = None
+        else:
+            self._subtree_data_generations[subtree] = self.data_generation
+            if self._changed_data_domains is not None:
+                a_domain = data_domain_of(subtree)
+                if a_domain is None:
+                    self._changed_data_domains = None
+                else:
+                    self._changed_data_domains.add(a_domain)
+                    if isinstance(a_domain, tuple) and a_domain[0] == JSONKEY_VEHICLES:
+                        self._changed_data_domains.add(DATA_DOMAIN_ANY_VEHICLE)
+
+    def pop_changed_data_domains(self) -> set | None:
+        # the data domains that have been changed since the last call - the coordinator will
+        # only notify the entities, that are using data of one of these domains
+        changed_domains = self._changed_data_domains
+        self._changed_data_domains = set()
+        return changed_domains
+
+    def data_generation_of(self, subtrees: tuple | None = None) -> int:
+        # the generation of the data an entity depends on - so the entities can skip the
+        # recalculation of their state (when nothing relevant has changed)
+        if subtrees is None:
+            return self.data_generation
+        a_generation = self._full_data_generation
+        for a_subtree in subtrees:
+            a_generation = max(a_generation, self._subtree_data_generations.get(a_subtree, 0))
+        return a_generation
+
     def available_fields(self) -> int:
         return len(self._data)
 
+    def cancel_pending_tasks(self):
+        # the delayed session refreshes & the debounced coordinator notification must not run after
+        # the data has been cleared (or the integration has been unloaded)
+        for a_task in self._session_end_refresh_tasks.values():
+            if not a_task.done():
+                a_task.cancel()
+        self._session_end_refresh_tasks = {}
+        if self._debounced_update_task is not None:
+            self._debounced_update_task.cancel()
+            self._debounced_update_task = None
+
     def clear_data(self, clear_evcc_data: bool = True):
+        self.cancel_pending_tasks()
         self._TARIFF_LAST_UPDATE_QUARTER_HOUR = -1
         self._SESSIONS_LAST_UPDATE_HOUR = -1
         self._CONFIG_VEHICLE_LAST_UPDATE = -1
@@ -285,8 +1205,21 @@ class EvccApiBridge:
         self._ws_LAST_UPDATE = -1
         self._ws_LAST_NEW_DATA_NOTIFY = -1
         self._ws_ADDITIONAL_DATA_UPDATE_TASK_CHECK_MINUTE = -1
+        self._session_end_detector.reset()
+        self._live_session_estimator.reset()
+        self._live_session_rate_cache = {}
         if clear_evcc_data:
+            self.forecast_cache.clear()
+            self.plan_preview_cache.clear()
             self._data = {}
+            self.data_is_warm_start = False
+            self._mark_data_changed()
+
+    def _forecast_cache_changed(self, kind: str, new_entry: ForecastCacheEntry, previous_entry: ForecastCacheEntry):
+        self._mark_data_changed(ADDITIONAL_ENDPOINTS_DATA_TARIFF)
+        # a changed planner tariff will (most likely) change every plan preview
+        if kind == "planner":
+            self.plan_preview_cache.clear()
 
     def ws_check_last_update(self) -> bool:
         now_time = time.time()
@@ -307,7 +1240,8 @@ class EvccApiBridge:
                 async for msg in ws:
                     if msg.type == aiohttp.WSMsgType.TEXT:
                         try:
-                            if self._data is None or len(self._data) == 0:
+                            # the warm start data (from a previous run) must be replaced completely
+                            if self._data is None or len(self._data) == 0 or self.data_is_warm_start:
                                 self._TARIFF_LAST_UPDATE_QUARTER_HOUR = -1
                                 self._SESSIONS_LAST_UPDATE_HOUR = -1
                                 self._CONFIG_VEHICLE_LAST_UPDATE = -1
@@ -338,24 +1272,18 @@ class EvccApiBridge:
                                                         if not sub_key in self._data[domain][idx]:
                                                             _LOGGER.debug(f"adding '{sub_key}' to {domain}[{idx}]")
 
-                                                        # a loadpoint 'charging' transition true->false means a charging
-                                                        # session has just finished - evcc creates the session record now,
-                                                        # so we invalidate our session update-window: the additional-data
-                                                        # task launched after this loop will then refetch /api/sessions
+                                                        # a session-end transition (depending on the loadpoint type
+                                                        # 'charging' or 'connected' true->false) means a session has just
+                                                        # finished - evcc creates the session record now, so we schedule a
+                                                        # (sessions only) refresh for this loadpoint
                                                         if domain == JSONKEY_LOADPOINTS:
-                                                            # # for integrated devices we must monitor the 'CONNECTED' key...
-                                                            # is_integrated = self._data[domain][idx].get("chargerFeatureIntegratedDevice", False)
-                                                            # is_heating = self._data[domain][idx].get("chargerFeatureHeating", False)
-                                                            # if not is_heating and is_integrated:
-                                                            #     key_to_check = Tag.CONNECTED.json_key
-                                                            # else:
-                                                            #     key_to_check = Tag.CHARGING.json_key
-                                                            if sub_key == Tag.CHARGING.json_key \
-                                                                and self._data[domain][idx].get(sub_key) is True and value is False:
+                                                            if self._session_end_detector.is_session_end(idx, self._data[domain][idx], sub_key, value):
                                                                 _LOGGER.debug(f"loadpoint[{idx}] '{sub_key}' changed from TRUE to FALSE -> force a session refresh")
-                                                                self._SESSIONS_LAST_UPDATE_HOUR = -1
+                                                                self._live_session_estimator.finish(idx, time.time())
+                                                                self._ws_start_session_end_refresh_task(idx)
 
                                                         self._data[domain][idx][sub_key] = value
+                                                        self._mark_data_changed((domain, idx))
                                                     else:
                                                         # we need to add a new entry to the list... - well
                                                         # if we get index 4 but length is only 2 we must add multiple
@@ -364,6 +1292,7 @@ class EvccApiBridge:
                                                             self._data[domain].append({})
 
                                                         self._data[domain][idx] = {sub_key: value}
+                                                        self._mark_data_changed((domain, idx))
                                                         _LOGGER.debug(f"adding index {idx} to '{domain}' -> {self._data[domain][idx]}")
                                                 else:
                                                     _LOGGER.info(f"unhandled [{domain} not in data] 3part: {key} - ignoring: {value} data: {self._data}")
@@ -379,6 +1308,8 @@ class EvccApiBridge:
                                                     if not sub_key in self._data[domain]:
                                                         _LOGGER.debug(f"adding '{sub_key}' to {domain}")
                                                     self._data[domain][sub_key] = value
+                                                    # a single vehicle is a data domain of its own
+                                                    self._mark_data_changed((domain, sub_key) if domain == JSONKEY_VEHICLES else domain)
                                                 else:
                                                     _LOGGER.info(f"unhandled [{domain} not in data] 2part: {key} - domain {domain} not in self.data - ignoring: {value}")
                                             else:
@@ -386,13 +1317,17 @@ class EvccApiBridge:
                                         else:
                                             if key in self._data:
                                                 self._data[key] = value
+                                                self._mark_data_changed(key)
                                             else:
                                                 if key != "releaseNotes":
                                                     self._data[key] = value
+                                                    self._mark_data_changed(key)
                                                     _LOGGER.info(f"added '{key}' to self._data and assign: {value}")
 
                                     # END of for loop
                                     # _LOGGER.debug(f"key: {key} value: {value}")
+                                    if self._update_live_sessions(self._data):
+                                        self._mark_data_changed(ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS)
                                     self._ws_notify_coordinator_for_updated_data_debounced()
 
                         except Exception as e:
@@ -434,6 +1369,98 @@ class EvccApiBridge:
                 # if the task is already running, we don't need to do anything...'
                 pass
 
+    def _current_tariff_value(self, data: dict, kind: str, now_ts: float):
+        # the rates are only parsed again, when a new tariff payload has been fetched
+        rates = None
+        if ADDITIONAL_ENDPOINTS_DATA_TARIFF in data:
+            a_tariff = data[ADDITIONAL_ENDPOINTS_DATA_TARIFF].get(kind, None)
+            if isinstance(a_tariff, dict):
+                rates = a_tariff.get("rates", None)
+        if rates is None:
+            return None
+
+        cached = self._live_session_rate_cache.get(kind, None)
+        if cached is None or cached.data_list is not rates:
+            cached = TimeseriesSlotIndex(rates)
+            self._live_session_rate_cache[kind] = cached
+        return cached.slot_at(now_ts)[0]
+
+    def _update_live_sessions(self, data: dict) -> bool:
+        # returns True, when the estimated live sessions have been changed - without a charging
+        # loadpoint most of the websocket messages will not change anything
+        if data is None or JSONKEY_LOADPOINTS not in data:
+            return False
+
+        now_ts = time.time()
+        grid_price = self._current_tariff_value(data, Tag.TARIFF_API_GRID.json_key, now_ts)
+        if grid_price is None:
+            grid_price = data.get(Tag.TARIFFGRID.json_key, None)
+        feedin_price = self._current_tariff_value(data, Tag.TARIFF_API_FEEDIN.json_key, now_ts)
+        if feedin_price is None:
+            feedin_price = data.get(Tag.TARIFFFEEDIN.json_key, None)
+
+        # the share of solar (& battery) power that is available for the loadpoints - the home
+        # consumption has priority (like evcc's own 'greenShareLoadpoints')
+        total_charge_power = 0
+        for a_lp in data[JSONKEY_LOADPOINTS]:
+            a_power = a_lp.get(Tag.CHARGEPOWER.json_key, 0)
+            if isinstance(a_power, Number) and a_power > 0:
+                total_charge_power += a_power
+
+        solar_share = data.get("greenShareLoadpoints", None)
+        if not isinstance(solar_share, Number):
+            solar_share = 0.0
+            if total_charge_power > 0:
+                pv_power = data.get(Tag.PVPOWER.json_key, 0)
+                battery_power = data.get(Tag.BATTERYPOWER.json_key, 0)
+                home_power = data.get(Tag.HOMEPOWER.json_key, 0)
+                available_power = (pv_power if isinstance(pv_power, Number) else 0) \
+                                  + (max(battery_power, 0) if isinstance(battery_power, Number) else 0) \
+                                  - (home_power if isinstance(home_power, Number) else 0)
+                solar_share = available_power / total_charge_power
+
+        lp_titles = {}
+        for idx, a_lp in enumerate(data[JSONKEY_LOADPOINTS]):
+            lp_titles[idx] = a_lp.get("title", None)
+            a_power = a_lp.get(Tag.CHARGEPOWER.json_key, 0)
+            self._live_session_estimator.update(idx, a_power, now_ts,
+                                                grid_price=grid_price if isinstance(grid_price, Number) else None,
+                                                feedin_price=feedin_price if isinstance(feedin_price, Number) else None,
+                                                solar_share=solar_share)
+            # without power and with an inactive session (the session-end transition might not
+            # have been seen) the estimation must be closed - otherwise the next charge would
+            # be added to it
+            if (not isinstance(a_power, Number) or a_power <= 0) and self._session_end_detector.is_session_inactive(idx, a_lp):
+                self._live_session_estimator.finish(idx, now_ts)
+
+        live_sessions = self._live_session_estimator.as_dict(lp_titles, now_ts)
+        if live_sessions == data.get(ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS, None):
+            return False
+        data[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS] = live_sessions
+        return True
+
+    def _ws_start_session_end_refresh_task(self, idx: int):
+        # one pending refresh per loadpoint is enough - when the same loadpoint toggles again
+        # within the delay, the already scheduled refresh will include that session as well
+        a_task = self._session_end_refresh_tasks.get(idx, None)
+        if a_task is not None and not a_task.done():
+            return
+
+        async def _task():
+            try:
+                await asyncio.sleep(SESSION_END_REFRESH_DELAY)
+                self._SESSIONS_LAST_UPDATE_HOUR = -1
+                await self.read_all_data(request_all=False, request_sessions=True)
+                if self.coordinator is not None and self._data_coordinator_update_needed:
+                    _LOGGER.debug(f"_ws_start_session_end_refresh_task(): sessions refreshed after session-end at loadpoint[{idx}]")
+                    self._ws_notify_coordinator_for_updated_data_debounced()
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                _LOGGER.info(f"_ws_start_session_end_refresh_task(): ERROR: {type(e).__name__}: {e}")
+
+        self._session_end_refresh_tasks[idx] = asyncio.create_task(_task())
+
     def _ws_notify_coordinator_for_updated_data_debounced(self):
         if self._debounced_update_task is not None:
             self._debounced_update_task.cancel()
@@ -485,7 +1512,7 @@ class EvccApiBridge:
 
         # additional tariffs endpoint data
         if request_all or request_tariffs:
-            if self.request_tariff_endpoints:
+            if self.request_tariff_endpoints or len(self._forecast_subscriptions) > 0:
                 # we only update the tariff data once per hour...
                 if self._TARIFF_LAST_UPDATE_QUARTER_HOUR != current_quarter_hour:
                     _LOGGER.debug(f"going to request 'tariff' data from evcc@{self.host}")
@@ -493,6 +1520,7 @@ class EvccApiBridge:
                     if data_was_fetched:
                         self._data_coordinator_update_needed = True
                         self._TARIFF_LAST_UPDATE_QUARTER_HOUR = current_quarter_hour
+                        self._mark_data_changed(ADDITIONAL_ENDPOINTS_DATA_TARIFF)
                 else:
                     # we must copy the previous existing data to the new json_resp!
                     if self._data is not None and ADDITIONAL_ENDPOINTS_DATA_TARIFF in self._data:
@@ -506,6 +1534,7 @@ class EvccApiBridge:
                 if data_was_fetched:
                     self._data_coordinator_update_needed = True
                     self._SESSIONS_LAST_UPDATE_HOUR = current_hour
+                    self._mark_data_changed(ADDITIONAL_ENDPOINTS_DATA_SESSIONS)
             else:
                 # we must copy the previous existing data to the new json_resp!
                 if self._data is not None and ADDITIONAL_ENDPOINTS_DATA_SESSIONS in self._data:
@@ -526,6 +1555,7 @@ class EvccApiBridge:
                                                                           log_requests=log_config_requests)
                 if data_was_fetched:
                     self._data_coordinator_update_needed = True
+                    self._mark_data_changed(ADDITIONAL_ENDPOINTS_DATA_EVCCCONF)
                     if request_vehicle_data:
                         self._CONFIG_VEHICLE_LAST_UPDATE = now_time
                     if request_meter_data:
@@ -535,10 +1565,28 @@ class EvccApiBridge:
                 if self._data is not None and ADDITIONAL_ENDPOINTS_DATA_EVCCCONF in self._data:
                     json_resp[ADDITIONAL_ENDPOINTS_DATA_EVCCCONF] = self._data[ADDITIONAL_ENDPOINTS_DATA_EVCCCONF]
 
+        if request_all:
+            self._update_live_sessions(json_resp)
+        elif self._data is not None and ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS in self._data:
+            json_resp[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS] = self._data[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]
+
         self._data = json_resp
+        if request_all:
+            # the complete 'state' have been replaced
+            if self.data_is_warm_start:
+                _LOGGER.info(f"received live data from evcc@{self.host} - replacing the last known (warm start) data")
+                self.data_is_warm_start = False
+            self._mark_data_changed()
         return json_resp
 
     async def read_state_data(self) -> dict:
+        if self._state_snapshot is not None:
+            snapshot_time, snapshot_data = self._state_snapshot
+            self._state_snapshot = None
+            if time.monotonic() - snapshot_time < STATE_SNAPSHOT_MAX_AGE:
+                _LOGGER.debug(f"using the already fetched 'state' snapshot from evcc@{self.host}")
+                return snapshot_data
+
         req = f"{self.host}/api/state"
         _LOGGER.debug(f"GET request: {req}")
         r_json = await _do_request(method=self.web_session.get(url=req, ssl=False, timeout=static_5sec_timeout))
@@ -555,13 +1603,17 @@ class EvccApiBridge:
         if ADDITIONAL_ENDPOINTS_DATA_TARIFF not in json_resp:
             json_resp[ADDITIONAL_ENDPOINTS_DATA_TARIFF] = {}
 
-        for a_key in self.request_tariff_keys:
+        for a_key in self._polled_tariff_keys():
             try:
                 req = f"{self.host}/api/{EP_TYPE.TARIFF.value}/{a_key}"
                 _LOGGER.debug(f"GET request: {req}")
                 tariff_resp = await _do_request(method=self.web_session.get(url=req, ssl=False, timeout=static_5sec_timeout))
                 if tariff_resp is not None and len(tariff_resp) > 0:
-                    json_resp[ADDITIONAL_ENDPOINTS_DATA_TARIFF][a_key] = tariff_resp
+                    # the kinds that are only polled for a subscription are not part of the entity data
+                    if a_key in self.request_tariff_keys:
+                        json_resp[ADDITIONAL_ENDPOINTS_DATA_TARIFF][a_key] = tariff_resp
+                    # the cache will inform the 'subscribe_forecast' subscribers (if the payload has changed)
+                    self.forecast_cache.put(a_key, tariff_resp, ForecastCache.SOURCE_POLL)
                     tariff_data_was_fetched = True
 
             except Exception as err:
@@ -592,6 +1644,13 @@ class EvccApiBridge:
                 calculate_session_sums(sessions_resp, json_resp)
                 session_data_was_fetched = True
 
+                # the real records of finished sessions are available now - so we can drop our estimations
+                self._live_session_estimator.reconcile()
+
+                # let the coordinator know (e.g. to import the sessions into the HA statistics)
+                if self.coordinator is not None and hasattr(self.coordinator, "sessions_data_updated"):
+                    self.coordinator.sessions_data_updated(sessions_resp)
+
         except BaseException as err:
             _LOGGER.info(f"could not read sessions data '{type(err).__name__}' -> {err}")
 
@@ -1379,39 +2438,38 @@ class EvccApiBridge:
     # above (which aggregate data for entities and intentionally drop large payloads)
     # these return the raw evcc response to the caller, since the websocket connection has
     # no 16384-byte entity-state limit
-    async def evcc_card_read_tariff(self, kind: str) -> dict:
+    async def evcc_card_read_tariff_entry(self, kind: str) -> ForecastCacheEntry | None:
         # CURRENT-UPDATE-STRATEGY is to fetch the data every 15min from the evcc
         # backend... -> this will be triggerd by the websocket message handler by
         # calling _ws_start_async_additional_data_update_task_if_needed()
 
-        # first we check if we already have the tariff data in our storage...
-        r_json = None
-        if self._data is not None:
-            if not ADDITIONAL_ENDPOINTS_DATA_TARIFF in self._data:
-                self._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF] = {}
-
-            if kind in self._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF]:
-                r_json = self._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF][kind]
-
-        if r_json is None:
-            # ok for whatever reason, we have not fetched the tariff data yet... could be
-            # that the `kind` is not part of the `request_tariff_keys` (or we did not
-            # fetch any tariff data yet) - make sure that we update it in our next cycle
-            if kind not in self.request_tariff_keys:
-                if not self.request_tariff_endpoints:
-                    self.request_tariff_endpoints = True
-                self.request_tariff_keys.append(kind)
-
+        # the cached payload is used as long as it's not older than the regular update interval
+        # and still covers 'now' - otherwise (or when the 'kind' is not polled at all) we fetch it
+        # on demand - this does NOT add the 'kind' to the regularly polled 'request_tariff_keys'
+        an_entry = self.forecast_cache.get_fresh(kind, FORECAST_CACHE_MAX_AGE)
+        if an_entry is None:
             # GET /api/tariff/{grid|feedin|solar|planner} -> typically {"rates": [...]}
             req = f"{self.host}/api/{EP_TYPE.TARIFF.value}/{kind}"
             _LOGGER.debug(f"GET request: {req}")
             r_json = await _do_request(method=self.web_session.get(url=req, ssl=False, timeout=static_5sec_timeout))
-            if self._data is not None and r_json is not None and len(r_json) > 0:
-                self._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF][kind] = r_json
+            if isinstance(r_json, dict) and len(r_json) > 0:
+                an_entry = self.forecast_cache.put(kind, r_json, ForecastCache.SOURCE_ON_DEMAND)
+                if self._data is not None and kind in self.request_tariff_keys:
+                    # keep the entity data in sync (only for the polled kinds)
+                    if ADDITIONAL_ENDPOINTS_DATA_TARIFF not in self._data:
+                        self._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF] = {}
+                    self._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF][kind] = r_json
+            else:
+                # evcc is not reachable - a stale entry is better than nothing
+                an_entry = self.forecast_cache.get(kind)
 
-        return r_json if isinstance(r_json, dict) else {}
+        return an_entry
+
+    async def evcc_card_read_tariff(self, kind: str) -> dict:
+        an_entry = await self.evcc_card_read_tariff_entry(kind)
+        return an_entry.data if an_entry is not None and isinstance(an_entry.data, dict) else {}
 
-    async def evcc_card_read_sessions_raw(self, year: int = None, month: int = None) -> list:
+    async def evcc_card_read_sessions_raw(self, year: int = None, month: int = None, start: datetime = None, end: datetime = None) -> list:
         # CURRENT-UPDATE-STRATEGY is to fetch the session data just every hour or when the
         # loadpoint charging attribute will switch (kudos @ mkshb (Bastian)
         # -> this will be triggerd by the websocket message handler by
@@ -1433,29 +2491,32 @@ class EvccApiBridge:
         if not session_data_was_fetched or not isinstance(r_json, list):
             return []
 
-        if year is None and month is None:
-            return r_json
+        return filter_sessions_by_time_range(filter_sessions_by_created(r_json, year, month), start, end)
 
-        filtered = []
-        for a_session in r_json:
-            created = a_session.get("created", None)
-            if created is not None:
-                try:
-                    created_date = parser.isoparse(created)
-                    if (year is None or created_date.year == year) and (month is None or created_date.month == month):
-                        filtered.append(a_session)
-                except Exception as err:
-                    _LOGGER.info(f"read_sessions_raw(): could not parse 'created' {created} -> {type(err).__name__}: {err}")
-        return filtered
+    async def evcc_card_read_session_stats(self, period: str, group_by: str, year: int = None, month: int = None) -> list:
+        # same data source (and update-strategy) as 'evcc_card_read_sessions_raw()' - but instead of
+        # shipping the complete session list to the card, we return the grouped aggregates
+        sessions = await self.evcc_card_read_sessions_raw(year, month)
+        return calculate_session_stats(sessions, period, group_by)
 
 
     async def evcc_card_read_loadpoint_plan_static_preview(self, lp_idx: str, kind: str, value: str, rfc_date: str) -> dict:
-        # here we have no caching strategy... so we must 'hope' the evcc-card will not hammer
-        # requests to our bridge
+        # the previews are cached per (loadpoint, kind, value, target-slot) - the bursts of a
+        # dragged plan slider are additionally debounced by the websocket command handler
+        a_key = PlanPreviewCache.key_for(lp_idx, kind, value, rfc_date)
+        if a_key is not None:
+            a_cached = self.plan_preview_cache.get(a_key)
+            if a_cached is not None:
+                return dict(a_cached)
 
         # GET /api/loadpoints/{idx}/plan/static/preview/{soc|energy}/{value}/{rfc_date}
         # read-only preview - does NOT persist the plan
         req = f"{self.host}/api/{EP_TYPE.LOADPOINTS.value}/{lp_idx}/plan/static/preview/{kind}/{value}/{rfc_date}"
         _LOGGER.debug(f"GET request: {req}")
         r_json = await _do_request(method=self.web_session.get(url=req, ssl=False, timeout=static_5sec_timeout))
-        return r_json if isinstance(r_json, dict) else {}
+        if not isinstance(r_json, dict):
+            return {}
+        if a_key is not None and len(r_json) > 0:
+            self.plan_preview_cache.put(a_key, r_json)
+        # the caller is allowed to modify the returned dict (ws_plan_preview is enriching it)
+        return dict(r_json)
@@ -4,6 +4,23 @@ from typing import Final
 # pause between notification for new data at least 2 seconds
 MAX_WS_NEW_DATA_NOTIFICATION_DELAY: Final = 1
 
+# seconds to wait after a detected session-end, before we fetch the sessions from evcc (evcc
+# needs a moment to persist the final session record)
+SESSION_END_REFRESH_DELAY: Final = 5
+
+# a cached tariff payload is used for max 15 minutes (the regular tariff update interval) - and
+# never after its last slot
+FORECAST_CACHE_MAX_AGE: Final = 900
+
+# the '/api/state' response of the availability check is reused (once) for the first data
+# request of the bridge - when it's not older than this (in seconds)
+STATE_SNAPSHOT_MAX_AGE: Final = 30
+
+# the evcc-card plan previews (LRU) - the cache is cleared when the planner tariff changes (or a
+# new slot begins) - and the previews of a card connection are debounced (in seconds)
+PLAN_PREVIEW_CACHE_SIZE: Final = 64
+PLAN_PREVIEW_DEBOUNCE_DELAY: Final = 0.3
+
 JSONKEY_PLANS_DEPRECATED: Final = "plans"
 JSONKEY_PLAN: Final = "plan"
 JSONKEY_PLAN_SOC: Final = "soc"
@@ -37,6 +54,8 @@ JSONKEY_EVOPT_RES_STATUS: Final = "status"
 JSONKEY_EVOPT_DETAILS: Final = "details"
 JSONKEY_EVOPT_DETAILS_TIMESTAMP: Final = "timestamp"
 JSONKEY_EVOPT_DETAILS_BATTERYDETAILS: Final = "batteryDetails"
+# not part of the evcc data - the values derived by the integration from the evopt series
+JSONKEY_EVOPT_SUMMARY: Final = "summary"
 
 JSONKEY_BATTERYMODE: Final = "batteryMode"
 JSONKEY_BATTERYPOWER: Final = "batteryPower"
@@ -64,6 +83,10 @@ SESSIONS_KEY_RAW: Final = "raw"
 SESSIONS_KEY_TOTAL: Final = "total"
 SESSIONS_KEY_VEHICLES: Final = "vehicles"
 SESSIONS_KEY_LOADPOINTS: Final = "loadpoints"
+SESSIONS_KEY_LIVE: Final = "live"
+
+# our own estimation of the currently running sessions (per loadpoint)
+ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS: Final = "@@@live-session-data"
 
 class EP_TYPE(Enum):
     CIRCUITS    = JSONKEY_CIRCUITS
@@ -75,6 +98,7 @@ class EP_TYPE(Enum):
     TARIFF      = "tariff"
     SESSIONS    = "sessions"
     EVCCCONF    = "evccconf"
+    ANALYTICS   = "analytics"
 
 class BATTERY_CONTENT(Enum):
     SOC     = "soc"
@@ -11,6 +11,7 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     JSONKEY_EVOPT_REQ,
     JSONKEY_EVOPT_RES,
     JSONKEY_EVOPT_DETAILS,
+    JSONKEY_EVOPT_SUMMARY,
     JSONKEY_STATISTICS_TOTAL,
     JSONKEY_STATISTICS_THISYEAR,
     JSONKEY_STATISTICS_365D,
@@ -21,6 +22,7 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     BATTERY_LIST,
     SESSIONS_KEY_VEHICLES,
     SESSIONS_KEY_LOADPOINTS,
+    SESSIONS_KEY_LIVE,
     EVCCCONF_DEVICE_TYPES,
     EP_TYPE,
 )
@@ -193,6 +195,10 @@ class Tag(ApiKey, Enum):
     # batteryGridChargeActive: false,
     BATTERYGRIDCHARGEACTIVE = ApiKey(json_key="batteryGridChargeActive", type=EP_TYPE.SITE, write_key="batterygridchargeactive")
 
+    # this value is NOT present in the data - it's 'on', while the last known (warm start) data
+    # from a previous run is shown, since the evcc server is not available
+    DATASTALE = ApiKey(entity_key="data_stale", json_key="dataStale", type=EP_TYPE.SITE)
+
     # batteryGridChargeLimit: ??
     BATTERYGRIDCHARGELIMIT = ApiKey(json_key="batteryGridChargeLimit", type=EP_TYPE.SITE, write_key="batterygridchargelimit")
 
@@ -201,6 +207,13 @@ class Tag(ApiKey, Enum):
     FORECAST_FEEDIN = ApiKey(entity_key="forecast_feedin", json_key="forecast", type=EP_TYPE.SITE)
     FORECAST_PLANNER = ApiKey(entity_key="forecast_planner", json_key="forecast", type=EP_TYPE.SITE)
 
+    # calculated by the integration (from the grid forecast/tariff)
+    FORECAST_GRID_REMAINING_DAY_AVG = ApiKey(entity_key="forecast_grid_remaining_day_avg", json_key="remaining_day_avg", type=EP_TYPE.ANALYTICS)
+    FORECAST_GRID_REMAINING_DAY_MIN = ApiKey(entity_key="forecast_grid_remaining_day_min", json_key="remaining_day_min", type=EP_TYPE.ANALYTICS)
+    FORECAST_GRID_REMAINING_DAY_MAX = ApiKey(entity_key="forecast_grid_remaining_day_max", json_key="remaining_day_max", type=EP_TYPE.ANALYTICS)
+    FORECAST_GRID_CHEAPEST_WINDOW_START = ApiKey(entity_key="forecast_grid_cheapest_window_start", json_key="cheapest_window_start", type=EP_TYPE.ANALYTICS)
+    FORECAST_GRID_CHEAPEST_WINDOW_AVG = ApiKey(entity_key="forecast_grid_cheapest_window_avg", json_key="cheapest_window_avg", type=EP_TYPE.ANALYTICS)
+
     ###################################
     # CIRCUITS-DATA
     ###################################
@@ -501,12 +514,21 @@ class Tag(ApiKey, Enum):
     CHARGING_SESSIONS_LOADPOINT_ENERGY = ApiKey(entity_key="charging_sessions_loadpoint_chargedenergy", json_key="chargedEnergy", type=EP_TYPE.SESSIONS, subtype=SESSIONS_KEY_LOADPOINTS)
     CHARGING_SESSIONS_LOADPOINT_DURATION = ApiKey(entity_key="charging_sessions_loadpoint_chargeduration", json_key="chargeDuration", type=EP_TYPE.SESSIONS, subtype=SESSIONS_KEY_LOADPOINTS)
 
+    # our own (live) estimation of the currently running session at a loadpoint
+    CHARGING_SESSIONS_LIVE_ENERGY = ApiKey(entity_key="charging_sessions_live_chargedenergy", json_key="chargedEnergy", type=EP_TYPE.SESSIONS, subtype=SESSIONS_KEY_LIVE)
+    CHARGING_SESSIONS_LIVE_COST = ApiKey(entity_key="charging_sessions_live_cost", json_key="cost", type=EP_TYPE.SESSIONS, subtype=SESSIONS_KEY_LIVE)
+    CHARGING_SESSIONS_LIVE_SOLAR_PERCENTAGE = ApiKey(entity_key="charging_sessions_live_solarpercentage", json_key="solarPercentage", type=EP_TYPE.SESSIONS, subtype=SESSIONS_KEY_LIVE)
+
     ###################################
     # EV-OPTIMIZATION
     ###################################
     EVOPT_REQUEST_OBJECT = ApiKey(json_key=JSONKEY_EVOPT_REQ, type=EP_TYPE.EVOPT)
     EVOPT_RESULT_OBJECT = ApiKey(json_key=JSONKEY_EVOPT_RES, type=EP_TYPE.EVOPT)
     EVOPT_DETAILS_OBJECT = ApiKey(json_key=JSONKEY_EVOPT_DETAILS, type=EP_TYPE.EVOPT)
+    # calculated by the integration (from the evopt result series)
+    EVOPT_NEXT_HOUR_GRID_IMPORT = ApiKey(entity_key="evopt_next_hour_grid_import", json_key="next_hour_grid_import", type=EP_TYPE.EVOPT, subtype=JSONKEY_EVOPT_SUMMARY)
+    EVOPT_PEAK_BATTERY_POWER = ApiKey(entity_key="evopt_peak_battery_power", json_key="peak_battery_power", type=EP_TYPE.EVOPT, subtype=JSONKEY_EVOPT_SUMMARY)
+    EVOPT_TOTAL_GRID_EXPORT = ApiKey(entity_key="evopt_total_grid_export", json_key="total_grid_export", type=EP_TYPE.EVOPT, subtype=JSONKEY_EVOPT_SUMMARY)
 
     ###################################
     # CONFIGURATION
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from dataclasses import replace
 from datetime import datetime, timezone
 from numbers import Number
@@ -7,7 +8,7 @@ from numbers import Number
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
@@ -16,8 +17,6 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGED_TOTAL,
     JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGING_POWER,
     JSONKEY_EVOPT_RES_BATTERIES_AINDEX_DISCHARGING_POWER,
-    JSONKEY_EVOPT_DETAILS_BATTERYDETAILS,
-    JSONKEY_EVOPT_DETAILS_TIMESTAMP,
     ADDITIONAL_ENDPOINTS_DATA_EVCCCONF,
     EP_TYPE,
     FORECAST_CONTENT,
@@ -27,10 +26,13 @@ from custom_components.evcc_intg.pyevcc_ha.const import (
     EVCCCONF_KEY_DATA,
     BATTERY_CONTENT
 )
+from custom_components.evcc_intg.pyevcc_ha import pack_forecast
 from custom_components.evcc_intg.pyevcc_ha.keys import Tag, camel_to_snake
 from . import EvccDataUpdateCoordinator, EvccBaseEntity
 from .const import (
     DOMAIN,
+    FORECAST_ATTRIBUTE_MODE_NONE,
+    FORECAST_ATTRIBUTE_MODE_PACKED,
     SENSOR_ENTITIES,
     SENSOR_ENTITIES_GRID_AS_PREFIX,
     SENSOR_ENTITIES_GRID_AS_OBJECT,
@@ -59,6 +61,18 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
     entries_to_check = {}
     the_sensors_list = SENSOR_ENTITIES
 
+    # the sensors that are already registered but disabled are not created at all - when the user
+    # enable such a sensor, hass will reload the config entry (and then the sensor will be created)
+    setup_start = time.monotonic()
+    disabled_unique_ids = coordinator.disabled_unique_ids(Platform.SENSOR)
+    skipped_disabled = []
+
+    def _add_sensor(a_description: ExtSensorEntityDescription):
+        if coordinator.unique_id_for(a_description.key) in disabled_unique_ids:
+            skipped_disabled.append(a_description.key)
+        else:
+            entities.append(EvccSensor(coordinator, a_description))
+
     # we need to check if the grid data (power & currents) is available as a separate object...
     # or if it's still part of the main/site object (as gridPower, gridCurrents)
     if coordinator.grid_data_as_object:
@@ -87,8 +101,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
                     entity_registry_enabled_default = True
                 )
 
-        entity = EvccSensor(coordinator, description)
-        entities.append(entity)
+        _add_sensor(description)
 
     # loadpoint sensors...
     multi_loadpoint_config = len(coordinator._loadpoint) > 1
@@ -166,8 +179,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
                             name_addon = lp_name_addon if multi_loadpoint_config else None,
                         )
 
-                entity = EvccSensor(coordinator, description)
-                entities.append(entity)
+                _add_sensor(description)
 
     # vehicle sensors...
     multi_vehicle_config = multi_loadpoint_config or len(coordinator._vehicle) > 1
@@ -226,8 +238,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
                         name_addon = veh_name_addon
                     )
 
-            entity = EvccSensor(coordinator, description)
-            entities.append(entity)
+            _add_sensor(description)
 
     # the additional circuit entities...
     if coordinator._circuit is not None and len(coordinator._circuit) > 0:
@@ -257,8 +268,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
                         ignore_zero=a_stub.ignore_zero
                     )
 
-                    entity = EvccSensor(coordinator, description)
-                    entities.append(entity)
+                    _add_sensor(description)
 
     # the additional meter entities (from the configuration)
     if configuration_data_available and coordinator._request_ext_meter_data:
@@ -299,14 +309,21 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
                     lookup=a_stub.lookup,
                     ignore_zero=a_stub.ignore_zero
                 )
-                entity = EvccSensor(coordinator, description)
-                entities.append(entity)
-                entries_to_check[entity.entity_id] = {
+                _add_sensor(description)
+                # (the same entity_id as EvccBaseEntity will create - even if the sensor is disabled)
+                entries_to_check[f"{Platform.SENSOR}.{coordinator.system_id}_{camel_to_snake(description.key)}".lower()] = {
                     "tag": description.tag,
                     "evcc_internal_id": description.evcc_internal_id,
                     "description_key": description.key
                 }
 
+    coordinator.setup_profiler.entities_skipped(Platform.SENSOR, len(skipped_disabled))
+    coordinator.sensor_setup_stats = {
+        "created": len(entities),
+        "skipped_disabled": len(skipped_disabled),
+        "setup_ms": round((time.monotonic() - setup_start) * 1000, 1)
+    }
+    _LOGGER.debug(f"SENSOR async_setup_entry(): {coordinator.sensor_setup_stats}")
     add_entity_cb(entities)
 
     async def _check_for_entities_to_enabled():
@@ -317,6 +334,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
         _LOGGER.debug(f"SENSOR _check_for_entities_to_enabled(): Launched... (pause now for 2 minutes)")
         try:
             await asyncio.sleep(120)
+            check_start = time.monotonic()
             _LOGGER.debug(f"SENSOR _check_for_entities_to_enabled(): Wakeup (after 2 minutes) - reset CONFIG_LAST_UPDATE")
             await coordinator.bridge.force_config_update()
 
@@ -368,6 +386,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, add_
                                     disabled_by=None
                                 )
                 _LOGGER.debug(f"SENSOR _check_for_entities_to_enabled(): init is COMPLETED")
+            coordinator.setup_profiler.add_phase("sensor_check_for_entities_to_enabled", time.monotonic() - check_start)
 
         except BaseException as err:
             _LOGGER.warning(f"SENSOR _check_for_entities_to_enabled(): Error: {type(err).__name__} {err}")
@@ -479,13 +498,58 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
     def __init__(self, coordinator: EvccDataUpdateCoordinator, description: ExtSensorEntityDescription):
         super().__init__(entity_type=Platform.SENSOR, coordinator=coordinator, description=description)
         self._previous_float_value: float | None = None
+        self._value_reader = None
+        self._json_idx = description.json_idx if hasattr(description, "json_idx") and description.json_idx is not None and len(description.json_idx) > 0 else None
         if self.tag.type == EP_TYPE.TARIFF or self.tag in [Tag.FORECAST_GRID, Tag.FORECAST_SOLAR, Tag.FORECAST_FEEDIN, Tag.FORECAST_PLANNER]:
             self._last_calculated_key = None
             self._last_calculated_value = None
 
+        # the state & attributes are only recalculated, when the data generation (of the part of the
+        # data the entity depends on) has changed - but not for the entities, where the value also
+        # depends on the current time (tariffs, forecasts & the remaining pv time)
+        self._memo_enabled = not (self.tag.type in [EP_TYPE.TARIFF, EP_TYPE.ANALYTICS] or
+                                  self.tag in [Tag.FORECAST_GRID, Tag.FORECAST_SOLAR, Tag.FORECAST_FEEDIN, Tag.FORECAST_PLANNER, Tag.PVREMAINING])
+        self._memo_subtrees = coordinator.data_subtrees_for(self.tag, self.lp_idx, self.evcc_internal_id)
+        self._memo_value_key = None
+        self._memo_value = None
+        self._memo_attributes_key = None
+        self._memo_attributes = None
+
+    def _memo_key(self):
+        if not self._memo_enabled:
+            return None
+        return self.coordinator.bridge.data_generation_of(self._memo_subtrees), self.coordinator.last_update_success
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # nothing has changed (for this entity) since the last state write - so we can skip it
+        a_key = self._memo_key()
+        if a_key is not None and a_key == self._memo_value_key and a_key == self._memo_attributes_key:
+            self.coordinator.state_write_stats["skipped_unchanged_data"] += 1
+            return
+        super()._handle_coordinator_update()
+
+    def _forecast_attribute(self, a_array, compress_func):
+        # depending on the configured mode, the (large) series is compressed, packed or not provided at all
+        mode = self.coordinator._forecast_attribute_mode
+        if mode == FORECAST_ATTRIBUTE_MODE_NONE:
+            return None
+        elif mode == FORECAST_ATTRIBUTE_MODE_PACKED:
+            return self.coordinator.get_compressed_payload(a_array, pack_forecast)
+        return self.coordinator.get_compressed_payload(a_array, compress_func)
+
     @property
     def extra_state_attributes(self):
         """Return sensor attributes"""
+        a_key = self._memo_key()
+        if a_key is not None and a_key == self._memo_attributes_key:
+            return self._memo_attributes
+        attributes = self._calculate_extra_state_attributes()
+        self._memo_attributes_key = a_key
+        self._memo_attributes = attributes
+        return attributes
+
+    def _calculate_extra_state_attributes(self):
         if self.tag.type == EP_TYPE.SESSIONS:
             if self.tag.subtype is None:
                 return self.coordinator.read_tag_sessions(self.tag)
@@ -495,58 +559,53 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
             if a_dict is not None and "rates" in a_dict:
                 a_array = a_dict["rates"]
                 if a_array is not None:
-                    return {"rates": compress_data(a_array)}
+                    a_value = self._forecast_attribute(a_array, compress_data)
+                    return {"rates": a_value} if a_value is not None else None
                 else:
                     return {"rates": a_array}
             else:
                 return a_dict
 
+        elif self.tag == Tag.FORECAST_GRID_CHEAPEST_WINDOW_START:
+            analytics = self.coordinator.get_forecast_analytics()
+            if analytics is not None and analytics.get("cheapest_window_end", None) is not None:
+                return {"end": datetime.fromtimestamp(analytics["cheapest_window_end"], tz=timezone.utc).isoformat(),
+                        "average": analytics.get("cheapest_window_avg", None),
+                        "hours": self.coordinator._cheapest_window_hours}
+
         elif self.tag.type == EP_TYPE.EVOPT:
             try:
                 # json_idx=[JSONKEY_EVOPT_RES_BATTERIES, 0, JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGED_TOTAL, 0],
-
-                value = self.coordinator.read_tag(self.tag, self.lp_idx)
                 if hasattr(self.entity_description, "json_idx") and self.entity_description.json_idx is not None:
-                    # the Tag.EVOPT_RESULT_OBJECT is very special - we need also the name from the
-                    # details...
-                    a_details_obj = None
-                    a_ts = None
+                    # the Tag.EVOPT_RESULT_OBJECT battery series (incl. the name from the details) are
+                    # provided by the shared (once per change parsed) evopt series of the coordinator
                     if self.tag == Tag.EVOPT_RESULT_OBJECT and len(self.entity_description.json_idx) > 2:
                         if self.entity_description.json_idx[2] in [JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGED_TOTAL,
                                                                    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_CHARGING_POWER,
                                                                    JSONKEY_EVOPT_RES_BATTERIES_AINDEX_DISCHARGING_POWER]:
-
-                            name_index = int(self.entity_description.json_idx[1])
-                            details_obj = self.coordinator.read_tag(Tag.EVOPT_DETAILS_OBJECT, self.lp_idx)
-                            if len(details_obj[JSONKEY_EVOPT_DETAILS_BATTERYDETAILS]) > name_index:
-                                a_details_obj = details_obj[JSONKEY_EVOPT_DETAILS_BATTERYDETAILS][name_index]
-
-                            if len(details_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP]) > name_index:
-                                a_ts = details_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP][name_index]
-
-                            # *big sigh* - all is an array - but for WHATEVER reason the timestamp info
-                            # is only AVAILABLE as a single entry in the list - yes, I know evopt is 'experimental'
-                            # but this came out of nowhere!
-                            elif len(details_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP]) == 1:
-                                a_ts = details_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP][0]
-
+                            a_series = self.coordinator.get_evopt_series()
+                            if a_series is None:
+                                return None
+                            return_obj = a_series.battery_attributes(int(self.entity_description.json_idx[1]), self.entity_description.json_idx[2])
+                            if return_obj is not None:
+                                # long horizons are downsampled (the full series: 'evcc_intg/evopt' websocket command)
+                                return_obj.update(self.coordinator.get_evopt_attribute_values(return_obj["values"]))
+                            return return_obj
+
+                    value = self.coordinator.read_tag(self.tag, self.lp_idx)
                     for idx, key in enumerate(self.entity_description.json_idx[:-1]):
                         try:
                             value = value[key]
                         except (IndexError, KeyError, TypeError):
                             # we brute force our way through the dict/list and if there is an index error,
-                            # we just return None (and ignoring also all other possible additional attributes)
+                            # we just return None
                             value = None
                             break
 
-                    if value is not None:
-                        return_obj = {"values": value}
-                        if a_details_obj is not None:
-                            return_obj.update(a_details_obj)
-                        if a_ts is not None:
-                            return_obj[JSONKEY_EVOPT_DETAILS_TIMESTAMP] = a_ts
-
-                        return return_obj
+                    if isinstance(value, list):
+                        return self.coordinator.get_evopt_attribute_values(value)
+                    elif value is not None:
+                        return {"values": value}
             except (IndexError, ValueError, TypeError, KeyError) as ex:
                 _LOGGER.info(f"Error reading tag {self.tag} ({self.lp_idx}): {ex}")
 
@@ -561,7 +620,8 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
                             # Workaround: compress by stripping 'end' values via compress_data.
                             a_array = data[content_key]
                             if a_array is not None:
-                                return {"rates": compress_data(a_array)}
+                                a_value = self._forecast_attribute(a_array, compress_data)
+                                return {"rates": a_value} if a_value is not None else None
                             else:
                                 return {"rates": a_array}
 
@@ -572,7 +632,11 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
                         a_copy_object = a_object.copy()
                         a_array = a_copy_object["timeseries"]
                         if a_array is not None and ("ts" in a_array[0] or isinstance(a_array[0], list)):
-                            a_copy_object["timeseries"] = compress_timeseries(a_array)
+                            a_value = self._forecast_attribute(a_array, compress_timeseries)
+                            if a_value is not None:
+                                a_copy_object["timeseries"] = a_value
+                            else:
+                                del a_copy_object["timeseries"]
                         else:
                             a_copy_object["timeseries"] = a_array
 
@@ -605,80 +669,24 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
 
     def get_current_value_from_timeseries(self, data_list):
         if data_list is not None:
-            current_time = datetime.now(timezone.utc)
-            a_key = f"{current_time.hour}_{int(current_time.minute//15) if current_time.minute > 0 else 0}"
-            if a_key != self._last_calculated_key:
-                self._last_calculated_key = a_key
-                for a_entry in data_list:
-                    if isinstance(a_entry, dict):
-                        if "start" in a_entry and "end" in a_entry:
-                            start_entry = a_entry["start"]
-                            end_entry = a_entry["end"]
-
-                            parse_from_RFC3339 = None
-                            if isinstance(start_entry, (int, float, Number)):
-                                parse_from_RFC3339 = False
-                            elif isinstance(start_entry, str):
-                                parse_from_RFC3339 = True
-                            else:
-                                _LOGGER.error(f"Invalid start_entry type {ts_entry} {type(ts_entry).__name__}")
-
-                            if parse_from_RFC3339 is not None:
-                                start_dt = datetime.fromisoformat(start_entry).astimezone(timezone.utc) if parse_from_RFC3339 else datetime.fromtimestamp(start_entry, tz=timezone.utc)
-                                end_dt = datetime.fromisoformat(end_entry).astimezone(timezone.utc) if parse_from_RFC3339 else datetime.fromtimestamp(end_entry, tz=timezone.utc)
-                                if start_dt < current_time < end_dt:
-                                    if "val" in a_entry:
-                                        self._last_calculated_value = a_entry["val"]
-                                        break
-                                    elif "value" in a_entry:
-                                        self._last_calculated_value = a_entry["value"]
-                                        break
-                                    elif "price" in a_entry:
-                                        self._last_calculated_value = a_entry["price"]
-                                        break
-
-                        elif "ts" in a_entry:
-                            ts_entry = a_entry["ts"]
-                            parse_from_RFC3339 = None
-                            if isinstance(ts_entry, (int, float, Number)):
-                                parse_from_RFC3339 = False
-                            elif isinstance(ts_entry, str):
-                                parse_from_RFC3339 = True
-                            else:
-                                _LOGGER.error(f"Invalid ts_entry type {ts_entry} {type(ts_entry).__name__}")
-
-                            if parse_from_RFC3339 is not None:
-                                timestamp_dt = datetime.fromisoformat(ts_entry).astimezone(timezone.utc) if parse_from_RFC3339 else datetime.fromtimestamp(ts_entry, tz=timezone.utc)
-                                if (timestamp_dt.day == current_time.day and
-                                        timestamp_dt.hour == current_time.hour and
-                                        int(timestamp_dt.minute // 15) == int(current_time.minute // 15)
-                                ):
-                                    if "val" in a_entry:
-                                        self._last_calculated_value = a_entry["val"]
-                                        break
-                                    elif "value" in a_entry:
-                                        self._last_calculated_value = a_entry["value"]
-                                        break
-                                    elif "price" in a_entry:
-                                        self._last_calculated_value = a_entry["price"]
-                                        break
-
-                    # since evcc 0.314.1
-                    elif isinstance(a_entry, list):
-                        # ok the new structure is implemented here...
-                        # the timeseries is no longer a dict, it's just a list...
-                        # *sigh* thanks for this last minute u-turn... My day was not alreday long enough...
-                        value_index = 2
-                        if len(a_entry) == 2:
-                            value_index = 1
-
-                        timestamp_dt = datetime.fromtimestamp(a_entry[0], tz=timezone.utc)
-                        if (timestamp_dt.day == current_time.day and
-                                timestamp_dt.hour == current_time.hour and
-                                int(timestamp_dt.minute // 15) == int(current_time.minute // 15)
-                        ):
-                            self._last_calculated_value = a_entry[value_index]
-                            break
+            now_ts = datetime.now(timezone.utc).timestamp()
+            an_index = self.coordinator.get_timeseries_index(data_list)
+            # the calculated value is valid till the end of the current slot (or a new payload)
+            if self._last_calculated_key is None or self._last_calculated_key[0] is not an_index or now_ts >= self._last_calculated_key[1]:
+                a_value, start_ts, end_ts = an_index.slot_at(now_ts)
+                if start_ts is not None:
+                    self._last_calculated_value = a_value
+                    valid_until = end_ts
+                else:
+                    # no current slot - but maybe the payload starts in the future
+                    valid_until = an_index.next_slot_at(now_ts)[1]
+
+                if valid_until is not None:
+                    self._last_calculated_key = (an_index, valid_until)
+                    if self.hass is not None:
+                        self.coordinator.schedule_slot_boundary_update(self, valid_until)
+                else:
+                    self._last_calculated_key = None
 
             return self._last_calculated_value
         return None
@@ -686,6 +694,15 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
+        a_key = self._memo_key()
+        if a_key is not None and a_key == self._memo_value_key:
+            return self._memo_value
+        value = self._calculate_native_value()
+        self._memo_value_key = a_key
+        self._memo_value = value
+        return value
+
+    def _calculate_native_value(self):
         if self.tag.type == EP_TYPE.SESSIONS:
             attr_data = self.coordinator.read_tag_sessions(self.tag, self._attr_name_addon)
             if attr_data is not None:
@@ -700,6 +717,18 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
 
             return None
 
+        if self.tag.type == EP_TYPE.ANALYTICS:
+            analytics = self.coordinator.get_forecast_analytics()
+            if analytics is None:
+                return None
+            if self.hass is not None:
+                # the remaining-day values change with every passed slot
+                self.coordinator.schedule_slot_boundary_update(self, analytics["valid_until"])
+            value = analytics.get(self.tag.json_key, None)
+            if value is not None and self.tag == Tag.FORECAST_GRID_CHEAPEST_WINDOW_START:
+                value = datetime.fromtimestamp(value, tz=timezone.utc)
+            return value
+
         if self.tag.type == EP_TYPE.TARIFF:
             attr_data = self.coordinator.read_tag_tariff(self.tag)
             if attr_data is not None and "rates" in attr_data:
@@ -724,11 +753,14 @@ class EvccSensor(EvccBaseEntity, SensorEntity, RestoreEntity):
 
             else:
                 # for special vehicle sensors, we already provide a vehicle_id, so the tag reading code
-                # can use the 'evcc_internal_id'
-                value = self.coordinator.read_tag(self.tag, self.lp_idx, self.evcc_internal_id)
-
-            if hasattr(self.entity_description, "json_idx") and self.entity_description.json_idx is not None:
-                for idx, key in enumerate(self.entity_description.json_idx):
+                # can use the 'evcc_internal_id' - the reader is created once (the tag, lp_idx &
+                # evcc_internal_id of an entity never change)
+                if self._value_reader is None:
+                    self._value_reader = self.coordinator.compile_tag_reader(self.tag, self.lp_idx, self.evcc_internal_id)
+                value = self._value_reader()
+
+            if self._json_idx is not None:
+                for idx, key in enumerate(self._json_idx):
                     if isinstance(value, (list, dict)):
                         if isinstance(key, int) and len(value) > key:
                             value = value[key]
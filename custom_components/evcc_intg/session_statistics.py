@@ -0,0 +1,134 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from numbers import Number
+
+from dateutil import parser
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# a session record is created by evcc a few seconds after the session has been finished - so we
+# only import hours, that have been completed for some time (otherwise a late arriving session
+# would get lost, since we never touch an already imported hour again)
+STATISTICS_IMPORT_GRACE_PERIOD = timedelta(minutes=15)
+
+STATISTICS_METRIC_ENERGY = "charged_energy"
+STATISTICS_METRIC_COST = "cost"
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, Number) and not isinstance(value, bool) else 0.0
+
+
+def build_hourly_session_series(sessions: list) -> dict:
+    # (kind, name) -> {hour_start_utc: [charged_energy, cost]} - a session is booked into
+    # the hour it has been finished (or created, in case we don't have a 'finished' date)
+    series = {}
+    for a_session in sessions:
+        if not isinstance(a_session, dict):
+            continue
+        a_date = a_session.get("finished", None) or a_session.get("created", None)
+        if a_date is None:
+            continue
+        try:
+            a_hour = parser.isoparse(a_date).astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        except (ValueError, TypeError):
+            _LOGGER.debug(f"build_hourly_session_series(): invalid date in session: {a_session}")
+            continue
+
+        charged_energy = _number(a_session.get("chargedEnergy", 0))
+        cost = _number(a_session.get("price", 0))
+        for a_kind in ["loadpoint", "vehicle"]:
+            a_name = a_session.get(a_kind, None)
+            if a_name is None or len(a_name) == 0:
+                continue
+            hour_values = series.setdefault((a_kind, a_name), {})
+            if a_hour not in hour_values:
+                hour_values[a_hour] = [0.0, 0.0]
+            hour_values[a_hour][0] += charged_energy
+            hour_values[a_hour][1] += cost
+    return series
+
+
+def _statistic_id(system_id: str, kind: str, name: str, metric: str) -> str:
+    return f"{DOMAIN}:{slugify(f'{system_id}_{kind}_{name}_{metric}')}"
+
+
+async def _async_get_last_sum(hass: HomeAssistant, statistic_id: str):
+    last_stats = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, statistic_id, True, {"sum"})
+    if statistic_id in last_stats and len(last_stats[statistic_id]) > 0:
+        last_entry = last_stats[statistic_id][0]
+        last_start = last_entry["start"]
+        # depending on the HA version, we get a timestamp or a datetime object
+        if isinstance(last_start, (int, float)):
+            last_start = datetime.fromtimestamp(last_start, tz=timezone.utc)
+        return last_start, last_entry.get("sum", 0) or 0
+    return None, 0
+
+
+def _create_metadata(statistic_id: str, name: str, unit: str) -> StatisticMetaData:
+    metadata = StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=name,
+        source=DOMAIN,
+        statistic_id=statistic_id,
+        unit_of_measurement=unit,
+    )
+    try:
+        # newer HA versions want the 'mean_type' instead of 'has_mean'
+        from homeassistant.components.recorder.models import StatisticMeanType
+        metadata["mean_type"] = StatisticMeanType.NONE
+    except ImportError:
+        pass
+    return metadata
+
+
+async def async_import_session_statistics(hass: HomeAssistant, coordinator, sessions: list) -> int:
+    # we write the per-hour charged energy & costs of each loadpoint and vehicle as external
+    # statistics. The first run will backfill the complete session history, all following runs
+    # will only add the hours after the last imported one.
+    if "recorder" not in hass.config.components:
+        _LOGGER.debug("async_import_session_statistics(): recorder not loaded - skipping")
+        return 0
+
+    if sessions is None or not isinstance(sessions, list) or len(sessions) == 0:
+        return 0
+
+    import_until = datetime.now(timezone.utc) - STATISTICS_IMPORT_GRACE_PERIOD - timedelta(hours=1)
+    imported_hours = 0
+    for (a_kind, a_name), hour_values in build_hourly_session_series(sessions).items():
+        for a_metric, a_value_idx, a_unit in [(STATISTICS_METRIC_ENERGY, 0, UnitOfEnergy.KILO_WATT_HOUR),
+                                              (STATISTICS_METRIC_COST, 1, coordinator._currency)]:
+            statistic_id = _statistic_id(coordinator._system_id, a_kind, a_name, a_metric)
+            last_start, a_sum = await _async_get_last_sum(hass, statistic_id)
+
+            statistics = []
+            for a_hour in sorted(hour_values):
+                if a_hour > import_until:
+                    break
+                if last_start is not None and a_hour <= last_start:
+                    continue
+                a_value = round(hour_values[a_hour][a_value_idx], 4)
+                a_sum += a_value
+                statistics.append(StatisticData(start=a_hour, state=a_value, sum=round(a_sum, 4)))
+
+            if len(statistics) > 0:
+                if last_start is None:
+                    _LOGGER.info(f"async_import_session_statistics(): backfill {len(statistics)} hours for '{statistic_id}'")
+                else:
+                    _LOGGER.debug(f"async_import_session_statistics(): add {len(statistics)} hours for '{statistic_id}'")
+
+                a_title = f"evcc {a_name} {a_metric.replace('_', ' ')}"
+                async_add_external_statistics(hass, _create_metadata(statistic_id, a_title, a_unit), statistics)
+                imported_hours += len(statistics)
+
+    return imported_hours
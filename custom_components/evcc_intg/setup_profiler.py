@@ -0,0 +1,83 @@
+import logging
+import time
+from contextlib import contextmanager
+
+import aiohttp
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+
+class SetupProfiler:
+    # an (opt-in) recorder for the duration of the async_setup_entry() phases, the number of
+    # created entities per platform and the number of REST calls to evcc - the results are part
+    # of the diagnostics. When not enabled, all the methods are no-ops.
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._start = time.monotonic()
+        self._completed = None
+        self.phases = {}
+        self.entities = {}
+        self.skipped_entities = {}
+        self.rest_calls = 0
+        self.rest_calls_by_path = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        phase_start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.monotonic() - phase_start) * 1000, 1)
+
+    def add_phase(self, name: str, duration_in_sec: float):
+        if self.enabled:
+            self.phases[name] = round(duration_in_sec * 1000, 1)
+
+    def entity_created(self, platform: str):
+        if self.enabled:
+            self.entities[platform] = self.entities.get(platform, 0) + 1
+
+    def entities_skipped(self, platform: str, count: int):
+        if self.enabled:
+            self.skipped_entities[platform] = self.skipped_entities.get(platform, 0) + count
+
+    def trace_configs(self) -> list:
+        # the REST calls are counted via the aiohttp request tracing of the http session (only
+        # till the setup has been completed - later the websocket & polling requests would
+        # just add noise)
+        if not self.enabled:
+            return []
+
+        async def _on_request_start(session, trace_config_ctx, params):
+            if self._completed is None:
+                self.rest_calls += 1
+                a_path = params.url.path
+                self.rest_calls_by_path[a_path] = self.rest_calls_by_path.get(a_path, 0) + 1
+
+        a_trace_config = aiohttp.TraceConfig()
+        a_trace_config.on_request_start.append(_on_request_start)
+        return [a_trace_config]
+
+    def complete(self):
+        if self.enabled and self._completed is None:
+            self._completed = time.monotonic()
+            _LOGGER.info(f"SetupProfiler: setup completed in {self._duration_in_ms()} ms - phases: {self.phases} entities: {self.entities} skipped: {self.skipped_entities} REST calls: {self.rest_calls}")
+
+    def _duration_in_ms(self) -> float | None:
+        if self._completed is None:
+            return None
+        return round((self._completed - self._start) * 1000, 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "total_ms": self._duration_in_ms(),
+            "phases_ms": dict(self.phases),
+            "entities": dict(self.entities),
+            "skipped_entities": dict(self.skipped_entities),
+            "rest_calls": self.rest_calls,
+            "rest_calls_by_path": dict(self.rest_calls_by_path),
+        }
@@ -0,0 +1,73 @@
+import copy
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.evcc_intg.pyevcc_ha.const import ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS
+from custom_components.evcc_intg.pyevcc_ha import ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW
+from .const import DOMAIN
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+WARM_START_STORAGE_VERSION = 1
+
+# how often the last known evcc data is written to the .storage - and how old a snapshot can be, so
+# that it is still used (when the evcc server is not available during the startup of HA)
+WARM_START_SAVE_INTERVAL = timedelta(minutes=15)
+WARM_START_MAX_AGE = timedelta(days=2)
+# how long the last known data will be served (while the evcc server is still not available)
+# before the entities become unavailable
+WARM_START_MAX_SERVE_TIME = timedelta(hours=1)
+
+# the (large or purely runtime) parts of the data, that are not persisted
+WARM_START_EXCLUDED_KEYS = [ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW, ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]
+
+
+class EvccWarmStartStore:
+    # a compact last known snapshot of the bridge data (the evcc 'state' incl. the tariff, sessions
+    # and configuration data - the loadpoint & vehicle topology is build from it) - it is used
+    # to set up the integration, when the evcc server is not available during the startup
+    def __init__(self, hass: HomeAssistant, config_entry_id: str):
+        self._store = Store(hass, WARM_START_STORAGE_VERSION, f"{DOMAIN}_warm_start_{config_entry_id}")
+
+    async def async_load(self) -> tuple[dict, datetime] | None:
+        try:
+            stored = await self._store.async_load()
+        except BaseException as exc:
+            _LOGGER.info(f"EvccWarmStartStore.async_load(): could not load the snapshot: {type(exc).__name__} - {exc}")
+            return None
+
+        if not isinstance(stored, dict) or not isinstance(stored.get("data", None), dict) or len(stored["data"]) == 0:
+            return None
+
+        saved_at = dt_util.parse_datetime(stored.get("saved_at", "")) if isinstance(stored.get("saved_at", None), str) else None
+        if saved_at is None or dt_util.utcnow() - saved_at > WARM_START_MAX_AGE:
+            _LOGGER.debug(f"EvccWarmStartStore.async_load(): ignoring outdated snapshot from {saved_at}")
+            return None
+
+        return stored["data"], saved_at
+
+    def _payload(self, data: dict) -> dict:
+        # a deep copy, since the data will be serialized (in the executor) while the websocket
+        # might still update the bridge data
+        return {
+            "saved_at": dt_util.utcnow().isoformat(),
+            "data": copy.deepcopy({a_key: a_value for a_key, a_value in data.items() if a_key not in WARM_START_EXCLUDED_KEYS})
+        }
+
+    async def async_save(self, data: dict | None):
+        if data is None or len(data) == 0:
+            return
+        await self._store.async_save(self._payload(data))
+
+    def async_save_on_final_write(self, data: dict | None):
+        # when hass is stopping, the (delayed) data will be written with the final write of all stores
+        if data is None or len(data) == 0:
+            return
+        self._store.async_delay_save(lambda: self._payload(data))
+
+    async def async_remove(self):
+        await self._store.async_remove()
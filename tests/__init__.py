@@ -0,0 +1 @@
+"""Tests & benchmarks for the evcc_intg integration."""
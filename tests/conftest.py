@@ -0,0 +1,35 @@
+import pytest
+
+from custom_components.evcc_intg.const import DOMAIN
+from .evcc_stub import EvccStubServer, create_config_entry
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture
+def expected_lingering_tasks() -> bool:
+    # the select platform starts a (delayed) min/max check task, that is not bound to the config entry
+    return True
+
+
+@pytest.fixture
+async def evcc_stub_server(socket_enabled):
+    # a local (minimal) evcc server - serving the 'state', the 'tariff' & the 'sessions' endpoints
+    a_server = EvccStubServer()
+    await a_server.start()
+    yield a_server
+    await a_server.close()
+
+
+@pytest.fixture
+async def evcc_coordinator(hass, evcc_stub_server):
+    # the coordinator of a config entry, that has been set up against the stub server
+    a_entry = create_config_entry(hass, evcc_stub_server.host)
+    assert await hass.config_entries.async_setup(a_entry.entry_id)
+    await hass.async_block_till_done()
+    yield hass.data[DOMAIN][a_entry.entry_id]
+    await hass.config_entries.async_unload(a_entry.entry_id)
+    await hass.async_block_till_done()
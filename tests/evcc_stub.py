@@ -0,0 +1,220 @@
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evcc_intg.const import DOMAIN, CONF_USE_WS, CONF_PROFILE_SETUP
+
+
+def create_config_entry(hass: HomeAssistant, host: str, **data) -> MockConfigEntry:
+    # a polling (no websocket) config entry with the setup profiler enabled
+    a_entry = MockConfigEntry(domain=DOMAIN, title="evcc stub", data={
+        CONF_NAME: "evcc stub",
+        CONF_HOST: host,
+        CONF_SCAN_INTERVAL: 30,
+        CONF_USE_WS: False,
+        CONF_PROFILE_SETUP: True,
+        **data
+    })
+    a_entry.add_to_hass(hass)
+    return a_entry
+
+
+def forecast_slots(count: int, slot_minutes: int = 15, start: datetime = None, base_value: float = 0.2512) -> list:
+    # evcc tariff/forecast rates: [{"start": RFC3339, "end": RFC3339, "value": float}, ...]
+    if start is None:
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    slots = []
+    for idx in range(count):
+        a_start = start + timedelta(minutes=slot_minutes * idx)
+        slots.append({
+            "start": a_start.isoformat(),
+            "end": (a_start + timedelta(minutes=slot_minutes)).isoformat(),
+            "value": round(base_value + (idx % 24) * 0.0137 - (idx % 7) * 0.0041, 5)
+        })
+    return slots
+
+
+def loadpoint_state(idx: int, vehicle_name: str) -> dict:
+    return {
+        "title": f"Carport {idx}",
+        "mode": "pv",
+        "enabled": False,
+        "charging": False,
+        "connected": True,
+        "connectedDuration": 3600,
+        "chargeCurrent": 0,
+        "chargeCurrents": [0, 0, 0],
+        "chargeVoltages": [230.1, 229.8, 231.0],
+        "chargeDuration": 0,
+        "chargeRemainingDuration": 0,
+        "chargePower": 0,
+        "chargeTotalImport": 1234.567,
+        "chargedEnergy": 0,
+        "chargeRemainingEnergy": 0,
+        "chargerPhases1p3p": True,
+        "chargerSinglePhase": False,
+        "disabled": False,
+        "effectiveLimitSoc": 80,
+        "effectivePlanSoc": 0,
+        "effectivePlanTime": "0001-01-01T00:00:00Z",
+        "enableDelay": 60,
+        "disableDelay": 180,
+        "enableThreshold": 0,
+        "disableThreshold": 0,
+        "limitSoc": 0,
+        "limitEnergy": 0,
+        "maxCurrent": 16,
+        "minCurrent": 6,
+        "phaseAction": "inactive",
+        "phaseRemaining": 0,
+        "phasesActive": 3,
+        "phasesConfigured": 0,
+        "phasesEnabled": 3,
+        "planActive": False,
+        "planEnergy": 0,
+        "planOverrun": 0,
+        "planTime": "0001-01-01T00:00:00Z",
+        "priority": 0,
+        "pvAction": "inactive",
+        "pvRemaining": 0,
+        "sessionCo2PerKWh": None,
+        "sessionEnergy": 0,
+        "sessionPrice": None,
+        "sessionPricePerKWh": None,
+        "sessionSolarPercentage": 0,
+        "smartCostActive": False,
+        "smartCostLimit": None,
+        "batteryBoost": False,
+        "vehicleClimaterActive": None,
+        "vehicleDetectionActive": False,
+        "vehicleName": vehicle_name,
+        "vehicleOdometer": 12345,
+        "vehicleRange": 250,
+        "vehicleLimitSoc": 80,
+        "vehicleSoc": 55,
+        "vehicleWelcomeActive": False,
+    }
+
+
+def evcc_state(loadpoints: int = 2, vehicles: int = 2, forecast_slots_count: int = 96) -> dict:
+    vehicle_state = {}
+    for idx in range(1, vehicles + 1):
+        vehicle_state[f"db:{idx}"] = {
+            "title": f"Car {idx}",
+            "capacity": 60 + idx,
+            "minSoc": 20,
+            "limitSoc": 80,
+        }
+    vehicle_keys = list(vehicle_state.keys())
+    return {
+        "version": "0.300.0",
+        "availableVersion": "0.300.0",
+        "currency": "EUR",
+        "smartCostType": "priceforecast",
+        "siteTitle": "Stub",
+        "auxPower": 0,
+        "batteryMode": "normal",
+        "batteryPower": -512.3,
+        "batterySoc": 63,
+        "batteryCapacity": 10.2,
+        "batteryEnergy": 4321.1,
+        "batteryDischargeControl": False,
+        "batteryGridChargeActive": False,
+        "batteryGridChargeLimit": None,
+        "pvPower": 3456.7,
+        "pvEnergy": 9876.5,
+        "gridPower": -1234.5,
+        "gridCurrents": [1.2, 0.8, 1.1],
+        "homePower": 987.6,
+        "residualPower": 100,
+        "tariffGrid": 0.2534,
+        "tariffPriceHome": 0.2534,
+        "tariffPriceLoadpoints": 0.2534,
+        "tariffFeedIn": 0.078,
+        "tariffCo2": 412,
+        "tariffCo2Home": 412,
+        "tariffCo2Loadpoints": 412,
+        "tariffSolar": 4321,
+        "forecast": {
+            "grid": forecast_slots(forecast_slots_count),
+            "feedin": forecast_slots(forecast_slots_count, base_value=0.078),
+            "planner": forecast_slots(forecast_slots_count),
+            "solar": {
+                "timeseries": [{"ts": a_slot["start"], "val": int(a_slot["value"] * 10000)} for a_slot in forecast_slots(forecast_slots_count)],
+            },
+        },
+        "statistics": {
+            a_period: {"avgCo2": 123.4, "avgPrice": 0.231, "chargedKWh": 456.7, "solarPercentage": 61.2}
+            for a_period in ["30d", "365d", "thisYear", "total"]
+        },
+        "vehicles": vehicle_state,
+        "loadpoints": [loadpoint_state(idx, vehicle_keys[(idx - 1) % len(vehicle_keys)] if len(vehicle_keys) > 0 else "")
+                       for idx in range(1, loadpoints + 1)],
+    }
+
+
+class EvccStubServer:
+    # a local evcc server, that serves the endpoints that are requested during the setup of the
+    # integration - all the requests are counted (per path). A websocket client receives the
+    # (scripted) 'ws_messages' and the connection is closed afterwards
+    def __init__(self, state: dict = None):
+        self.state = state if state is not None else evcc_state()
+        self.requests = {}
+        self.ws_messages = []
+        self._server = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/api/state", self._handle_state)
+        self.app.router.add_get("/api/tariff/{kind}", self._handle_tariff)
+        self.app.router.add_get("/api/sessions", self._handle_sessions)
+        self.app.router.add_get("/api/loadpoints/{idx}/plan/static/preview/{kind}/{value}/{target}", self._handle_plan_preview)
+        self.app.router.add_get("/ws", self._handle_ws)
+
+    @property
+    def host(self) -> str:
+        return f"http://{self._server.host}:{self._server.port}"
+
+    async def start(self):
+        self._server = TestServer(self.app, host="127.0.0.1")
+        await self._server.start_server()
+
+    async def close(self):
+        if self._server is not None:
+            await self._server.close()
+
+    def _count(self, request: web.Request):
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+
+    async def _handle_state(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.json_response(self.state)
+
+    async def _handle_tariff(self, request: web.Request) -> web.Response:
+        self._count(request)
+        a_kind = request.match_info["kind"]
+        a_forecast = self.state.get("forecast", {}).get(a_kind, None)
+        if not isinstance(a_forecast, list):
+            raise web.HTTPNotFound()
+        return web.json_response({"rates": a_forecast})
+
+    async def _handle_sessions(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.json_response([])
+
+    async def _handle_plan_preview(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.json_response({"planTime": request.match_info["target"], "duration": 3600,
+                                  "plan": [], "power": 11000, "value": request.match_info["value"]})
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        self._count(request)
+        a_ws = web.WebSocketResponse()
+        await a_ws.prepare(request)
+        for a_message in self.ws_messages:
+            await a_ws.send_json(a_message)
+        await a_ws.close()
+        return a_ws
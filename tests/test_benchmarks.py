@@ -0,0 +1,161 @@
+import json
+import time
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from custom_components.evcc_intg import entity as evcc_entity
+from custom_components.evcc_intg.const import DOMAIN
+from custom_components.evcc_intg.pyevcc_ha import pack_forecast
+from custom_components.evcc_intg.pyevcc_ha.const import EP_TYPE
+from custom_components.evcc_intg.sensor import EvccSensor, compress_data
+from .evcc_stub import create_config_entry, forecast_slots
+
+# the timings are only reported ('pytest -s' or the junit xml) - the tests just assert the behaviour
+
+
+def measure(func, rounds: int) -> float:
+    # the average duration of a single call in microseconds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return round((time.perf_counter() - start) * 1_000_000 / rounds, 3)
+
+
+def report(record_property, name: str, **values):
+    for a_key, a_value in values.items():
+        record_property(f"{name}.{a_key}", a_value)
+    print(f"\n{name}: {values}")
+
+
+def evcc_sensors(hass: HomeAssistant) -> list:
+    return [a_entity for a_platform in async_get_platforms(hass, DOMAIN) for a_entity in a_platform.entities.values()
+            if isinstance(a_entity, EvccSensor)]
+
+
+async def test_setup(hass: HomeAssistant, evcc_stub_server, record_property):
+    a_entry = create_config_entry(hass, evcc_stub_server.host)
+
+    start = time.perf_counter()
+    assert await hass.config_entries.async_setup(a_entry.entry_id)
+    await hass.async_block_till_done()
+    setup_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    assert a_entry.state is ConfigEntryState.LOADED
+    a_profile = hass.data[DOMAIN][a_entry.entry_id].setup_profiler.as_dict()
+    report(record_property, "setup", setup_ms=setup_ms, profile=a_profile, stub_requests=dict(evcc_stub_server.requests))
+
+    assert a_profile["total_ms"] is not None
+    assert sum(a_profile["entities"].values()) > 0
+    # the state that has been read by the availability check is reused by the first refresh
+    assert evcc_stub_server.requests["/api/state"] == 1
+
+    assert await hass.config_entries.async_unload(a_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_disabled_sensors_are_not_created(hass: HomeAssistant, evcc_stub_server, record_property):
+    a_entry = create_config_entry(hass, evcc_stub_server.host)
+
+    # the first setup creates all sensors (the disabled by default sensors are registered as disabled)
+    assert await hass.config_entries.async_setup(a_entry.entry_id)
+    await hass.async_block_till_done()
+    first_stats = dict(hass.data[DOMAIN][a_entry.entry_id].sensor_setup_stats)
+
+    # ...with the next setup the registered but disabled sensors are not created at all
+    assert await hass.config_entries.async_reload(a_entry.entry_id)
+    await hass.async_block_till_done()
+    assert a_entry.state is ConfigEntryState.LOADED
+    reload_stats = dict(hass.data[DOMAIN][a_entry.entry_id].sensor_setup_stats)
+
+    report(record_property, "disabled_entities",
+           sensor_objects_first_setup=first_stats["created"], sensor_objects_reload=reload_stats["created"],
+           skipped_disabled=reload_stats["skipped_disabled"],
+           sensor_setup_ms_first_setup=first_stats["setup_ms"], sensor_setup_ms_reload=reload_stats["setup_ms"])
+
+    assert first_stats["skipped_disabled"] == 0
+    assert reload_stats["skipped_disabled"] > 0
+    assert reload_stats["created"] + reload_stats["skipped_disabled"] == first_stats["created"]
+
+    assert await hass.config_entries.async_unload(a_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize("slots", [96, 192])
+async def test_forecast_compression(evcc_coordinator, slots, record_property):
+    a_forecast = forecast_slots(slots)
+
+    report(record_property, f"forecast_compression_{slots}",
+           uncached_us=measure(lambda: compress_data(a_forecast), rounds=200),
+           cached_us=measure(lambda: evcc_coordinator.get_compressed_payload(a_forecast, compress_data), rounds=200),
+           raw_bytes=len(json.dumps(a_forecast)),
+           compressed_bytes=len(json.dumps(compress_data(a_forecast))),
+           packed_bytes=len(json.dumps(pack_forecast(a_forecast))))
+
+    # the cache hit returns the identical (already compressed) object
+    a_compressed = evcc_coordinator.get_compressed_payload(a_forecast, compress_data)
+    assert a_compressed == compress_data(a_forecast)
+    assert evcc_coordinator.get_compressed_payload(a_forecast, compress_data) is a_compressed
+
+    # a new payload (from 'read_tariff_data' or the websocket) is compressed again
+    a_new_forecast = forecast_slots(slots, base_value=0.3)
+    a_new_compressed = evcc_coordinator.get_compressed_payload(a_new_forecast, compress_data)
+    assert a_new_compressed is not a_compressed
+    assert a_new_compressed == compress_data(a_new_forecast)
+
+
+async def test_compiled_tag_readers(hass: HomeAssistant, evcc_coordinator, record_property):
+    sensors = [a_sensor for a_sensor in evcc_sensors(hass) if a_sensor.tag.type != EP_TYPE.EVCCCONF]
+    assert len(sensors) > 0
+    tag_args = [(a_sensor.tag, a_sensor.lp_idx, a_sensor.evcc_internal_id) for a_sensor in sensors]
+    compiled_readers = [evcc_coordinator.compile_tag_reader(*a_args) for a_args in tag_args]
+
+    def read_all_generic():
+        for a_args in tag_args:
+            evcc_coordinator.read_tag(*a_args)
+
+    def read_all_compiled():
+        for a_reader in compiled_readers:
+            a_reader()
+
+    report(record_property, "tag_reader", sensors=len(sensors),
+           read_tag_all_us=measure(read_all_generic, rounds=200),
+           compiled_all_us=measure(read_all_compiled, rounds=200))
+
+    # the compiled readers must return the same values as the generic read_tag()
+    for a_args, a_reader in zip(tag_args, compiled_readers):
+        assert a_reader() == evcc_coordinator.read_tag(*a_args), f"{a_args}"
+
+
+async def test_state_write_with_cached_friendly_name(hass: HomeAssistant, evcc_coordinator, monkeypatch, record_property):
+    # the custom friendly name is only used with HA 2026.2 (and newer)
+    monkeypatch.setattr(evcc_entity, "USE_NEW_FRIENDLY_NAME", True)
+    sensors = evcc_sensors(hass)
+    assert len(sensors) > 0
+
+    def write_all_cached():
+        for a_sensor in sensors:
+            a_sensor.async_write_ha_state()
+
+    def write_all_uncached():
+        for a_sensor in sensors:
+            a_sensor._friendly_name_cache = None
+            a_sensor.async_write_ha_state()
+
+    report(record_property, "state_write", sensors=len(sensors),
+           cached_all_us=measure(write_all_cached, rounds=20),
+           uncached_all_us=measure(write_all_uncached, rounds=20))
+
+    for a_sensor in sensors:
+        assert a_sensor._cached_friendly_name_internal() == a_sensor._friendly_name_internal()
+
+    # a renamed entity must not keep the cached friendly name
+    a_sensor = sensors[0]
+    er.async_get(hass).async_update_entity(a_sensor.entity_id, name="renamed sensor")
+    await hass.async_block_till_done()
+    assert a_sensor._cached_friendly_name_internal().endswith("renamed sensor")
+    a_sensor.async_write_ha_state()
+    assert hass.states.get(a_sensor.entity_id).attributes["friendly_name"].endswith("renamed sensor")
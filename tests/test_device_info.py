@@ -0,0 +1,22 @@
+from custom_components.evcc_intg.pyevcc_ha.const import ADDITIONAL_ENDPOINTS_DATA_EVCCCONF, EVCCCONF_KEY_CONFIG, EVCCCONF_DEVICE_TYPES
+
+
+def set_meter_config(coordinator, meter_config: dict):
+    coordinator.data[ADDITIONAL_ENDPOINTS_DATA_EVCCCONF] = {EVCCCONF_KEY_CONFIG: {EVCCCONF_DEVICE_TYPES.METER.value: meter_config}}
+
+
+async def test_device_info_key_follows_the_meter_configuration(evcc_coordinator):
+    set_meter_config(evcc_coordinator, {"meter1": "grid", "meter2": "pv"})
+    a_key = evcc_coordinator.device_info_key()
+
+    # a reloaded (new) but equal configuration keeps the cached device infos
+    set_meter_config(evcc_coordinator, {"meter2": "pv", "meter1": "grid"})
+    assert evcc_coordinator.device_info_key() == a_key
+
+    # a changed meter type must invalidate them
+    set_meter_config(evcc_coordinator, {"meter1": "grid", "meter2": "battery"})
+    assert evcc_coordinator.device_info_key() != a_key
+
+    a_key = evcc_coordinator.device_info_key()
+    evcc_coordinator.invalidate_device_info()
+    assert evcc_coordinator.device_info_key() != a_key
@@ -0,0 +1,107 @@
+from custom_components.evcc_intg import PAYLOAD_CACHE_MAX_SIZE
+from custom_components.evcc_intg.pyevcc_ha import EvoptSeries, downsample_bucket_mean
+
+
+def evopt_block(timestamps: list) -> dict:
+    # two batteries, four 15min slots (the per-slot values are energies in Wh)
+    return {
+        "req": {"time_series": {"dt": [900, 900, 900, 900]}},
+        "res": {
+            "grid_import": [100, 200, 300, 400],
+            "grid_export": [0, 50, 25, 0],
+            "batteries": [
+                {"charging_power": [500, 0, 250, 0], "discharging_power": [0, 100, 0, 0], "state_of_charge": [5000, 5500, 5400, 5650]},
+                {"charging_power": [250, None, 0, 0], "discharging_power": [0, 0, 0, 0], "state_of_charge": [1000, 1250, 1250, 1250]},
+            ],
+        },
+        "details": {
+            "batteryDetails": [{"name": "House"}, {"name": "Garage"}],
+            "timestamp": timestamps,
+        },
+    }
+
+
+def test_downsample_bucket_mean():
+    values = [1, 2, 3, 4, 5, 6, 7]
+    # nothing to do
+    assert downsample_bucket_mean(values, 7) == (values, 1)
+    assert downsample_bucket_mean(values, 0) == (values, 1)
+    assert downsample_bucket_mean(values, None) == (values, 1)
+    # the last bucket is smaller
+    assert downsample_bucket_mean(values, 3) == ([2.0, 5.0, 7.0], 3)
+    assert downsample_bucket_mean(values, 4) == ([1.5, 3.5, 5.5, 7.0], 2)
+    # non numeric values are skipped - an empty bucket is None
+    assert downsample_bucket_mean([1, None, None, None, 3, 5], 3) == ([1.0, None, 4.0], 2)
+    assert downsample_bucket_mean([1 / 3, 0, 0], 1) == ([0.1111], 3)
+
+
+def test_evopt_series_summary():
+    series = EvoptSeries(evopt_block(["2026-10-19T12:00:00Z"]))
+    assert series.summary[EvoptSeries.SUMMARY_NEXT_HOUR_GRID_IMPORT] == 1000.0
+    assert series.summary[EvoptSeries.SUMMARY_TOTAL_GRID_EXPORT] == 75.0
+    # slot 0: (500 + 250) Wh within 15min
+    assert series.summary[EvoptSeries.SUMMARY_PEAK_BATTERY_POWER] == 3000.0
+
+
+def test_evopt_series_battery_attributes():
+    series = EvoptSeries(evopt_block(["2026-10-19T12:00:00Z", "2026-10-19T12:00:05Z"]))
+    an_attr = series.battery_attributes(1, "charging_power")
+    assert an_attr == {"values": [250.0, 0.0, 0.0, 0.0], "name": "Garage", "timestamp": "2026-10-19T12:00:05Z"}
+    # the values are the shared (parsed once) list
+    assert an_attr["values"] is series.batteries[1]["charging_power"]
+    assert series.battery_attributes(2, "charging_power") is None
+
+
+def test_evopt_series_battery_attributes_with_a_single_timestamp():
+    series = EvoptSeries(evopt_block(["2026-10-19T12:00:00Z"]))
+    assert series.battery_attributes(1, "state_of_charge")["timestamp"] == "2026-10-19T12:00:00Z"
+
+    a_block = evopt_block([])
+    a_block["details"]["batteryDetails"] = [None]
+    series = EvoptSeries(a_block)
+    assert series.battery_attributes(0, "state_of_charge") == {"values": [5000.0, 5500.0, 5400.0, 5650.0]}
+    assert series.battery_attributes(1, "state_of_charge") == {"values": [1000.0, 1250.0, 1250.0, 1250.0]}
+
+
+def test_evopt_series_is_based_on_the_source_objects():
+    a_block = evopt_block([])
+    series = EvoptSeries(a_block)
+    assert series.is_based_on(dict(a_block))
+    a_block["res"] = dict(a_block["res"])
+    assert not series.is_based_on(a_block)
+
+
+def test_compressed_payloads_are_evicted_least_recently_used(evcc_coordinator):
+    calls = []
+
+    def _compress(data_list: list) -> list:
+        calls.append(data_list)
+        return data_list[:1]
+
+    payloads = [[idx, idx] for idx in range(PAYLOAD_CACHE_MAX_SIZE + 1)]
+    for a_payload in payloads[:PAYLOAD_CACHE_MAX_SIZE]:
+        evcc_coordinator.get_compressed_payload(a_payload, _compress)
+    # the first payload is used again - so the second one is the oldest
+    assert evcc_coordinator.get_compressed_payload(payloads[0], _compress) == [0]
+    assert len(calls) == PAYLOAD_CACHE_MAX_SIZE
+
+    evcc_coordinator.get_compressed_payload(payloads[-1], _compress)
+    assert len(calls) == PAYLOAD_CACHE_MAX_SIZE + 1
+    # ... only the oldest entry has been dropped (and not the whole cache)
+    evcc_coordinator.get_compressed_payload(payloads[0], _compress)
+    evcc_coordinator.get_compressed_payload(payloads[2], _compress)
+    assert len(calls) == PAYLOAD_CACHE_MAX_SIZE + 1
+    evcc_coordinator.get_compressed_payload(payloads[1], _compress)
+    assert len(calls) == PAYLOAD_CACHE_MAX_SIZE + 2
+
+
+def test_compressed_payload_is_rebuilt_for_a_new_list(evcc_coordinator):
+    calls = []
+
+    def _compress(data_list: list) -> list:
+        calls.append(data_list)
+        return [sum(data_list)]
+
+    first = evcc_coordinator.get_compressed_payload([1, 2], _compress)
+    assert evcc_coordinator.get_compressed_payload([1, 2], _compress) == first
+    assert len(calls) == 2
@@ -0,0 +1,67 @@
+from custom_components.evcc_intg.pyevcc_ha import TimeseriesSlotIndex, calculate_forecast_analytics
+
+# 2026-10-19 12:00:00 UTC
+T0 = 1_792_411_200.0
+DAY_END = T0 + 12 * 3600
+
+
+def index_of(*slots) -> TimeseriesSlotIndex:
+    # (start_minute, end_minute, value) tuples
+    return TimeseriesSlotIndex([{"start": T0 + a_start * 60, "end": T0 + a_end * 60, "value": a_value}
+                                for a_start, a_end, a_value in slots])
+
+
+def cheapest_window(result: dict) -> tuple:
+    return result["cheapest_window_start"], result["cheapest_window_end"], result["cheapest_window_avg"]
+
+
+def test_window_longer_than_the_series():
+    an_index = index_of((0, 15, 0.3), (15, 30, 0.1))
+    result = calculate_forecast_analytics(an_index, T0, DAY_END, 3600)
+    assert cheapest_window(result) == (None, None, None)
+    # ... the remaining day is still available
+    assert (result["remaining_day_avg"], result["remaining_day_min"], result["remaining_day_max"]) == (0.2, 0.1, 0.3)
+
+    # a window with the length of the complete series
+    assert cheapest_window(calculate_forecast_analytics(an_index, T0, DAY_END, 1800)) == (T0, T0 + 1800, 0.2)
+
+
+def test_tie_uses_the_earliest_window():
+    an_index = index_of((0, 15, 0.3), (15, 30, 0.1), (30, 45, 0.1), (45, 60, 0.3), (60, 75, 0.1), (75, 90, 0.1))
+    assert cheapest_window(calculate_forecast_analytics(an_index, T0, DAY_END, 1800)) == (T0 + 900, T0 + 2700, 0.1)
+
+
+def test_mixed_slot_lengths():
+    # four 15min slots followed by a 1h slot - the cheapest hour ends within the 1h slot
+    an_index = index_of((0, 15, 0.3), (15, 30, 0.1), (30, 45, 0.1), (45, 60, 0.3), (60, 120, 0.2))
+    result = calculate_forecast_analytics(an_index, T0, DAY_END, 3600)
+    assert cheapest_window(result) == (T0 + 900, T0 + 4500, 0.175)
+    # time weighted - the 1h slot counts four times
+    assert result["remaining_day_avg"] == 0.2
+
+    # a window can't start within a slot - except for the current one (that starts 'now')
+    result = calculate_forecast_analytics(an_index, T0 + 1200, DAY_END, 3600)
+    assert cheapest_window(result) == (T0 + 1200, T0 + 4800, 0.18333)
+
+
+def test_window_does_not_span_a_gap():
+    # no data between 12:30 & 12:45 - and an invalid value between 13:00 & 13:15
+    an_index = index_of((0, 15, 0.1), (15, 30, 0.1), (45, 60, 0.2), (60, 75, None), (75, 90, 0.3), (90, 105, 0.3))
+    assert cheapest_window(calculate_forecast_analytics(an_index, T0, DAY_END, 1800)) == (T0, T0 + 1800, 0.1)
+    assert cheapest_window(calculate_forecast_analytics(an_index, T0 + 1800, DAY_END, 1800)) == (T0 + 4500, T0 + 6300, 0.3)
+    assert cheapest_window(calculate_forecast_analytics(an_index, T0, DAY_END, 2700)) == (None, None, None)
+
+
+def test_remaining_day_ends_within_a_slot():
+    an_index = index_of((0, 60, 0.2), (60, 120, 0.4), (120, 180, 0.1))
+    result = calculate_forecast_analytics(an_index, T0 + 1800, T0 + 5400, 0)
+    # 30min with 0.2 & 30min with 0.4 - the slot after the day end is ignored
+    assert (result["remaining_day_avg"], result["remaining_day_min"], result["remaining_day_max"]) == (0.3, 0.2, 0.4)
+    assert cheapest_window(result) == (None, None, None)
+
+
+def test_no_remaining_data():
+    an_index = index_of((0, 15, 0.3))
+    assert calculate_forecast_analytics(an_index, T0 + 900, DAY_END, 900) == {
+        "remaining_day_avg": None, "remaining_day_min": None, "remaining_day_max": None,
+        "cheapest_window_start": None, "cheapest_window_end": None, "cheapest_window_avg": None}
@@ -0,0 +1,86 @@
+import time
+
+from custom_components.evcc_intg.pyevcc_ha import (
+    ADDITIONAL_ENDPOINTS_DATA_TARIFF,
+    ForecastCache,
+    ForecastCacheEntry,
+)
+from custom_components.evcc_intg.pyevcc_ha.const import FORECAST_CACHE_MAX_AGE
+from .evcc_stub import forecast_slots
+
+NOW_TS = 1_792_411_200.0
+RATES = {"rates": [{"start": "2026-10-19T12:00:00Z", "end": "2026-10-19T13:00:00Z", "value": 0.3}]}
+
+
+def test_entry_is_stale_by_age_or_after_its_last_slot():
+    an_entry = ForecastCacheEntry(RATES, NOW_TS - 600, ForecastCache.SOURCE_POLL)
+    assert an_entry.valid_until == NOW_TS + 3600
+    assert not an_entry.is_stale(NOW_TS, 900)
+    assert an_entry.is_stale(NOW_TS + 301, 900)
+    assert an_entry.is_stale(NOW_TS + 3600, 86400)
+
+    # without rates only the age counts
+    an_entry = ForecastCacheEntry({"something": "else"}, NOW_TS, ForecastCache.SOURCE_ON_DEMAND)
+    assert an_entry.valid_until is None
+    assert not an_entry.is_stale(NOW_TS + 900, 900)
+    assert an_entry.as_meta_dict() == {"fetched_at": "2026-10-19T12:00:00+00:00", "valid_until": None, "source": "on-demand"}
+
+
+def test_changed_payload_is_fanned_out_to_all_listeners():
+    cache = ForecastCache()
+    calls = []
+
+    def _failing_listener(kind, new_entry, previous_entry):
+        raise ValueError("ignored")
+
+    remove_first = cache.add_listener(lambda kind, new_entry, previous_entry: calls.append(("first", kind, previous_entry)))
+    cache.add_listener(_failing_listener)
+    cache.add_listener(lambda kind, new_entry, previous_entry: calls.append(("second", kind, previous_entry)))
+
+    first_entry = cache.put("grid", RATES, ForecastCache.SOURCE_POLL, NOW_TS)
+    assert calls == [("first", "grid", None), ("second", "grid", None)]
+
+    # a re-fetch of an identical payload is not reported (but it's a fresh entry)
+    second_entry = cache.put("grid", {"rates": list(RATES["rates"])}, ForecastCache.SOURCE_ON_DEMAND, NOW_TS + 60)
+    assert second_entry is not first_entry and cache.get("grid") is second_entry
+    assert len(calls) == 2
+
+    # a removed listener is not called anymore (and removing it twice is fine)
+    remove_first()
+    remove_first()
+    cache.put("grid", {"rates": []}, ForecastCache.SOURCE_POLL, NOW_TS + 120)
+    assert calls[2:] == [("second", "grid", second_entry)]
+
+
+async def test_stale_entry_is_fetched_on_demand(evcc_coordinator, evcc_stub_server):
+    bridge = evcc_coordinator.bridge
+    requests_before = evcc_stub_server.requests.get("/api/tariff/grid", 0)
+
+    # rates that cover 'now' - so only the age counts
+    current_rates = {"rates": forecast_slots(8)}
+    bridge.forecast_cache.put("grid", current_rates | {"marker": 1}, ForecastCache.SOURCE_POLL, time.time() - FORECAST_CACHE_MAX_AGE + 60)
+    assert (await bridge.evcc_card_read_tariff("grid"))["marker"] == 1
+    assert evcc_stub_server.requests.get("/api/tariff/grid", 0) == requests_before
+
+    bridge.forecast_cache.put("grid", current_rates | {"marker": 2}, ForecastCache.SOURCE_POLL, time.time() - FORECAST_CACHE_MAX_AGE - 1)
+    an_entry = await bridge.evcc_card_read_tariff_entry("grid")
+    assert an_entry.source == ForecastCache.SOURCE_ON_DEMAND
+    assert an_entry.data["rates"] == evcc_stub_server.state["forecast"]["grid"]
+    assert evcc_stub_server.requests["/api/tariff/grid"] == requests_before + 1
+
+
+async def test_on_demand_read_does_not_add_a_polled_kind(evcc_coordinator, evcc_stub_server):
+    bridge = evcc_coordinator.bridge
+    bridge.request_tariff_keys = ["grid"]
+    bridge._data.get(ADDITIONAL_ENDPOINTS_DATA_TARIFF, {}).pop("feedin", None)
+
+    an_entry = await bridge.evcc_card_read_tariff_entry("feedin")
+    assert an_entry.data["rates"] == evcc_stub_server.state["forecast"]["feedin"]
+    assert bridge.request_tariff_keys == ["grid"]
+    assert "feedin" not in bridge._data.get(ADDITIONAL_ENDPOINTS_DATA_TARIFF, {})
+
+    # a polled kind is kept in sync with the entity data
+    bridge.forecast_cache.clear()
+    await bridge.evcc_card_read_tariff_entry("grid")
+    assert bridge._data[ADDITIONAL_ENDPOINTS_DATA_TARIFF]["grid"]["rates"] == evcc_stub_server.state["forecast"]["grid"]
+    assert bridge.request_tariff_keys == ["grid"]
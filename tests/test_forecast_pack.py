@@ -0,0 +1,75 @@
+import pytest
+
+from custom_components.evcc_intg.pyevcc_ha import (
+    PACKED_FORECAST_ENCODING,
+    PACKED_FORECAST_MAX_SCALE,
+    pack_forecast,
+    unpack_forecast,
+)
+from .evcc_stub import forecast_slots
+
+T0 = 1767225600  # 2026-01-01T00:00:00Z
+
+
+def ts_series(values: list, slot_seconds: int = 900, t0: int = T0) -> list:
+    return [{"ts": t0 + idx * slot_seconds, "val": a_value} for idx, a_value in enumerate(values)]
+
+
+def roundtrip(a_series: list) -> list:
+    a_packed = pack_forecast(a_series)
+    assert a_packed["encoding"] == PACKED_FORECAST_ENCODING
+    return unpack_forecast(a_packed)
+
+
+@pytest.mark.parametrize("slots", [96, 192])
+def test_roundtrip_of_rates(slots):
+    a_forecast = forecast_slots(slots)
+    restored = roundtrip(a_forecast)
+    assert len(restored) == slots
+    assert [a_value for _, a_value in restored] == [a_slot["value"] for a_slot in a_forecast]
+    assert [a_ts for a_ts, _ in restored] == list(range(restored[0][0], restored[0][0] + slots * 900, 900))
+
+
+def test_negative_prices():
+    values = [0.1234, -0.0512, -0.3, 0.0, 0.2, -0.0001]
+    assert [a_value for _, a_value in roundtrip(ts_series(values))] == values
+
+
+def test_integer_series_uses_scale_one():
+    values = [0, 1200, 3450, 5800, 4100, 0]
+    a_packed = pack_forecast(ts_series(values))
+    assert a_packed["scale"] == 1
+    assert [a_value for _, a_value in unpack_forecast(a_packed)] == values
+
+
+def test_empty_series():
+    a_packed = pack_forecast([])
+    assert a_packed["count"] == 0
+    assert a_packed["t0"] is None
+    assert unpack_forecast(a_packed) == []
+    assert pack_forecast(None)["count"] == 0
+
+
+def test_single_slot():
+    assert roundtrip(ts_series([0.25])) == [[T0, 0.25]]
+
+
+def test_irregular_slot_lengths():
+    # 15min slots followed by hourly slots (and a gap)
+    times = [T0, T0 + 900, T0 + 1800, T0 + 2700, T0 + 3600, T0 + 7200, T0 + 14400]
+    a_series = [{"ts": a_ts, "val": 0.1} for a_ts in times]
+    assert [a_ts for a_ts, _ in roundtrip(a_series)] == times
+
+
+def test_scale_is_capped():
+    a_packed = pack_forecast(ts_series([0.123456789, 1.5]))
+    assert a_packed["scale"] == PACKED_FORECAST_MAX_SCALE
+
+
+def test_five_and_more_decimals_are_rounded_to_four():
+    # documented loss: the values are quantized with (at most) 4 decimals
+    assert [a_value for _, a_value in roundtrip(ts_series([0.123456, -0.98767]))] == [0.1235, -0.9877]
+
+
+def test_non_numeric_values_are_packed_as_zero():
+    assert [a_value for _, a_value in roundtrip(ts_series([0.5, None, True, 0.25]))] == [0.5, 0, 0, 0.25]
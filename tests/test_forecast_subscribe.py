@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+from custom_components.evcc_intg.pyevcc_ha import ForecastCache, diff_forecast, unpack_forecast
+from .evcc_stub import forecast_slots
+
+# all series of a test must have the same slots
+START = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def apply_diff(previous_rates: list, a_diff: dict) -> list:
+    # what a card does with a 'diff' event
+    by_start = {a_entry["start"]: a_entry for a_entry in previous_rates if a_entry["start"] not in a_diff["remove"]}
+    for a_entry in a_diff["upsert"]:
+        by_start[a_entry["start"]] = a_entry
+    return [by_start[a_start] for a_start in sorted(by_start.keys())]
+
+
+def test_diff_of_a_moved_window_restores_the_new_rates():
+    previous_rates = forecast_slots(12, start=START)
+    # the first slot is gone, a new one has been added & one value has been changed
+    new_rates = [dict(a_entry) for a_entry in forecast_slots(13, start=START)[1:]]
+    new_rates[4]["value"] = 0.9
+    a_diff = diff_forecast(previous_rates, new_rates)
+    assert a_diff["remove"] == [previous_rates[0]["start"]]
+    assert a_diff["upsert"] == [new_rates[4], new_rates[-1]]
+    assert apply_diff(previous_rates, a_diff) == new_rates
+
+    # nothing has been changed
+    assert diff_forecast(new_rates, new_rates) == {"upsert": [], "remove": []}
+
+
+def test_no_diff_when_it_is_not_smaller_or_not_possible():
+    previous_rates = forecast_slots(4, start=START)
+    assert diff_forecast(previous_rates, forecast_slots(4, base_value=0.5, start=START)) is None
+    assert diff_forecast(previous_rates, []) is None
+    assert diff_forecast(None, previous_rates) is None
+    assert diff_forecast(previous_rates, previous_rates + [{"value": 1}]) is None
+    assert diff_forecast([[1792411200, 0.3]], previous_rates) is None
+
+
+async def test_subscription_sends_full_then_diff_events(hass, evcc_coordinator, hass_ws_client):
+    bridge = evcc_coordinator.bridge
+    bridge.forecast_cache.put("grid", {"rates": forecast_slots(12, start=START)}, ForecastCache.SOURCE_POLL)
+    listeners_before = len(bridge.forecast_cache._listeners)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "evcc_intg/subscribe_forecast", "entry_id": evcc_coordinator._config_entry.entry_id, "kind": "grid"})
+    assert (await client.receive_json())["success"]
+    an_event = (await client.receive_json())["event"]
+    assert an_event["kind"] == "grid" and an_event["update"] == "full"
+    assert an_event["source"] == ForecastCache.SOURCE_POLL
+    card_rates = an_event["rates"]
+    assert card_rates == forecast_slots(12, start=START)
+    assert len(bridge.forecast_cache._listeners) == listeners_before + 1
+    assert "grid" in bridge._polled_tariff_keys()
+
+    # the next slot has started
+    new_rates = forecast_slots(13, start=START)[1:]
+    bridge.forecast_cache.put("grid", {"rates": new_rates}, ForecastCache.SOURCE_POLL)
+    an_event = (await client.receive_json())["event"]
+    assert an_event["update"] == "diff" and "rates" not in an_event
+    card_rates = apply_diff(card_rates, an_event)
+    assert card_rates == new_rates
+
+    # another kind is not sent - and a complete new series is sent in full
+    bridge.forecast_cache.put("feedin", {"rates": forecast_slots(2, start=START)}, ForecastCache.SOURCE_POLL)
+    new_rates = forecast_slots(12, base_value=0.5, start=START)
+    bridge.forecast_cache.put("grid", {"rates": new_rates}, ForecastCache.SOURCE_POLL)
+    an_event = (await client.receive_json())["event"]
+    assert an_event["kind"] == "grid" and an_event["update"] == "full"
+    assert an_event["rates"] == new_rates
+
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    assert (await client.receive_json())["success"]
+    assert len(bridge.forecast_cache._listeners) == listeners_before
+    assert "grid" not in bridge._forecast_subscriptions
+
+
+async def test_packed_subscription_sends_the_packed_series_first(hass, evcc_coordinator, hass_ws_client):
+    bridge = evcc_coordinator.bridge
+    bridge.forecast_cache.put("solar", {"rates": forecast_slots(8, start=START)}, ForecastCache.SOURCE_POLL)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "evcc_intg/subscribe_forecast", "entry_id": evcc_coordinator._config_entry.entry_id,
+                            "kind": "solar", "encoding": "packed"})
+    assert (await client.receive_json())["success"]
+    an_event = (await client.receive_json())["event"]
+    assert an_event["update"] == "full"
+    assert [round(a_value, 4) for a_ts, a_value in unpack_forecast(an_event["rates"])] == [a_slot["value"] for a_slot in forecast_slots(8, start=START)]
+
+    # the diffs are never packed
+    bridge.forecast_cache.put("solar", {"rates": forecast_slots(9, start=START)[1:]}, ForecastCache.SOURCE_POLL)
+    an_event = (await client.receive_json())["event"]
+    assert an_event["update"] == "diff" and an_event["upsert"] == [forecast_slots(9, start=START)[-1]]
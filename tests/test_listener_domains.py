@@ -0,0 +1,93 @@
+from custom_components.evcc_intg.pyevcc_ha import (
+    ADDITIONAL_ENDPOINTS_DATA_TARIFF,
+    DATA_DOMAIN_ANY_VEHICLE,
+    DATA_DOMAIN_SITE,
+    data_domain_of,
+)
+from custom_components.evcc_intg.pyevcc_ha.const import JSONKEY_LOADPOINTS, JSONKEY_VEHICLES
+from custom_components.evcc_intg.pyevcc_ha.keys import Tag
+
+
+def add_listeners(coordinator, contexts: dict) -> dict:
+    # name -> number of calls
+    calls = {a_name: 0 for a_name in contexts}
+
+    def _listener_for(a_name: str):
+        def _listener():
+            calls[a_name] += 1
+        return _listener
+
+    for a_name, a_context in contexts.items():
+        coordinator.async_add_listener(_listener_for(a_name), a_context)
+    return calls
+
+
+def test_data_domain_of():
+    assert data_domain_of("pvPower") == DATA_DOMAIN_SITE
+    assert data_domain_of(ADDITIONAL_ENDPOINTS_DATA_TARIFF) == "tariff"
+    assert data_domain_of((JSONKEY_LOADPOINTS, 1)) == (JSONKEY_LOADPOINTS, 1)
+    assert data_domain_of((JSONKEY_VEHICLES, "db:1")) == (JSONKEY_VEHICLES, "db:1")
+    # the complete loadpoints list (or all the data) has been replaced
+    assert data_domain_of(JSONKEY_LOADPOINTS) is None
+    assert data_domain_of(None) is None
+
+
+def test_listener_domains_for(evcc_coordinator):
+    assert evcc_coordinator.listener_domains_for(Tag.CHARGEPOWER, 2) == frozenset([(JSONKEY_LOADPOINTS, 1)])
+    assert evcc_coordinator.listener_domains_for(Tag.PVPOWER) == frozenset([DATA_DOMAIN_SITE])
+    assert evcc_coordinator.listener_domains_for(Tag.VEHICLEMINSOC, evcc_internal_id="db:1") == frozenset([JSONKEY_VEHICLES, (JSONKEY_VEHICLES, "db:1")])
+    assert evcc_coordinator.listener_domains_for(Tag.VEHICLEMINSOC, 1) == frozenset([JSONKEY_VEHICLES, DATA_DOMAIN_ANY_VEHICLE, (JSONKEY_LOADPOINTS, 0)])
+    # depends on the time - so it's always notified
+    assert evcc_coordinator.listener_domains_for(Tag.PVREMAINING, 1) is None
+    assert evcc_coordinator.listener_domains_for(None) is None
+
+
+def test_data_subtrees_for(evcc_coordinator):
+    assert evcc_coordinator.data_subtrees_for(Tag.CHARGEPOWER, 2) == ((JSONKEY_LOADPOINTS, 1),)
+    assert evcc_coordinator.data_subtrees_for(Tag.PVPOWER) == ("pvPower",)
+    assert evcc_coordinator.data_subtrees_for(Tag.VEHICLEMINSOC, evcc_internal_id="db:1") is None
+
+
+async def test_change_of_one_domain_skips_the_other_listeners(evcc_coordinator):
+    calls = add_listeners(evcc_coordinator, {
+        "lp1": evcc_coordinator.listener_domains_for(Tag.CHARGEPOWER, 1),
+        "lp2": evcc_coordinator.listener_domains_for(Tag.CHARGEPOWER, 2),
+        "site": evcc_coordinator.listener_domains_for(Tag.PVPOWER),
+        "vehicle": evcc_coordinator.listener_domains_for(Tag.VEHICLEMINSOC, evcc_internal_id="db:2"),
+        "any": None,
+    })
+    bridge = evcc_coordinator.bridge
+    bridge.pop_changed_data_domains()
+
+    bridge._mark_data_changed((JSONKEY_LOADPOINTS, 1))
+    evcc_coordinator.async_update_listeners()
+    assert calls == {"lp1": 0, "lp2": 1, "site": 0, "vehicle": 0, "any": 1}
+
+    bridge._mark_data_changed("gridPower")
+    bridge._mark_data_changed((JSONKEY_VEHICLES, "db:2"))
+    evcc_coordinator.async_update_listeners()
+    assert calls == {"lp1": 0, "lp2": 1, "site": 1, "vehicle": 1, "any": 2}
+
+
+async def test_unknown_or_empty_changes_notify_every_listener(evcc_coordinator):
+    calls = add_listeners(evcc_coordinator, {
+        "lp1": evcc_coordinator.listener_domains_for(Tag.CHARGEPOWER, 1),
+        "site": evcc_coordinator.listener_domains_for(Tag.PVPOWER),
+    })
+    bridge = evcc_coordinator.bridge
+    bridge.pop_changed_data_domains()
+
+    # nothing has been recorded
+    evcc_coordinator.async_update_listeners()
+    assert calls == {"lp1": 1, "site": 1}
+
+    # the complete loadpoints list has been replaced
+    bridge._mark_data_changed((JSONKEY_LOADPOINTS, 0))
+    bridge._mark_data_changed(JSONKEY_LOADPOINTS)
+    evcc_coordinator.async_update_listeners()
+    assert calls == {"lp1": 2, "site": 2}
+
+    # all the data has been replaced
+    bridge._mark_data_changed()
+    evcc_coordinator.async_update_listeners()
+    assert calls == {"lp1": 3, "site": 3}
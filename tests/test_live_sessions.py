@@ -0,0 +1,106 @@
+import pytest
+
+from custom_components.evcc_intg.pyevcc_ha import (
+    ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS,
+    LiveSessionEstimator,
+)
+
+START_TS = 1_790_000_000.0
+LP_TITLES = {0: "Carport 1", 1: "Carport 2"}
+
+
+def test_energy_is_integrated_with_sample_and_hold():
+    estimator = LiveSessionEstimator()
+    # no power - no session
+    estimator.update(0, 0, START_TS)
+    assert estimator.as_dict(LP_TITLES, START_TS) == {}
+
+    estimator.update(0, 11000, START_TS)
+    # the last power is valid till the next update - 30 minutes with 11kW
+    estimator.update(0, 3700, START_TS + 1800)
+    assert estimator.as_dict(LP_TITLES, START_TS + 1800)["Carport 1"]["chargedEnergy"] == pytest.approx(5.5)
+    # ... and the energy since the last update is included - 1 hour with 3.7kW
+    assert estimator.as_dict(LP_TITLES, START_TS + 5400)["Carport 1"]["chargedEnergy"] == pytest.approx(9.2)
+
+    # a 'None' power (e.g. an unavailable charger) counts as 0
+    estimator.update(0, None, START_TS + 5400)
+    assert estimator.as_dict(LP_TITLES, START_TS + 9000)["Carport 1"]["chargedEnergy"] == pytest.approx(9.2)
+
+
+def test_finished_session_is_frozen_and_replaced_by_the_next_one():
+    estimator = LiveSessionEstimator()
+    estimator.update(1, 7200, START_TS)
+    estimator.finish(1, START_TS + 3600)
+
+    a_session = estimator.as_dict(LP_TITLES, START_TS + 7200)["Carport 2"]
+    assert a_session["finished"] is True
+    assert a_session["chargedEnergy"] == pytest.approx(7.2)
+    # a second finish (or a later update without power) does not change the result
+    estimator.finish(1, START_TS + 7200)
+    estimator.update(1, 0, START_TS + 7200)
+    assert estimator.as_dict(LP_TITLES, START_TS + 7200)["Carport 2"] == a_session
+
+    # the next charge starts a new session
+    estimator.update(1, 3600, START_TS + 7200)
+    a_session = estimator.as_dict(LP_TITLES, START_TS + 10800)["Carport 2"]
+    assert a_session["finished"] is False
+    assert a_session["chargedEnergy"] == pytest.approx(3.6)
+
+    # the evcc session record has arrived - only the running session is kept
+    estimator.finish(1, START_TS + 10800)
+    estimator.update(0, 1000, START_TS + 10800)
+    estimator.reconcile()
+    assert list(estimator.as_dict(LP_TITLES, START_TS + 10800).keys()) == ["Carport 1"]
+
+
+def test_cost_is_split_into_grid_and_solar_energy():
+    estimator = LiveSessionEstimator()
+    # 10kWh - half of it from the sun (that could have been sold for 0.08)
+    estimator.update(0, 10000, START_TS, grid_price=0.30, feedin_price=0.08, solar_share=0.5)
+    a_session = estimator.as_dict(LP_TITLES, START_TS + 3600)["Carport 1"]
+    assert a_session["chargedEnergy"] == pytest.approx(10.0)
+    assert a_session["cost"] == pytest.approx(5 * 0.30 + 5 * 0.08)
+    assert a_session["solarPercentage"] == 50.0
+
+    # the share is clamped & without a price the energy is free
+    estimator.update(0, 10000, START_TS + 3600, grid_price=None, feedin_price=None, solar_share=1.7)
+    a_session = estimator.as_dict(LP_TITLES, START_TS + 7200)["Carport 1"]
+    assert a_session["chargedEnergy"] == pytest.approx(20.0)
+    assert a_session["cost"] == pytest.approx(1.9)
+    assert a_session["solarPercentage"] == 75.0
+
+
+def test_loadpoint_without_title_is_skipped():
+    estimator = LiveSessionEstimator()
+    estimator.update(2, 1000, START_TS)
+    assert estimator.as_dict(LP_TITLES, START_TS + 60) == {}
+
+
+def test_inactive_session_is_finished_by_the_bridge(evcc_coordinator):
+    bridge = evcc_coordinator.bridge
+    data = {"loadpoints": [{"title": "Carport 1", "chargePower": 11000, "charging": True}]}
+    assert bridge._update_live_sessions(data)
+    assert data[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]["Carport 1"]["finished"] is False
+
+    # the 'charging' TRUE->FALSE transition has not been seen - but the session is inactive
+    data["loadpoints"][0].update({"chargePower": 0, "charging": False})
+    assert bridge._update_live_sessions(data)
+    assert data[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]["Carport 1"]["finished"] is True
+
+
+async def test_websocket_marks_the_live_sessions_only_when_changed(evcc_coordinator, evcc_stub_server, monkeypatch):
+    bridge = evcc_coordinator.bridge
+    monkeypatch.setattr(bridge, "_ws_start_async_additional_data_update_task_if_needed", lambda: None)
+
+    # nothing is charging - so the (empty) live sessions stay the same
+    evcc_stub_server.ws_messages = [{"pvPower": 1000}, {"homePower": 500}]
+    a_generation = bridge.data_generation_of([ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS])
+    await bridge.connect_ws()
+    assert bridge._data["pvPower"] == 1000
+    assert bridge.data_generation_of([ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]) == a_generation
+
+    evcc_stub_server.ws_messages = [{"loadpoints.0.charging": True, "loadpoints.0.chargePower": 11000}]
+    await bridge.connect_ws()
+    assert bridge.data_generation_of([ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]) > a_generation
+    assert "Carport 1" in bridge._data[ADDITIONAL_ENDPOINTS_DATA_LIVE_SESSIONS]
+    bridge.cancel_pending_tasks()
@@ -0,0 +1,106 @@
+import custom_components.evcc_intg.evcc_card_websocket as evcc_card_websocket
+from custom_components.evcc_intg.evcc_card_websocket import PLAN_PREVIEW_PENDING_KEY
+from custom_components.evcc_intg.pyevcc_ha import ForecastCache, PlanPreviewCache
+
+# 2026-10-19 12:00:00 UTC - the start of a 15min slot
+NOW_TS = 1_792_411_200.0
+TARGET = "2026-10-19T18:07:00Z"
+
+
+def preview_requests(a_server) -> int:
+    return sum(a_count for a_path, a_count in a_server.requests.items() if "/plan/static/preview/" in a_path)
+
+
+def plan_preview_msg(msg_id: int, entry_id: str, value: str, loadpoint: int = 1) -> dict:
+    return {"id": msg_id, "type": "evcc_intg/plan_preview", "entry_id": entry_id,
+            "loadpoint": loadpoint, "kind": "soc", "value": value, "timestamp": TARGET}
+
+
+def test_key_is_floored_to_the_slot():
+    a_key = PlanPreviewCache.key_for(1, "soc", 80, TARGET)
+    assert a_key == ("1", "soc", "80", 1_792_432_800)
+    assert PlanPreviewCache.key_for("1", "soc", "80", "2026-10-19T18:14:59Z") == a_key
+    assert PlanPreviewCache.key_for("1", "soc", "80", "2026-10-19T18:15:00Z") != a_key
+    assert PlanPreviewCache.key_for("1", "soc", "80", "tomorrow") is None
+
+
+def test_least_recently_used_preview_is_evicted():
+    cache = PlanPreviewCache(max_size=2)
+    cache.put("a", {"v": 1}, NOW_TS)
+    cache.put("b", {"v": 2}, NOW_TS)
+    # 'a' is used again - so 'b' is the oldest entry
+    assert cache.get("a", NOW_TS) == {"v": 1}
+    cache.put("c", {"v": 3}, NOW_TS)
+    assert cache.contains("a", NOW_TS) and cache.contains("c", NOW_TS)
+    assert not cache.contains("b", NOW_TS)
+    assert cache.get("b", NOW_TS) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_previews_are_dropped_with_a_new_slot():
+    cache = PlanPreviewCache(max_size=8)
+    cache.put("a", {"v": 1}, NOW_TS)
+    assert cache.get("a", NOW_TS + 899) == {"v": 1}
+    assert cache.get("a", NOW_TS + 900) is None
+
+
+def test_previews_are_dropped_when_the_planner_tariff_changes(hass, evcc_coordinator):
+    bridge = evcc_coordinator.bridge
+    bridge.forecast_cache.put("planner", {"rates": [1]}, ForecastCache.SOURCE_POLL)
+    bridge.plan_preview_cache.put("a", {"v": 1})
+
+    # another kind or an identical planner payload - the previews are still valid
+    bridge.forecast_cache.put("grid", {"rates": [1]}, ForecastCache.SOURCE_ON_DEMAND)
+    bridge.forecast_cache.put("planner", {"rates": [1]}, ForecastCache.SOURCE_ON_DEMAND)
+    assert bridge.plan_preview_cache.contains("a")
+
+    bridge.forecast_cache.put("planner", {"rates": [2]}, ForecastCache.SOURCE_ON_DEMAND)
+    assert not bridge.plan_preview_cache.contains("a")
+
+
+async def test_dragged_slider_is_debounced(hass, evcc_coordinator, evcc_stub_server, hass_ws_client, monkeypatch):
+    monkeypatch.setattr(evcc_card_websocket, "PLAN_PREVIEW_DEBOUNCE_DELAY", 0.05)
+    entry_id = evcc_coordinator._config_entry.entry_id
+    client = await hass_ws_client(hass)
+
+    await client.send_json(plan_preview_msg(1, entry_id, "60"))
+    await client.send_json(plan_preview_msg(2, entry_id, "70"))
+    # another loadpoint is debounced on its own
+    await client.send_json(plan_preview_msg(3, entry_id, "60", loadpoint=2))
+    await client.send_json(plan_preview_msg(4, entry_id, "80"))
+
+    responses = {}
+    for _ in range(4):
+        a_response = await client.receive_json()
+        responses[a_response["id"]] = a_response
+    assert all(a_response["success"] for a_response in responses.values())
+    assert responses[1]["result"] == {"superseded": True}
+    assert responses[2]["result"] == {"superseded": True}
+    assert responses[3]["result"]["value"] == "60"
+    assert responses[4]["result"]["value"] == "80"
+    assert responses[4]["result"]["smartCostType"] == evcc_coordinator._cost_type
+    assert preview_requests(evcc_stub_server) == 2
+
+    # a cached preview is answered without a delay (and without an evcc request)
+    monkeypatch.setattr(evcc_card_websocket, "PLAN_PREVIEW_DEBOUNCE_DELAY", 60)
+    await client.send_json(plan_preview_msg(5, entry_id, "80"))
+    a_response = await client.receive_json()
+    assert a_response["id"] == 5 and a_response["result"]["value"] == "80"
+    assert preview_requests(evcc_stub_server) == 2
+
+
+async def test_pending_state_is_removed_with_the_connection(hass, evcc_coordinator, evcc_stub_server, hass_ws_client, monkeypatch):
+    monkeypatch.setattr(evcc_card_websocket, "PLAN_PREVIEW_DEBOUNCE_DELAY", 0.01)
+    entry_id = evcc_coordinator._config_entry.entry_id
+    client = await hass_ws_client(hass)
+
+    await client.send_json(plan_preview_msg(1, entry_id, "60"))
+    assert (await client.receive_json())["success"]
+    await client.send_json(plan_preview_msg(2, entry_id, "70"))
+    assert (await client.receive_json())["success"]
+    # one state (and one cleanup) per connection
+    assert len(hass.data[PLAN_PREVIEW_PENDING_KEY]) == 1
+
+    await client.close()
+    await hass.async_block_till_done()
+    assert hass.data[PLAN_PREVIEW_PENDING_KEY] == {}
@@ -0,0 +1,127 @@
+import asyncio
+
+import custom_components.evcc_intg.pyevcc_ha as pyevcc_ha
+from custom_components.evcc_intg.pyevcc_ha import SessionEndDetector
+
+
+def count_session_refreshes(monkeypatch, bridge) -> list:
+    # records every 'read_all_data()' call, that has been made to refresh the sessions - the
+    # regular (tariff & config) update after a websocket message is not part of these tests
+    monkeypatch.setattr(bridge, "_ws_start_async_additional_data_update_task_if_needed", lambda: None)
+    refreshes = []
+    read_all_data = bridge.read_all_data
+
+    async def _read_all_data(*args, **kwargs):
+        if kwargs.get("request_sessions", False):
+            refreshes.append(kwargs)
+        return await read_all_data(*args, **kwargs)
+
+    monkeypatch.setattr(bridge, "read_all_data", _read_all_data)
+    return refreshes
+
+
+def test_session_end_of_a_vehicle_loadpoint():
+    detector = SessionEndDetector()
+    lp_data = {"charging": True, "connected": True}
+    assert detector.is_session_end(0, lp_data, "charging", False)
+    # only the TRUE->FALSE transition of the watched key
+    assert not detector.is_session_end(0, lp_data, "charging", True)
+    assert not detector.is_session_end(0, lp_data, "connected", False)
+    assert not detector.is_session_end(0, lp_data, "chargePower", 0)
+    assert not detector.is_session_end(0, {"charging": False}, "charging", False)
+
+    assert detector.is_session_inactive(0, {"charging": False, "connected": True})
+    assert not detector.is_session_inactive(0, {"charging": True, "connected": True})
+
+
+def test_session_end_of_a_heating_loadpoint():
+    detector = SessionEndDetector(lambda idx: {"is_heating": idx == 1, "is_integrated": False})
+    lp_data = {"charging": True, "connected": True}
+    assert detector.is_session_end(0, lp_data, "charging", False)
+    # a heater toggles 'charging' with the control loop - only 'connected' ends the session
+    assert not detector.is_session_end(1, lp_data, "charging", False)
+    assert detector.is_session_end(1, lp_data, "connected", False)
+    assert not detector.is_session_inactive(1, {"charging": False, "connected": True})
+
+
+def test_session_end_uses_the_charger_features_without_a_loadpoint_config():
+    detector = SessionEndDetector(lambda idx: None)
+    lp_data = {"charging": True, "connected": True, "chargerFeatureIntegratedDevice": True}
+    assert not detector.is_session_end(0, lp_data, "charging", False)
+    assert detector.is_session_end(0, lp_data, "connected", False)
+
+
+async def test_charging_to_idle_via_websocket_refreshes_the_sessions(evcc_coordinator, evcc_stub_server, monkeypatch):
+    monkeypatch.setattr(pyevcc_ha, "SESSION_END_REFRESH_DELAY", 0.05)
+    bridge = evcc_coordinator.bridge
+    refreshes = count_session_refreshes(monkeypatch, bridge)
+
+    evcc_stub_server.ws_messages = [
+        {"loadpoints.0.charging": True, "loadpoints.0.chargePower": 11000},
+        {"loadpoints.0.charging": False, "loadpoints.0.chargePower": 0},
+    ]
+    await bridge.connect_ws()
+    assert evcc_stub_server.requests["/ws"] == 1
+    assert bridge._data["loadpoints"][0]["charging"] is False
+    assert len(refreshes) == 0
+
+    await asyncio.sleep(0.2)
+    assert len(refreshes) == 1
+    assert bridge._session_end_refresh_tasks[0].done()
+
+
+async def test_loadpoint_toggling_within_the_delay_refreshes_once(evcc_coordinator, evcc_stub_server, monkeypatch):
+    monkeypatch.setattr(pyevcc_ha, "SESSION_END_REFRESH_DELAY", 0.1)
+    bridge = evcc_coordinator.bridge
+    refreshes = count_session_refreshes(monkeypatch, bridge)
+
+    evcc_stub_server.ws_messages = [
+        {"loadpoints.0.charging": True},
+        {"loadpoints.0.charging": False},
+        {"loadpoints.0.charging": True},
+        {"loadpoints.0.charging": False},
+    ]
+    await bridge.connect_ws()
+    await asyncio.sleep(0.3)
+    assert len(refreshes) == 1
+
+    # a session-end after the refresh has been done is scheduled again
+    await bridge.connect_ws()
+    await asyncio.sleep(0.3)
+    assert len(refreshes) == 2
+
+
+async def test_session_end_refreshes_per_loadpoint(evcc_coordinator, evcc_stub_server, monkeypatch):
+    monkeypatch.setattr(pyevcc_ha, "SESSION_END_REFRESH_DELAY", 0.05)
+    bridge = evcc_coordinator.bridge
+    refreshes = count_session_refreshes(monkeypatch, bridge)
+
+    evcc_stub_server.ws_messages = [
+        {"loadpoints.0.charging": True, "loadpoints.1.charging": True},
+        {"loadpoints.0.charging": False, "loadpoints.1.charging": False},
+    ]
+    await bridge.connect_ws()
+    assert set(bridge._session_end_refresh_tasks.keys()) == {0, 1}
+    await asyncio.sleep(0.2)
+    assert len(refreshes) == 2
+
+
+async def test_pending_refresh_is_cancelled_on_unload(hass, evcc_coordinator, evcc_stub_server, monkeypatch):
+    monkeypatch.setattr(pyevcc_ha, "SESSION_END_REFRESH_DELAY", 60)
+    bridge = evcc_coordinator.bridge
+    refreshes = count_session_refreshes(monkeypatch, bridge)
+
+    evcc_stub_server.ws_messages = [
+        {"loadpoints.0.charging": True},
+        {"loadpoints.0.charging": False},
+    ]
+    await bridge.connect_ws()
+    a_task = bridge._session_end_refresh_tasks[0]
+    assert not a_task.done()
+
+    assert await hass.config_entries.async_unload(evcc_coordinator.config_entry.entry_id)
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+    assert a_task.done()
+    assert bridge._session_end_refresh_tasks == {}
+    assert len(refreshes) == 0
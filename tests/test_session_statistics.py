@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+import pytest
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import get_last_statistics
+from pytest_homeassistant_custom_component.components.recorder.common import async_wait_recording_done
+
+from custom_components.evcc_intg.pyevcc_ha import calculate_session_stats
+from custom_components.evcc_intg.session_statistics import async_import_session_statistics, build_hourly_session_series
+
+ENERGY_ID = "evcc_intg:stub_loadpoint_carport_1_charged_energy"
+COST_ID = "evcc_intg:stub_vehicle_car_1_cost"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_db_url, enable_custom_integrations):
+    # the recorder database must be prepared before 'hass' has been set up
+    yield
+
+
+class StatisticsCoordinator:
+    # the part of the coordinator, that is used by the statistics import
+    _system_id = "stub"
+    _currency = "EUR"
+
+
+def a_session(finished: str, energy: float, price: float, vehicle: str = "Car 1", **values) -> dict:
+    return {"created": finished, "finished": finished, "loadpoint": "Carport 1", "vehicle": vehicle,
+            "chargedEnergy": energy, "price": price, **values}
+
+
+async def last_statistics(hass, statistic_id: str, count: int = 10) -> list:
+    await async_wait_recording_done(hass)
+    last_stats = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, count, statistic_id, True, {"state", "sum"})
+    return [(datetime.fromtimestamp(a_row["start"], tz=timezone.utc).hour, a_row["state"], a_row["sum"])
+            for a_row in reversed(last_stats.get(statistic_id, []))]
+
+
+def test_session_stats_math():
+    sessions = [
+        # 10kWh with 40% solar in 1h & 20kWh with 10% solar (the duration from created/finished)
+        {"created": "2026-10-04T10:00:00Z", "vehicle": "Car 1", "chargedEnergy": 10, "price": 3.0,
+         "solarPercentage": 40, "chargeDuration": 3_600_000_000_000},
+        {"created": "2026-10-06T10:00:00Z", "finished": "2026-10-06T12:30:00Z", "vehicle": "Car 1",
+         "chargedEnergy": 20, "price": 5.0, "solarPercentage": 10, "chargeDuration": None},
+        {"created": "2026-11-02T10:00:00Z", "vehicle": "Car 2", "chargedEnergy": 0, "price": None},
+        {"created": "2026-11-03T10:00:00Z", "chargedEnergy": 1.5, "price": 0.5},
+        {"created": "not a date", "vehicle": "Car 1", "chargedEnergy": 99},
+        {"vehicle": "Car 1", "chargedEnergy": 99},
+    ]
+    assert calculate_session_stats(sessions, "month", "vehicle") == [
+        {"period": "2026-10", "vehicle": "Car 1", "sessions": 2, "chargedEnergy": 30, "cost": 8.0,
+         "solarPercentage": 20.0, "avgPrice": 0.2667, "chargeDuration": 12600},
+        # a session without a vehicle is grouped as ''
+        {"period": "2026-11", "vehicle": "", "sessions": 1, "chargedEnergy": 1.5, "cost": 0.5,
+         "solarPercentage": 0.0, "avgPrice": 0.3333, "chargeDuration": 0},
+        {"period": "2026-11", "vehicle": "Car 2", "sessions": 1, "chargedEnergy": 0, "cost": 0,
+         "solarPercentage": None, "avgPrice": None, "chargeDuration": 0},
+    ]
+
+    by_week = calculate_session_stats(sessions[:2], "week", "loadpoint")
+    assert [(a_row["period"], a_row["loadpoint"], a_row["sessions"]) for a_row in by_week] == [("2026-W40", "", 1), ("2026-W41", "", 1)]
+    assert [a_row["period"] for a_row in calculate_session_stats(sessions[:2], "day")] == ["2026-10-04", "2026-10-06"]
+
+
+def test_sessions_are_booked_into_the_finished_hour():
+    series = build_hourly_session_series([
+        a_session("2026-10-19T10:40:00Z", 10, 3.0),
+        a_session("2026-10-19T10:05:00+02:00", 5, 1.0, vehicle="Car 2"),
+        a_session("2026-10-19T08:59:59Z", 2, 0.5, vehicle=""),
+        {"created": "2026-10-19T07:00:00Z", "loadpoint": "Carport 1", "chargedEnergy": True},
+        {"loadpoint": "Carport 1", "chargedEnergy": 1},
+        "invalid",
+    ])
+    hour = lambda a_hour: datetime(2026, 10, 19, a_hour, tzinfo=timezone.utc)
+    assert series[("loadpoint", "Carport 1")] == {hour(10): [10.0, 3.0], hour(8): [7.0, 1.5], hour(7): [0.0, 0.0]}
+    assert series[("vehicle", "Car 1")] == {hour(10): [10.0, 3.0]}
+    assert series[("vehicle", "Car 2")] == {hour(8): [5.0, 1.0]}
+    assert ("vehicle", "") not in series
+
+
+async def test_statistics_import_resumes_after_the_grace_period(recorder_mock, hass, freezer):
+    freezer.move_to("2026-10-19T12:10:00Z")
+    sessions = [
+        a_session("2026-10-19T09:20:00Z", 10, 3.0),
+        a_session("2026-10-19T10:40:00Z", 5, 1.5),
+        # the hour 11:00-12:00 is complete - but within the grace period
+        a_session("2026-10-19T11:55:00Z", 2, 0.5),
+    ]
+    # 2 hours for 'Carport 1' & 'Car 1' - each with energy & cost
+    assert await async_import_session_statistics(hass, StatisticsCoordinator(), sessions) == 8
+    assert await last_statistics(hass, ENERGY_ID) == [(9, 10.0, 10.0), (10, 5.0, 15.0)]
+    assert await last_statistics(hass, COST_ID) == [(9, 3.0, 3.0), (10, 1.5, 4.5)]
+
+    # nothing new
+    assert await async_import_session_statistics(hass, StatisticsCoordinator(), sessions) == 0
+
+    # after the grace period the last hour is added to the last sum - a late session for an
+    # already imported hour is ignored
+    freezer.move_to("2026-10-19T12:16:00Z")
+    sessions.append(a_session("2026-10-19T10:50:00Z", 7, 2.0))
+    assert await async_import_session_statistics(hass, StatisticsCoordinator(), sessions) == 4
+    assert await last_statistics(hass, ENERGY_ID) == [(9, 10.0, 10.0), (10, 5.0, 15.0), (11, 2.0, 17.0)]
+    assert await last_statistics(hass, COST_ID) == [(9, 3.0, 3.0), (10, 1.5, 4.5), (11, 0.5, 5.0)]
+
+
+async def test_statistics_import_without_recorder(hass):
+    assert await async_import_session_statistics(hass, StatisticsCoordinator(), [a_session("2026-10-19T09:20:00Z", 10, 3.0)]) == 0
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+
+from custom_components.evcc_intg.pyevcc_ha import (
+    ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW,
+    filter_sessions_by_created,
+    filter_sessions_by_time_range,
+    paginate_sessions,
+    project_session_fields,
+)
+
+
+def evcc_sessions(count: int = 5) -> list:
+    # evcc returns the sessions ordered by 'created'
+    return [{"id": 100 + idx,
+             "created": f"2026-0{1 + idx // 2}-{10 + idx:02d}T08:00:00Z",
+             "vehicle": f"Car {1 + idx % 2}",
+             "loadpoint": "Carport 1",
+             "chargedEnergy": 10.5 + idx,
+             "price": 3.1 + idx} for idx in range(count)]
+
+
+def ids_of(sessions: list) -> list:
+    return [a_session["id"] for a_session in sessions]
+
+
+def test_paginate_sessions_with_cursor():
+    sessions = evcc_sessions(5)
+    page, next_after_id = paginate_sessions(sessions, limit=2)
+    assert ids_of(page) == [100, 101] and next_after_id == 101
+
+    page, next_after_id = paginate_sessions(sessions, after_id=next_after_id, limit=2)
+    assert ids_of(page) == [102, 103] and next_after_id == 103
+
+    # the last page has no cursor
+    page, next_after_id = paginate_sessions(sessions, after_id=next_after_id, limit=2)
+    assert ids_of(page) == [104] and next_after_id is None
+
+
+def test_paginate_sessions_page_ends_exactly_on_the_last_session():
+    page, next_after_id = paginate_sessions(evcc_sessions(4), after_id=101, limit=2)
+    assert ids_of(page) == [102, 103] and next_after_id is None
+
+
+def test_paginate_sessions_without_limit_and_unknown_cursor():
+    sessions = evcc_sessions(3)
+    assert paginate_sessions(sessions) == (sessions, None)
+    assert ids_of(paginate_sessions(sessions, after_id=100)[0]) == [101, 102]
+    assert paginate_sessions(sessions, after_id=999, limit=2) == ([], None)
+    assert paginate_sessions([], limit=2) == ([], None)
+
+
+def test_filter_sessions_by_time_range():
+    sessions = evcc_sessions(5)
+    # 'start' is inclusive, 'end' is exclusive
+    start = datetime(2026, 1, 11, 8, 0, tzinfo=timezone.utc)
+    end = datetime(2026, 2, 13, 8, 0, tzinfo=timezone.utc)
+    assert ids_of(filter_sessions_by_time_range(sessions, start, end)) == [101, 102]
+    assert ids_of(filter_sessions_by_time_range(sessions, start=start)) == [101, 102, 103, 104]
+    assert ids_of(filter_sessions_by_time_range(sessions, end=start)) == [100]
+    assert filter_sessions_by_time_range(sessions) is sessions
+
+
+def test_filter_sessions_by_created_and_invalid_dates():
+    sessions = evcc_sessions(5) + [{"id": 999, "created": "not-a-date"}, {"id": 998}]
+    assert ids_of(filter_sessions_by_created(sessions, year=2026, month=2)) == [102, 103]
+    assert ids_of(filter_sessions_by_created(sessions, month=3)) == [104]
+    assert filter_sessions_by_created(sessions) is sessions
+
+
+def test_project_session_fields():
+    sessions = evcc_sessions(2)
+    assert project_session_fields(sessions, ["id", "chargedEnergy", "unknown"]) == [
+        {"id": 100, "chargedEnergy": 10.5}, {"id": 101, "chargedEnergy": 11.5}]
+    assert project_session_fields(sessions, None) is sessions
+    assert project_session_fields(sessions, []) is sessions
+
+
+async def test_sessions_commands(hass, evcc_coordinator, hass_ws_client):
+    evcc_coordinator.bridge._data[ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW] = evcc_sessions(5)
+    entry_id = evcc_coordinator._config_entry.entry_id
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "evcc_intg/sessions", "entry_id": entry_id, "limit": 2, "after_id": 101, "fields": ["id"]})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"] == {"sessions": [{"id": 102}, {"id": 103}], "total": 5, "next_after_id": 103}
+
+    await client.send_json({"id": 2, "type": "evcc_intg/sessions", "entry_id": entry_id,
+                            "start": "2026-01-11T08:00:00+00:00", "end": "2026-02-13T08:00:00+00:00", "fields": ["id"]})
+    response = await client.receive_json()
+    assert response["result"]["sessions"] == [{"id": 101}, {"id": 102}]
+
+
+async def test_subscribe_sessions_chunks(hass, evcc_coordinator, hass_ws_client):
+    evcc_coordinator.bridge._data[ADDITIONAL_ENDPOINTS_DATA_SESSIONS_RAW] = evcc_sessions(5)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "evcc_intg/subscribe_sessions", "entry_id": evcc_coordinator._config_entry.entry_id,
+                            "chunk_size": 2, "fields": ["id"]})
+    assert (await client.receive_json())["success"]
+    chunks = [(await client.receive_json())["event"] for _ in range(3)]
+    assert [ids_of(a_chunk["sessions"]) for a_chunk in chunks] == [[100, 101], [102, 103], [104]]
+    assert [a_chunk["done"] for a_chunk in chunks] == [False, False, True]
+    assert all(a_chunk["total"] == 5 for a_chunk in chunks)
+
+    # a chunk size that divides the list: the last full chunk is flagged with 'done'
+    await client.send_json({"id": 2, "type": "evcc_intg/subscribe_sessions", "entry_id": evcc_coordinator._config_entry.entry_id,
+                            "chunk_size": 5})
+    assert (await client.receive_json())["success"]
+    a_chunk = (await client.receive_json())["event"]
+    assert len(a_chunk["sessions"]) == 5 and a_chunk["done"]
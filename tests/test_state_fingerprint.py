@@ -0,0 +1,43 @@
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from custom_components.evcc_intg import ATTRIBUTE_VALUE_COMPARE_MAX_LEN
+from custom_components.evcc_intg.const import DOMAIN
+from custom_components.evcc_intg.switch import EvccSwitch
+
+
+async def test_replaced_and_modified_attribute_containers_are_written(hass: HomeAssistant, evcc_coordinator, monkeypatch):
+    attributes = {}
+    # like the repeating plan switches: the attributes are created with every access
+    monkeypatch.setattr(EvccSwitch, "extra_state_attributes", property(lambda self: attributes.get("value", None)))
+    a_switch = next(a_entity for a_platform in async_get_platforms(hass, DOMAIN) for a_entity in a_platform.entities.values()
+                    if isinstance(a_entity, EvccSwitch))
+
+    def update_and_read(a_value) -> dict:
+        attributes["value"] = a_value
+        a_switch._handle_coordinator_update()
+        return hass.states.get(a_switch.entity_id).attributes
+
+    assert update_and_read({"plans": [{"soc": 80}, {"soc": 90}]})["plans"] == [{"soc": 80}, {"soc": 90}]
+
+    # unchanged: not written again
+    written = evcc_coordinator.state_write_stats["written"]
+    update_and_read({"plans": [{"soc": 80}, {"soc": 90}]})
+    assert evcc_coordinator.state_write_stats["written"] == written
+
+    # a new (small) list with the same length (the old list is freed - so its id can be reused)
+    assert update_and_read({"plans": [{"soc": 70}, {"soc": 90}]})["plans"] == [{"soc": 70}, {"soc": 90}]
+
+    # a small list that has been modified in place
+    attributes["value"]["plans"][1]["soc"] = 100
+    assert update_and_read(attributes["value"])["plans"] == [{"soc": 70}, {"soc": 100}]
+
+    # a large list replaced by one of the same length
+    size = ATTRIBUTE_VALUE_COMPARE_MAX_LEN + 8
+    assert update_and_read({"rates": list(range(size))})["rates"][0] == 0
+    assert update_and_read({"rates": [1] * size})["rates"][0] == 1
+
+    # a large list that has been modified in place (and the data has been marked as changed)
+    attributes["value"]["rates"][0] = 2
+    evcc_coordinator.bridge._mark_data_changed()
+    assert update_and_read(attributes["value"])["rates"][0] == 2
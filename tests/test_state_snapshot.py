@@ -0,0 +1,36 @@
+import time
+
+from custom_components.evcc_intg.pyevcc_ha.const import STATE_SNAPSHOT_MAX_AGE
+
+
+async def test_fresh_snapshot_is_used_once(evcc_coordinator, evcc_stub_server):
+    bridge = evcc_coordinator.bridge
+    requests_before = evcc_stub_server.requests["/api/state"]
+
+    bridge.use_state_snapshot({"marker": 1})
+    assert await bridge.read_state_data() == {"marker": 1}
+    assert evcc_stub_server.requests["/api/state"] == requests_before
+
+    # the snapshot has been consumed
+    assert (await bridge.read_state_data())["siteTitle"] == "Stub"
+    assert evcc_stub_server.requests["/api/state"] == requests_before + 1
+
+
+async def test_outdated_snapshot_is_ignored(evcc_coordinator, evcc_stub_server):
+    bridge = evcc_coordinator.bridge
+    requests_before = evcc_stub_server.requests["/api/state"]
+
+    bridge._state_snapshot = (time.monotonic() - STATE_SNAPSHOT_MAX_AGE - 1, {"marker": 1})
+    assert (await bridge.read_state_data())["siteTitle"] == "Stub"
+    assert evcc_stub_server.requests["/api/state"] == requests_before + 1
+    assert bridge._state_snapshot is None
+
+
+async def test_empty_snapshot_is_not_used(evcc_coordinator, evcc_stub_server):
+    bridge = evcc_coordinator.bridge
+    requests_before = evcc_stub_server.requests["/api/state"]
+
+    bridge.use_state_snapshot({})
+    bridge.use_state_snapshot(None)
+    assert (await bridge.read_state_data())["siteTitle"] == "Stub"
+    assert evcc_stub_server.requests["/api/state"] == requests_before + 1
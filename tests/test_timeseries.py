@@ -0,0 +1,152 @@
+import time
+from datetime import datetime, timezone
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.evcc_intg.const import SENSOR_ENTITIES
+from custom_components.evcc_intg.pyevcc_ha import TimeseriesSlotIndex
+from custom_components.evcc_intg.pyevcc_ha.keys import Tag
+import custom_components.evcc_intg.sensor as evcc_sensor
+from custom_components.evcc_intg.sensor import EvccSensor
+
+# 2026-10-19 12:00:00 UTC
+T0 = 1_792_411_200.0
+
+
+def slot(start_minute: int, end_minute: int, value: float) -> dict:
+    return {"start": datetime.fromtimestamp(T0 + start_minute * 60, tz=timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(T0 + end_minute * 60, tz=timezone.utc).isoformat(),
+            "value": value}
+
+
+def a_forecast_sensor(hass: HomeAssistant, coordinator) -> EvccSensor:
+    # the forecast sensors are disabled by default - so we create one on our own
+    a_description = next(a_description for a_description in SENSOR_ENTITIES if a_description.tag == Tag.FORECAST_GRID)
+    a_sensor = EvccSensor(coordinator, a_description)
+    a_sensor.hass = hass
+    return a_sensor
+
+
+def set_sensor_time(monkeypatch, a_ts: float):
+    # the 'now' of the sensor module only - the rest of hass keeps running in real time
+    class _FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(a_ts, tz=tz)
+
+    monkeypatch.setattr(evcc_sensor, "datetime", _FixedDatetime)
+
+
+class SlotEntity:
+    # the part of an entity, that is used by the slot boundary timer
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.enabled = True
+        self.writes = 0
+
+    def async_write_ha_state(self):
+        self.writes += 1
+
+
+def test_slot_lookup():
+    # unsorted, with a 15min gap (12:30-12:45) & a 1h slot at the end
+    an_index = TimeseriesSlotIndex([slot(15, 30, 0.2), slot(0, 15, 0.1), slot(45, 105, 0.4)])
+    assert an_index.starts == [T0, T0 + 900, T0 + 2700]
+
+    # before the first slot
+    assert an_index.slot_at(T0 - 1) == (None, None, None)
+    assert an_index.next_slot_at(T0 - 1) == (0.1, T0, T0 + 900)
+    # exactly on a boundary the new slot is used
+    assert an_index.slot_at(T0) == (0.1, T0, T0 + 900)
+    assert an_index.slot_at(T0 + 900) == (0.2, T0 + 900, T0 + 1800)
+    assert an_index.slot_at(T0 + 899.999)[0] == 0.1
+    # within the gap
+    assert an_index.slot_index_at(T0 + 1800) == -1
+    assert an_index.next_slot_at(T0 + 1800) == (0.4, T0 + 2700, T0 + 6300)
+    # within the long slot & after the last slot
+    assert an_index.slot_at(T0 + 6299)[0] == 0.4
+    assert an_index.slot_at(T0 + 6300) == (None, None, None)
+    assert an_index.next_slot_at(T0 + 6300) == (None, None, None)
+
+
+def test_slot_formats():
+    an_index = TimeseriesSlotIndex([
+        {"ts": datetime.fromtimestamp(T0 + 60, tz=timezone.utc).isoformat(), "val": 1},
+        [T0 + 900, 2],
+        [T0 + 1800, "ignored", 3],
+        {"ts": "not a date", "val": 4},
+        "unknown",
+        None,
+    ])
+    # a 'ts' entry is valid for its quarter-hour
+    assert an_index.slot_at(T0) == (1, T0, T0 + 900)
+    assert an_index.slot_at(T0 + 1000)[0] == 2
+    assert an_index.slot_at(T0 + 2000)[0] == 3
+    assert len(an_index.starts) == 3
+    assert TimeseriesSlotIndex(None).slot_at(T0) == (None, None, None)
+
+
+async def test_sensor_value_is_valid_till_the_slot_end(hass, evcc_coordinator, monkeypatch):
+    set_sensor_time(monkeypatch, T0 + 300)
+    a_sensor = a_forecast_sensor(hass, evcc_coordinator)
+    rates = [slot(0, 15, 0.1), slot(15, 30, 0.2)]
+
+    assert a_sensor.get_current_value_from_timeseries(rates) == 0.1
+    assert evcc_coordinator._slot_boundary_entities[a_sensor] == T0 + 900
+    # the value is not recalculated within the slot - a new payload is
+    rates[0]["value"] = 0.15
+    assert a_sensor.get_current_value_from_timeseries(rates) == 0.1
+    assert a_sensor.get_current_value_from_timeseries([dict(a_slot) for a_slot in rates]) == 0.15
+
+    set_sensor_time(monkeypatch, T0 + 900)
+    assert a_sensor.get_current_value_from_timeseries(rates) == 0.2
+    assert evcc_coordinator._slot_boundary_entities[a_sensor] == T0 + 1800
+    assert a_sensor.get_current_value_from_timeseries(None) is None
+    evcc_coordinator.cancel_slot_boundary_timer()
+
+
+async def test_sensor_waits_for_a_payload_in_the_future(hass, evcc_coordinator, monkeypatch):
+    set_sensor_time(monkeypatch, T0 - 600)
+    a_sensor = a_forecast_sensor(hass, evcc_coordinator)
+    rates = [slot(0, 15, 0.1)]
+
+    assert a_sensor.get_current_value_from_timeseries(rates) is None
+    assert evcc_coordinator._slot_boundary_entities[a_sensor] == T0
+
+    set_sensor_time(monkeypatch, T0)
+    assert a_sensor.get_current_value_from_timeseries(rates) == 0.1
+    evcc_coordinator.cancel_slot_boundary_timer()
+
+
+async def fire_time_changed(hass: HomeAssistant, freezer, a_ts: float):
+    a_time = datetime.fromtimestamp(a_ts, tz=timezone.utc)
+    freezer.move_to(a_time)
+    async_fire_time_changed(hass, a_time)
+    await hass.async_block_till_done()
+
+
+async def test_slot_boundary_timer_is_rescheduled(hass, evcc_coordinator, freezer):
+    evcc_coordinator.cancel_slot_boundary_timer()
+    hourly, quarterly, late = SlotEntity(hass), SlotEntity(hass), SlotEntity(hass)
+    now_ts = time.time()
+
+    evcc_coordinator.schedule_slot_boundary_update(hourly, now_ts + 2)
+    assert evcc_coordinator._slot_boundary_ts == now_ts + 2
+    # an earlier boundary re-arms the timer - a later one does not
+    evcc_coordinator.schedule_slot_boundary_update(quarterly, now_ts + 1)
+    evcc_coordinator.schedule_slot_boundary_update(late, now_ts + 60)
+    assert evcc_coordinator._slot_boundary_ts == now_ts + 1
+
+    await fire_time_changed(hass, freezer, now_ts + 1)
+    # only the due entity is updated - the timer is armed for the next boundary
+    assert (hourly.writes, quarterly.writes, late.writes) == (0, 1, 0)
+    assert evcc_coordinator._slot_boundary_ts == now_ts + 2
+    assert quarterly not in evcc_coordinator._slot_boundary_entities
+
+    await fire_time_changed(hass, freezer, now_ts + 2)
+    assert (hourly.writes, quarterly.writes, late.writes) == (1, 1, 0)
+    assert evcc_coordinator._slot_boundary_ts == now_ts + 60
+
+    evcc_coordinator.cancel_slot_boundary_timer()
+    assert evcc_coordinator._slot_boundary_ts is None and evcc_coordinator._slot_boundary_entities == {}
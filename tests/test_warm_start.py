@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from homeassistant.const import STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.evcc_intg.warm_start import EvccWarmStartStore, WARM_START_MAX_SERVE_TIME
+from .evcc_stub import create_config_entry, evcc_state
+
+
+async def test_warm_start_data_is_marked_stale_and_expires(hass: HomeAssistant, socket_enabled, freezer):
+    # no evcc server is listening on this port
+    a_entry = create_config_entry(hass, "http://127.0.0.1:1")
+    await EvccWarmStartStore(hass, a_entry.entry_id).async_save(evcc_state())
+
+    assert await hass.config_entries.async_setup(a_entry.entry_id)
+    await hass.async_block_till_done()
+
+    a_stale_state = hass.states.get("binary_sensor.evcc_stub_data_stale")
+    assert a_stale_state.state == STATE_ON
+    assert "data_saved_at" in a_stale_state.attributes
+    assert hass.states.get("sensor.evcc_stub_pv_power").state == "3456.7"
+
+    # evcc is still not available - so the last known data is not served any longer
+    freezer.tick(WARM_START_MAX_SERVE_TIME + timedelta(minutes=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.evcc_stub_pv_power").state == STATE_UNAVAILABLE
+    assert hass.states.get("binary_sensor.evcc_stub_data_stale").state == STATE_UNAVAILABLE
+
+    assert await hass.config_entries.async_unload(a_entry.entry_id)
+    await hass.async_block_till_done()